@@ -26,6 +26,7 @@ from utils.feature_utils import (
     calculate_coefficient_of_variation,
     validate_dataframe,
     log_progress,
+    ensure_datetime,
 )
 
 
@@ -85,7 +86,7 @@ class BehavioralFeatureExtractor:
         df = sales_details.copy()
         
         try:
-            df[date_col] = pd.to_datetime(df[date_col])
+            df[date_col] = ensure_datetime(df[date_col])
         except Exception as e:
             log_progress(f"Warning: Could not convert {date_col} to datetime: {e}")
         
@@ -127,7 +128,7 @@ class BehavioralFeatureExtractor:
         log_progress("Extracting purchase patterns...")
         
         # Group by customer and sort by date
-        customer_dates = df.groupby(customer_id_col)[date_col].agg(list).reset_index()
+        customer_dates = df.groupby(customer_id_col, observed=True)[date_col].agg(list).reset_index()
         customer_dates.columns = [customer_id_col, "purchase_dates"]
         
         def calculate_purchase_metrics(dates: List) -> Dict:
@@ -177,29 +178,30 @@ class BehavioralFeatureExtractor:
         log_progress("Extracting product preferences...")
         
         # Product diversity
-        product_diversity = df.groupby(customer_id_col)[product_id_col].nunique().reset_index()
+        product_diversity = df.groupby(customer_id_col, observed=True)[product_id_col].nunique().reset_index()
         product_diversity.columns = [customer_id_col, "unique_products_bought"]
         
         result = product_diversity.copy()
         
         # Category preferences
         if category_col in df.columns:
-            category_diversity = df.groupby(customer_id_col)[category_col].nunique().reset_index()
+            category_diversity = df.groupby(customer_id_col, observed=True)[category_col].nunique().reset_index()
             category_diversity.columns = [customer_id_col, "unique_categories_bought"]
             
+            # Customer x category counts (dipakai untuk top category & HHI)
+            category_counts = df.groupby([customer_id_col, category_col], observed=True).size().reset_index(name="count")
+            
             # Most purchased category
-            top_category = df.groupby([customer_id_col, category_col]).size().reset_index(name="count")
-            idx = top_category.groupby(customer_id_col)["count"].idxmax()
-            top_category = top_category.loc[idx][[customer_id_col, category_col]].rename(
+            idx = category_counts.groupby(customer_id_col, observed=True)["count"].idxmax()
+            top_category = category_counts.loc[idx][[customer_id_col, category_col]].rename(
                 columns={category_col: "preferred_category"}
             )
             
             # Category concentration (HHI)
-            category_counts = df.groupby([customer_id_col, category_col]).size().reset_index(name="count")
-            total_by_customer = category_counts.groupby(customer_id_col)["count"].transform("sum")
+            total_by_customer = category_counts.groupby(customer_id_col, observed=True)["count"].transform("sum")
             category_counts["share"] = category_counts["count"] / total_by_customer
             category_counts["share_squared"] = category_counts["share"] ** 2
-            category_hhi = category_counts.groupby(customer_id_col)["share_squared"].sum().reset_index()
+            category_hhi = category_counts.groupby(customer_id_col, observed=True)["share_squared"].sum().reset_index()
             category_hhi.columns = [customer_id_col, "category_concentration"]
             
             result = result.merge(
@@ -237,7 +239,7 @@ class BehavioralFeatureExtractor:
         log_progress("Extracting spending patterns...")
         
         # Basic spending metrics
-        spending_stats = df.groupby(customer_id_col).agg({
+        spending_stats = df.groupby(customer_id_col, observed=True).agg({
             amount_col: ["mean", "std", "min", "max", "sum", "count"]
         }).reset_index()
         
@@ -259,14 +261,14 @@ class BehavioralFeatureExtractor:
         
         # Spending trend
         df_sorted = df.sort_values([customer_id_col, date_col])
-        df_sorted["row_num"] = df_sorted.groupby(customer_id_col).cumcount() + 1
-        df_sorted["total_rows"] = df_sorted.groupby(customer_id_col)[customer_id_col].transform("count")
+        df_sorted["row_num"] = df_sorted.groupby(customer_id_col, observed=True).cumcount() + 1
+        df_sorted["total_rows"] = df_sorted.groupby(customer_id_col, observed=True)[customer_id_col].transform("count")
         df_sorted["half"] = np.where(
             df_sorted["row_num"] <= df_sorted["total_rows"] / 2, 
             "first", "second"
         )
         
-        half_spending = df_sorted.groupby([customer_id_col, "half"])[amount_col].mean().unstack()
+        half_spending = df_sorted.groupby([customer_id_col, "half"], observed=True)[amount_col].mean().unstack()
         if "first" in half_spending.columns and "second" in half_spending.columns:
             half_spending["spending_trend"] = safe_divide(
                 half_spending["second"] - half_spending["first"],
@@ -17,7 +17,7 @@ if str(_PARENT_DIR) not in sys.path:
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 from config.feature_config import FeatureConfig, RFMConfig
@@ -26,6 +26,7 @@ from utils.feature_utils import (
     calculate_percentile_rank,
     validate_dataframe,
     log_progress,
+    ensure_datetime,
 )
 
 
@@ -65,7 +66,8 @@ class RFMFeatureExtractor:
         customer_id_col: str = "customer_id",
         date_col: str = "transaction_date",
         amount_col: str = "total_amount",
-    ) -> pd.DataFrame:
+        return_segment_summary: bool = False,
+    ) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
         """
         Extract RFM features from transaction-level data.
         
@@ -81,11 +83,18 @@ class RFMFeatureExtractor:
             Column name for transaction date
         amount_col : str
             Column name for transaction amount
+        return_segment_summary : bool
+            Also run get_segment_summary on the finished features and return
+            (features, segment_summary). This is still a separate group-by
+            over the customer table (segments come from quantile scores over
+            all customers, so they can't be summarized during aggregation);
+            it only moves the call into the extractor, e.g. a worker process
             
         Returns
         -------
-        pd.DataFrame
-            Customer data with RFM features added
+        pd.DataFrame or tuple of pd.DataFrame
+            Customer data with RFM features added, plus the segment summary
+            if return_segment_summary is True
         """
         log_progress("Starting RFM feature extraction...")
         
@@ -98,14 +107,14 @@ class RFMFeatureExtractor:
         df = sales_details.copy()
         
         try:
-            df[date_col] = pd.to_datetime(df[date_col])
+            df[date_col] = ensure_datetime(df[date_col])
         except Exception as e:
             log_progress(f"Warning: Could not convert {date_col} to datetime: {e}")
             # Try to find any date-like column
             date_cols = [c for c in df.columns if "date" in c.lower()]
             if date_cols:
                 date_col = date_cols[0]
-                df[date_col] = pd.to_datetime(df[date_col])
+                df[date_col] = ensure_datetime(df[date_col])
                 log_progress(f"Using fallback date column: {date_col}")
             else:
                 raise ValueError(f"No valid date column found. Tried: {date_col}")
@@ -129,6 +138,10 @@ class RFMFeatureExtractor:
         
         log_progress(f"RFM features extracted for {len(rfm_data)} customers")
         
+        if return_segment_summary:
+            # Group-by kedua atas tabel customer (bukan fusi dengan agregasi)
+            return rfm_data, self.get_segment_summary(rfm_data)
+        
         return rfm_data
     
     def _aggregate_customer_data(
@@ -141,7 +154,7 @@ class RFMFeatureExtractor:
         """Aggregate transaction data to customer level."""
         log_progress("Aggregating customer data...")
         
-        rfm_agg = df.groupby(customer_id_col).agg({
+        rfm_agg = df.groupby(customer_id_col, observed=True).agg({
             date_col: "max",  # Last purchase date
             amount_col: ["sum", "count", "mean"]  # Monetary metrics
         }).reset_index()
@@ -154,7 +167,7 @@ class RFMFeatureExtractor:
         
         # Calculate recency
         rfm_agg["recency"] = (
-            self._reference_date - pd.to_datetime(rfm_agg["last_purchase_date"])
+            self._reference_date - ensure_datetime(rfm_agg["last_purchase_date"])
         ).dt.days
         
         # Handle edge cases
@@ -235,31 +248,25 @@ class RFMFeatureExtractor:
         """Assign customer segments based on RFM scores."""
         log_progress("Assigning customer segments...")
         
-        def get_segment(row: pd.Series) -> str:
-            r, f, m = row["r_score"], row["f_score"], row["m_score"]
-            
-            for segment, rules in self.config.segment_rules.items():
-                match = True
-                
-                if "r_min" in rules and r < rules["r_min"]:
-                    match = False
-                if "r_max" in rules and r > rules["r_max"]:
-                    match = False
-                if "f_min" in rules and f < rules["f_min"]:
-                    match = False
-                if "f_max" in rules and f > rules["f_max"]:
-                    match = False
-                if "m_min" in rules and m < rules["m_min"]:
-                    match = False
-                if "m_max" in rules and m > rules["m_max"]:
-                    match = False
-                
-                if match:
-                    return segment
-            
-            return "Other"
-        
-        df["rfm_segment"] = df.apply(get_segment, axis=1)
+        # Vectorized: one boolean mask per rule, evaluated over all customers.
+        # np.select picks the first matching rule (same order as the config).
+        scores = {key: df[f"{key}_score"].to_numpy() for key in ("r", "f", "m")}
+        
+        conditions = []
+        for rules in self.config.segment_rules.values():
+            match = np.ones(len(df), dtype=bool)
+            for key in ("r", "f", "m"):
+                if f"{key}_min" in rules:
+                    match &= scores[key] >= rules[f"{key}_min"]
+                if f"{key}_max" in rules:
+                    match &= scores[key] <= rules[f"{key}_max"]
+            conditions.append(match)
+        
+        if conditions:
+            segment_names = np.array(list(self.config.segment_rules.keys()), dtype=object)
+            df["rfm_segment"] = np.select(conditions, segment_names, default="Other")
+        else:
+            df["rfm_segment"] = "Other"
         
         return df
     
@@ -24,6 +24,7 @@ from utils.feature_utils import (
     safe_divide,
     log_progress,
     validate_dataframe,
+    ensure_datetime,
 )
 
 
@@ -72,14 +73,14 @@ class TemporalFeatureExtractor:
         df = sales_details.copy()
         
         try:
-            df[date_col] = pd.to_datetime(df[date_col])
+            df[date_col] = ensure_datetime(df[date_col])
         except Exception as e:
             log_progress(f"Warning: Could not convert {date_col} to datetime: {e}")
             # Try to find any date-like column
             date_cols = [c for c in df.columns if "date" in c.lower()]
             if date_cols:
                 date_col = date_cols[0]
-                df[date_col] = pd.to_datetime(df[date_col])
+                df[date_col] = ensure_datetime(df[date_col])
                 log_progress(f"Using fallback date column: {date_col}")
         
         # Extract date components
@@ -115,14 +116,14 @@ class TemporalFeatureExtractor:
         log_progress("Extracting day patterns...")
         
         # Preferred day of week
-        day_totals = df.groupby([customer_id_col, "day_name"]).size().reset_index(name="count")
-        idx = day_totals.groupby(customer_id_col)["count"].idxmax()
+        day_totals = df.groupby([customer_id_col, "day_name"], observed=True).size().reset_index(name="count")
+        idx = day_totals.groupby(customer_id_col, observed=True)["count"].idxmax()
         preferred_day = day_totals.loc[idx][[customer_id_col, "day_name"]].rename(
             columns={"day_name": "preferred_day_of_week"}
         )
         
         # Weekend vs weekday ratio
-        weekend_stats = df.groupby(customer_id_col)["is_weekend"].agg(["sum", "count"]).reset_index()
+        weekend_stats = df.groupby(customer_id_col, observed=True)["is_weekend"].agg(["sum", "count"]).reset_index()
         weekend_stats.columns = [customer_id_col, "weekend_purchases", "total_purchases_temp"]
         weekend_stats["weekend_purchase_ratio"] = safe_divide(
             weekend_stats["weekend_purchases"],
@@ -132,7 +133,7 @@ class TemporalFeatureExtractor:
         
         # Weekend spending ratio
         if amount_col in df.columns:
-            weekend_spending = df.groupby([customer_id_col, "is_weekend"])[amount_col].sum().unstack(fill_value=0)
+            weekend_spending = df.groupby([customer_id_col, "is_weekend"], observed=True)[amount_col].sum().unstack(fill_value=0)
             weekend_spending.columns = ["weekday_spending", "weekend_spending"]
             weekend_spending["total_spending_temp"] = weekend_spending.sum(axis=1)
             weekend_spending["weekend_spending_ratio"] = safe_divide(
@@ -165,12 +166,12 @@ class TemporalFeatureExtractor:
         log_progress("Extracting seasonal patterns...")
         
         # Transactions per quarter
-        quarter_counts = df.groupby([customer_id_col, "quarter"]).size().unstack(fill_value=0)
+        quarter_counts = df.groupby([customer_id_col, "quarter"], observed=True).size().unstack(fill_value=0)
         quarter_counts.columns = [f"q{i}_count" for i in quarter_counts.columns]
         
         # Preferred quarter
-        quarter_totals = df.groupby([customer_id_col, "quarter"]).size().reset_index(name="count")
-        idx = quarter_totals.groupby(customer_id_col)["count"].idxmax()
+        quarter_totals = df.groupby([customer_id_col, "quarter"], observed=True).size().reset_index(name="count")
+        idx = quarter_totals.groupby(customer_id_col, observed=True)["count"].idxmax()
         preferred_quarter = quarter_totals.loc[idx][[customer_id_col, "quarter"]].rename(
             columns={"quarter": "preferred_quarter"}
         )
@@ -204,7 +205,7 @@ class TemporalFeatureExtractor:
         
         reference_date = self.config.reference_date or datetime.now()
         
-        lifecycle = df.groupby(customer_id_col)[date_col].agg(["min", "max", "count"]).reset_index()
+        lifecycle = df.groupby(customer_id_col, observed=True)[date_col].agg(["min", "max", "count"]).reset_index()
         lifecycle.columns = [customer_id_col, "first_purchase_date", "last_purchase_date", "total_transactions"]
         
         # Customer tenure
@@ -9,7 +9,8 @@ Version: 1.2 - Added None handling in find_column
 """
 
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
 
@@ -54,6 +55,24 @@ COLUMN_ALIASES = {
 }
 
 
+# Lowercased lookup names per canonical column, computed once at import:
+# {canonical: (canonical, *aliases)} tanpa duplikat, urutan dipertahankan
+_LOWER_LOOKUP_NAMES: Dict[str, Tuple[str, ...]] = {
+    canonical: tuple(dict.fromkeys(name.lower() for name in [canonical, *aliases]))
+    for canonical, aliases in COLUMN_ALIASES.items()
+}
+
+
+@lru_cache(maxsize=128)
+def _lower_column_index(columns: Tuple) -> Dict[str, Tuple[int, str]]:
+    """Map lowercase column name -> (position, actual name), first occurrence wins."""
+    index = {}
+    for pos, col in enumerate(columns):
+        if isinstance(col, str):
+            index.setdefault(col.lower(), (pos, col))
+    return index
+
+
 def find_column(df: Optional[pd.DataFrame], expected_col: str, aliases: Dict[str, List[str]] = None) -> Optional[str]:
     """
     Find the actual column name in dataframe, checking aliases.
@@ -92,15 +111,16 @@ def find_column(df: Optional[pd.DataFrame], expected_col: str, aliases: Dict[str
         if alias in df.columns:
             return alias
     
-    # Case-insensitive search
-    expected_lower = expected_col.lower()
-    for col in df.columns:
-        if col.lower() == expected_lower:
-            return col
-        # Also check aliases case-insensitive
-        for alias in possible_names:
-            if col.lower() == alias.lower():
-                return col
+    # Case-insensitive search (lookup map dibangun sekali per set kolom)
+    lower_index = _lower_column_index(tuple(df.columns))
+    if aliases is COLUMN_ALIASES and expected_col in _LOWER_LOOKUP_NAMES:
+        lookup_names = _LOWER_LOOKUP_NAMES[expected_col]
+    else:
+        lookup_names = [name.lower() for name in [expected_col, *possible_names]]
+    matches = [lower_index[name] for name in lookup_names if name in lower_index]
+    if matches:
+        # Kolom yang paling awal di DataFrame menang (sama seperti scan berurutan)
+        return min(matches)[1]
     
     return None
 
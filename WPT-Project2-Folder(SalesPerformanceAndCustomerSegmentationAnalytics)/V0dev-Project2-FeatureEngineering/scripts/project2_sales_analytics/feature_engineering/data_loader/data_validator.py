@@ -372,10 +372,18 @@ class DataValidator:
         return pd.DataFrame(reports)
 
 
-def detect_columns(df: Optional[pd.DataFrame]) -> Dict[str, str]:
+def detect_columns(
+    df: Optional[pd.DataFrame],
+    preknown: Optional[Dict[str, str]] = None,
+) -> Dict[str, str]:
     """
     Auto-detect column names for common fields.
     
+    Args:
+        df: DataFrame to scan
+        preknown: Already-detected {standard_name: actual_name}; these are
+            reused as-is instead of being searched again
+    
     Returns:
         Dict mapping standard names to actual column names found
     """
@@ -383,6 +391,7 @@ def detect_columns(df: Optional[pd.DataFrame]) -> Dict[str, str]:
         return {}
     
     detected = {}
+    preknown = preknown or {}
     
     standard_cols = [
         "customer_id", "product_id", "invoice_id",
@@ -391,6 +400,9 @@ def detect_columns(df: Optional[pd.DataFrame]) -> Dict[str, str]:
     ]
     
     for std_col in standard_cols:
+        if preknown.get(std_col):
+            detected[std_col] = preknown[std_col]
+            continue
         actual = find_column(df, std_col, COLUMN_ALIASES)
         if actual:
             detected[std_col] = actual
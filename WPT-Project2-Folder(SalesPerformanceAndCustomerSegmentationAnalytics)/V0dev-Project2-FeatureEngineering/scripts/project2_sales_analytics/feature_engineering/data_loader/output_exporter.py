@@ -7,18 +7,15 @@ Author: v0
 Version: 1.0
 """
 
-import sys
 from pathlib import Path
 
-_PARENT_DIR = Path(__file__).resolve().parent.parent
-if str(_PARENT_DIR) not in sys.path:
-    sys.path.insert(0, str(_PARENT_DIR))
-
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from datetime import datetime
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
 try:
     import joblib
@@ -27,6 +24,126 @@ except ImportError:
     HAS_JOBLIB = False
     import pickle
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import lz4  # noqa: F401 (enables joblib lz4 compression)
+    HAS_LZ4 = True
+except ImportError:
+    HAS_LZ4 = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Above this row count, memory_mb uses the shallow estimate (deep=True
+# re-scans every object column to size its strings)
+DEEP_MEMORY_MAX_ROWS = 100_000
+
+# Compression for streamlit_data.pkl: lz4 decompresses much faster than zlib
+PACKAGE_COMPRESS = ("lz4", 3) if HAS_LZ4 else 3
+
+# Max threads for writing per-DataFrame files (pandas writers release the GIL)
+EXPORT_MAX_WORKERS = 8
+
+# Metadata keys that change on every export; ignored when deciding
+# whether metadata.json needs rewriting
+VOLATILE_METADATA_KEYS = ("export_timestamp", "export_date")
+
+# DataFrame.attrs key (saved in the Parquet pandas metadata) listing object
+# columns whose nulls are None; other object-column nulls are read back as NaN
+NONE_NULL_COLUMNS_ATTR = "none_null_columns"
+
+
+def _estimate_memory_mb(df: pd.DataFrame) -> float:
+    """Memory usage in MB; exact for small frames, shallow for large ones."""
+    deep = len(df) <= DEEP_MEMORY_MAX_ROWS
+    return float(df.memory_usage(index=True, deep=deep).sum()) / (1024 * 1024)
+
+
+def _none_null_columns(df: pd.DataFrame) -> List[str]:
+    """Object columns whose missing values are all None (not NaN)."""
+    columns = []
+    for col in df.columns[df.dtypes == object]:
+        values = df[col].to_numpy()
+        missing = pd.isna(values)
+        if missing.any() and all(v is None for v in values[missing]):
+            columns.append(col)
+    return columns
+
+
+def _restore_object_nulls(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Undo Parquet's None-for-NaN swap in object columns (in place).
+    
+    Parquet menyimpan None dan NaN sama-sama sebagai null, dan membacanya
+    kembali sebagai None. Kolom yang tercatat di NONE_NULL_COLUMNS_ATTR tetap
+    None, kolom object lain kembali ke NaN seperti DataFrame aslinya.
+    """
+    none_columns = set(df.attrs.pop(NONE_NULL_COLUMNS_ATTR, ()))
+    for col in df.columns[df.dtypes == object]:
+        if col in none_columns:
+            continue
+        missing = df[col].isna()
+        if missing.any():
+            df[col] = df[col].where(~missing, np.nan)
+    return df
+
+
+def _serialize_json(data: Dict) -> bytes:
+    """Serialize dict to indented JSON bytes (orjson if available)."""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(
+                data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                default=str,
+            )
+        except TypeError:
+            # Mis. key bertipe numpy: biarkan json stdlib yang menangani
+            pass
+    return json.dumps(data, indent=2, default=str).encode('utf-8')
+
+
+def _load_json(payload: bytes) -> Any:
+    """Parse JSON bytes (orjson if available)."""
+    if HAS_ORJSON:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _write_if_changed(path: Path, data: Dict, volatile_keys: Tuple[str, ...] = ()) -> bool:
+    """
+    Write data as JSON unless the file already has the same content.
+    
+    Top-level volatile_keys (e.g. export timestamps) are ignored in the
+    comparison, so a rerun on the same data does not rewrite the file.
+    Returns True if the file was written.
+    """
+    payload = _serialize_json(data)
+    if path.exists():
+        try:
+            old = _load_json(path.read_bytes())
+        except ValueError:
+            old = None
+        if isinstance(old, dict):
+            new = _load_json(payload)
+            for key in volatile_keys:
+                old.pop(key, None)
+                new.pop(key, None)
+            if new == old:
+                return False
+    path.write_bytes(payload)
+    return True
+
 
 class FeatureExporter:
     """
@@ -57,6 +174,8 @@ class FeatureExporter:
         output_dir: Union[str, Path] = "output/features",
         add_timestamp: bool = False,
         verbose: bool = True,
+        arrow_package: bool = False,
+        csv_engine: str = "pandas",
     ):
         """
         Initialize exporter.
@@ -65,10 +184,18 @@ class FeatureExporter:
             output_dir: Directory to save output files
             add_timestamp: Add timestamp suffix to filenames
             verbose: Print progress messages
+            arrow_package: Store pyarrow Tables (not DataFrames) in
+                streamlit_data.pkl; StreamlitDataLoader returns them as
+                Arrow-backed DataFrames
+            csv_engine: "pandas" (default) or "pyarrow". The pyarrow writer is
+                multithreaded C++ and much faster, but formats values
+                differently (quoted strings, full datetime timestamps)
         """
         self.output_dir = Path(output_dir)
         self.add_timestamp = add_timestamp
         self.verbose = verbose
+        self.arrow_package = arrow_package and HAS_PYARROW
+        self.csv_engine = csv_engine if HAS_PYARROW else "pandas"
         
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -116,7 +243,17 @@ class FeatureExporter:
         filename = self._get_filename(name, "csv")
         filepath = self.csv_dir / filename
         
-        df.to_csv(filepath, index=index, encoding=encoding, **kwargs)
+        use_arrow = (
+            self.csv_engine == "pyarrow"
+            and not index
+            and not kwargs
+            and encoding.lower().replace("-", "") == "utf8"
+        )
+        if use_arrow:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pacsv.write_csv(table, filepath, write_options=pacsv.WriteOptions(include_header=True))
+        else:
+            df.to_csv(filepath, index=index, encoding=encoding, **kwargs)
         self.exported_files.append(filepath)
         
         if self.verbose:
@@ -128,7 +265,7 @@ class FeatureExporter:
         self,
         data: Union[pd.DataFrame, Dict, Any],
         name: str,
-        compress: int = 3,
+        compress: Union[int, Tuple[str, int]] = 3,
     ) -> Path:
         """
         Export data to Pickle (joblib) for fast loading.
@@ -136,7 +273,8 @@ class FeatureExporter:
         Args:
             data: Data to export (DataFrame, dict, or any object)
             name: Base filename (without extension)
-            compress: Compression level (0-9, higher = smaller file)
+            compress: Compression level (0-9, higher = smaller file) or
+                joblib (method, level) tuple, e.g. ("lz4", 3)
             
         Returns:
             Path to created file
@@ -227,6 +365,17 @@ class FeatureExporter:
         
         return filepath
     
+    def _to_streamlit_parquet(self, df: pd.DataFrame, name: str) -> Path:
+        """
+        Export the zstd Parquet file StreamlitDataLoader reads instead of the pickle.
+        
+        Object columns whose nulls are None are recorded in df.attrs (saved in
+        the pandas metadata), so the loader can give back None vs NaN exactly.
+        """
+        df = df.copy(deep=False)
+        df.attrs = {**df.attrs, NONE_NULL_COLUMNS_ATTR: _none_null_columns(df)}
+        return self.to_parquet(df, name, compression="zstd")
+    
     def export_all(
         self,
         dataframes: Dict[str, pd.DataFrame],
@@ -270,22 +419,27 @@ class FeatureExporter:
         self,
         feature_data: Dict[str, pd.DataFrame],
         metadata: Optional[Dict] = None,
+        formats: Optional[List[str]] = None,
     ) -> Dict[str, Path]:
         """
         Export data optimized for Streamlit app loading.
         
         Creates:
-        - Individual CSV files for each DataFrame
         - Combined PKL file with all data + metadata
+        - Individual CSV/Parquet files for each DataFrame (written in parallel)
         - Metadata JSON for quick reference
         
         Args:
             feature_data: Dictionary of {name: DataFrame}
             metadata: Additional metadata to include
+            formats: Per-DataFrame formats ("csv", "parquet"); None = ["csv"]
             
         Returns:
             Dictionary of created file paths
         """
+        if formats is None:
+            formats = ["csv"]
+        
         if self.verbose:
             print(f"\n{'='*60}")
             print(" Exporting for Streamlit ")
@@ -299,17 +453,9 @@ class FeatureExporter:
             skipped = [k for k, v in feature_data.items() if v is None]
             print(f"\n[INFO] Skipping None DataFrames: {skipped}")
         
-        # 1. Export individual CSVs
-        if self.verbose:
-            print("\n[1/3] Exporting CSV files...")
-        
-        for name, df in valid_data.items():
-            path = self.to_csv(df, name)
-            created_files[f"csv_{name}"] = path
-        
-        # 2. Create combined pickle with everything
+        # 1. Create combined pickle with everything
         if self.verbose:
-            print("\n[2/3] Creating combined pickle for Streamlit...")
+            print("\n[1/3] Creating combined pickle for Streamlit...")
         
         # Prepare metadata
         export_metadata = {
@@ -324,33 +470,73 @@ class FeatureExporter:
                 "columns": len(df.columns),
                 "column_names": df.columns.tolist(),
                 "dtypes": {col: str(dtype) for col, dtype in df.dtypes.items()},
-                "memory_mb": df.memory_usage(deep=True).sum() / (1024 * 1024),
+                "memory_mb": _estimate_memory_mb(df),
+                "memory_deep": len(df) <= DEEP_MEMORY_MAX_ROWS,
             }
         
         if metadata:
             export_metadata.update(metadata)
         
         # Combined data package - only include valid data
+        if self.arrow_package:
+            package_data = {
+                name: pa.Table.from_pandas(df, preserve_index=False)
+                for name, df in valid_data.items()
+            }
+        else:
+            package_data = valid_data
+        
         streamlit_package = {
-            "data": valid_data,
+            "data": package_data,
             "metadata": export_metadata,
         }
         
-        pkl_path = self.to_pickle(streamlit_package, "streamlit_data")
+        pkl_path = self.to_pickle(streamlit_package, "streamlit_data", compress=PACKAGE_COMPRESS)
         created_files["pkl_combined"] = pkl_path
         
+        # 2. Export individual files (after the pickle, so StreamlitDataLoader
+        #    sees the Parquet files as up to date)
+        if "parquet" in formats and not HAS_PYARROW:
+            print("   [WARN] pyarrow not installed, skipping Parquet export")
+            formats = [fmt for fmt in formats if fmt != "parquet"]
+        
+        if self.verbose:
+            print(f"\n[2/3] Exporting {formats} files...")
+        
+        writers = {
+            "csv": self.to_csv,
+            "parquet": lambda df, name: self._to_streamlit_parquet(df, name),
+        }
+        jobs = [
+            (fmt, name, df)
+            for name, df in valid_data.items()
+            for fmt in formats
+            if fmt in writers
+        ]
+        
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(EXPORT_MAX_WORKERS, len(jobs))) as executor:
+                futures = [
+                    (fmt, name, executor.submit(writers[fmt], df, name))
+                    for fmt, name, df in jobs
+                ]
+                for fmt, name, future in futures:
+                    created_files[f"{fmt}_{name}"] = future.result()
+        
         # 3. Export metadata as JSON
         if self.verbose:
             print("\n[3/3] Saving metadata...")
         
         metadata_path = self.output_dir / "metadata.json"
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(export_metadata, f, indent=2, default=str)
+        written = _write_if_changed(metadata_path, export_metadata, VOLATILE_METADATA_KEYS)
         
         created_files["metadata"] = metadata_path
         
         if self.verbose:
-            print(f"   [JSON] Saved: metadata.json")
+            if written:
+                print(f"   [JSON] Saved: metadata.json")
+            else:
+                print(f"   [JSON] Unchanged: metadata.json (skipped write)")
         
         # Summary
         if self.verbose:
@@ -402,7 +588,10 @@ class StreamlitDataLoader:
     
     def __init__(self, pkl_path: Union[str, Path]):
         """
-        Load data from pickle file.
+        Prepare loader for pickle file.
+        
+        The pickle is not read here; it is unpickled on first access and
+        DataFrames are cached per name for the rest of the session.
         
         Args:
             pkl_path: Path to streamlit_data.pkl
@@ -412,33 +601,97 @@ class StreamlitDataLoader:
         if not self.pkl_path.exists():
             raise FileNotFoundError(f"File not found: {self.pkl_path}")
         
-        # Load data
+        # Per-DataFrame cache (materialize once, reuse within session)
+        self._cache: Dict[str, pd.DataFrame] = {}
+        
+        # FeatureExporter.to_parquet writes next to the pkl/ folder
+        self._parquet_dir = self.pkl_path.parent.parent
+    
+    @cached_property
+    def _package(self) -> Dict:
+        """Unpickle the combined package (only once)."""
         if HAS_JOBLIB:
-            self._package = joblib.load(self.pkl_path)
-        else:
-            with open(self.pkl_path, 'rb') as f:
-                self._package = pickle.load(f)
+            return joblib.load(self.pkl_path)
+        with open(self.pkl_path, 'rb') as f:
+            return pickle.load(f)
+    
+    @property
+    def _data(self) -> Dict[str, pd.DataFrame]:
+        return self._package.get("data", {})
+    
+    @property
+    def _metadata(self) -> Dict:
+        return self._package.get("metadata", {})
+    
+    def _parquet_is_fresh(self, name: str) -> bool:
+        """True if name.parquet exists and is not older than the pickle."""
+        parquet_path = self._parquet_dir / f"{name}.parquet"
+        return (
+            parquet_path.exists()
+            and parquet_path.stat().st_mtime >= self.pkl_path.stat().st_mtime
+        )
+    
+    @cached_property
+    def _parquet_names(self) -> Optional[List[str]]:
+        """
+        DataFrame names from metadata.json (the export manifest).
         
-        self._data = self._package.get("data", {})
-        self._metadata = self._package.get("metadata", {})
+        Returns None, meaning "use the pickle", when the manifest is missing
+        or unreadable or any listed frame lacks an up-to-date Parquet file.
+        """
+        manifest_path = self._parquet_dir / "metadata.json"
+        try:
+            names = list(json.loads(manifest_path.read_bytes())["dataframes"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        
+        if not all(self._parquet_is_fresh(name) for name in names):
+            return None
+        return names
+    
+    def _read_parquet(self, name: str) -> Optional[pd.DataFrame]:
+        """Read per-DataFrame Parquet file if it is newer than the pickle."""
+        if not self._parquet_is_fresh(name):
+            return None
+        parquet_path = self._parquet_dir / f"{name}.parquet"
+        try:
+            df = pd.read_parquet(parquet_path)
+        except Exception:
+            return None
+        
+        # Parquet null kembali sebagai None di kolom object; pickle bisa NaN
+        return _restore_object_nulls(df)
     
     def get_dataframe(self, name: str) -> pd.DataFrame:
         """Get specific DataFrame by name."""
-        if name not in self._data:
-            available = list(self._data.keys())
-            raise KeyError(f"DataFrame '{name}' not found. Available: {available}")
-        return self._data[name]
+        if name in self._cache:
+            return self._cache[name]
+        
+        df = self._read_parquet(name)
+        if df is None:
+            if name not in self._data:
+                available = list(self._data.keys())
+                raise KeyError(f"DataFrame '{name}' not found. Available: {available}")
+            df = self._data[name]
+            if HAS_PYARROW and isinstance(df, pa.Table):
+                # Arrow-backed columns, no conversion to NumPy dtypes
+                df = df.to_pandas(types_mapper=pd.ArrowDtype)
+        
+        self._cache[name] = df
+        return df
     
     def get_all_dataframes(self) -> Dict[str, pd.DataFrame]:
-        """Get all DataFrames."""
-        return self._data
+        """Get all DataFrames (from the Parquet files when all are up to date)."""
+        return {name: self.get_dataframe(name) for name in self.list_available()}
     
     def get_metadata(self) -> Dict:
         """Get export metadata."""
         return self._metadata
     
     def list_available(self) -> List[str]:
-        """List available DataFrame names."""
+        """List available DataFrame names (manifest first, pickle as fallback)."""
+        if self._parquet_names is not None:
+            return list(self._parquet_names)
         return list(self._data.keys())
     
     @staticmethod
@@ -450,10 +703,15 @@ class StreamlitDataLoader:
     def load_all_csv(csv_dir: Union[str, Path]) -> Dict[str, pd.DataFrame]:
         """Load all CSV files from directory."""
         csv_dir = Path(csv_dir)
-        data = {}
+        csv_files = list(csv_dir.glob("*.csv"))
+        
+        def _read_one(csv_file: Path):
+            # pd.read_csv (bukan pyarrow.csv): tanggal tetap string dan kolom
+            # kosong tetap float64 NaN, sama seperti load sebelumnya
+            return csv_file.stem, pd.read_csv(csv_file)
         
-        for csv_file in csv_dir.glob("*.csv"):
-            name = csv_file.stem
-            data[name] = pd.read_csv(csv_file)
+        if not csv_files:
+            return {}
         
-        return data
+        with ThreadPoolExecutor() as executor:
+            return dict(executor.map(_read_one, csv_files))
@@ -3,7 +3,7 @@ XLSX Data Loader
 
 Load data dari file Excel hasil data preparation.
 Supports:
-- XLSX files (openpyxl)
+- XLSX files (calamine if installed, else openpyxl)
 - CSV files
 - Automatic type conversion
 - Column name normalization
@@ -12,20 +12,40 @@ Author: v0
 Version: 1.2 - Fixed sheet loading for feature engineering
 """
 
-import sys
+import csv
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
-_PARENT_DIR = Path(__file__).resolve().parent.parent
-if str(_PARENT_DIR) not in sys.path:
-    sys.path.insert(0, str(_PARENT_DIR))
-
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Union, Tuple
+from typing import Dict, Iterator, List, Optional, Union, Tuple
 from datetime import datetime
 import warnings
 
-from data_loader.data_schema import DataSchema, SHEET_SCHEMAS, REQUIRED_COLUMNS
+from .data_schema import DataSchema, SHEET_SCHEMAS, REQUIRED_COLUMNS
+
+try:
+    from python_calamine import CalamineWorkbook
+    HAS_CALAMINE = True
+except ImportError:
+    HAS_CALAMINE = False
+
+
+@lru_cache(maxsize=None)
+def _normalize_column_name(col: str) -> str:
+    """Normalize column name to snake_case (cached per name)."""
+    # camelCase to snake_case
+    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', col)
+    s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
+    # Replace spaces and hyphens with underscore
+    s3 = re.sub(r'[\s\-]+', '_', s2)
+    # Remove special characters
+    s4 = re.sub(r'[^\w]', '', s3)
+    return s4.lower()
 
 
 class XLSXDataLoader:
@@ -45,6 +65,7 @@ class XLSXDataLoader:
         file_path: Union[str, Path],
         verbose: bool = True,
         auto_normalize: bool = True,
+        engine: Optional[str] = None,
     ):
         """
         Initialize data loader.
@@ -53,15 +74,22 @@ class XLSXDataLoader:
             file_path: Path ke file XLSX
             verbose: Print progress messages
             auto_normalize: Auto-normalize column names (lowercase, underscore)
+            engine: Excel reader engine. None = "calamine" if python-calamine
+                is installed (streaming Rust reader, no XML DOM), else "openpyxl"
         """
         self.file_path = Path(file_path)
         self.verbose = verbose
         self.auto_normalize = auto_normalize
+        self.engine = engine or ("calamine" if HAS_CALAMINE else "openpyxl")
         self.schema = DataSchema()
         
         # Cached data
         self._data: Dict[str, pd.DataFrame] = {}
         self._sheet_names: List[str] = []
+        self._lock = threading.Lock()
+        
+        # Normalized (date_columns, numeric_columns) per sheet schema
+        self._schema_cols: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
         
         # Validate file exists
         if not self.file_path.exists():
@@ -72,15 +100,19 @@ class XLSXDataLoader:
     
     def _normalize_column_name(self, col: str) -> str:
         """Normalize column name to snake_case."""
-        import re
-        # camelCase to snake_case
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', col)
-        s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-        # Replace spaces and hyphens with underscore
-        s3 = re.sub(r'[\s\-]+', '_', s2)
-        # Remove special characters
-        s4 = re.sub(r'[^\w]', '', s3)
-        return s4.lower()
+        return _normalize_column_name(col)
+    
+    def _get_schema_columns(self, sheet_name: str) -> Optional[Tuple[Tuple[str, ...], Tuple[str, ...]]]:
+        """Get normalized (date_columns, numeric_columns) for a sheet, computed once."""
+        if sheet_name not in self._schema_cols:
+            schema = self.schema.get_sheet_schema(sheet_name)
+            if schema is None:
+                return None
+            self._schema_cols[sheet_name] = (
+                tuple(self._normalize_column_name(c) for c in schema.date_columns),
+                tuple(self._normalize_column_name(c) for c in schema.numeric_columns),
+            )
+        return self._schema_cols[sheet_name]
     
     def _convert_dates(self, df: pd.DataFrame, date_columns: List[str]) -> pd.DataFrame:
         """Convert date columns to datetime."""
@@ -104,13 +136,47 @@ class XLSXDataLoader:
                         print(f"   [WARN] Cannot convert {col} to numeric: {e}")
         return df
     
+    def _parse_date_like_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Parse object columns with 'date' in the name to datetime64 (in place).
+        
+        A column is only converted if every non-null value parses, so
+        free-text columns that happen to contain 'date' are left alone.
+        """
+        for col in df.columns:
+            if "date" not in str(col).lower() or df[col].dtype != object:
+                continue
+            parsed = pd.to_datetime(df[col], format="ISO8601", errors="coerce", cache=True)
+            if parsed.notna().sum() == df[col].notna().sum():
+                df[col] = parsed
+        return df
+    
     def get_sheet_names(self) -> List[str]:
         """Get list of sheet names in the Excel file."""
         if not self._sheet_names:
-            xlsx = pd.ExcelFile(self.file_path)
-            self._sheet_names = xlsx.sheet_names
+            with pd.ExcelFile(self.file_path, engine=self.engine) as xlsx:
+                self._sheet_names = xlsx.sheet_names
         return self._sheet_names
     
+    def iter_sheet_rows(self, sheet_name: str) -> Iterator[list]:
+        """
+        Iterate raw rows of a sheet forward-only, without building a DataFrame.
+        
+        The first row yielded is the header row.
+        """
+        if HAS_CALAMINE:
+            workbook = CalamineWorkbook.from_path(str(self.file_path))
+            yield from workbook.get_sheet_by_name(sheet_name).iter_rows()
+            return
+        
+        import openpyxl
+        workbook = openpyxl.load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            for row in workbook[sheet_name].iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+    
     def load_sheet(
         self,
         sheet_name: str,
@@ -130,6 +196,15 @@ class XLSXDataLoader:
         if use_cache and sheet_name in self._data:
             return self._data[sheet_name]
         
+        df = self._read_sheet(sheet_name)
+        
+        # Cache the result
+        with self._lock:
+            self._data[sheet_name] = df
+        return df
+    
+    def _read_sheet(self, sheet_name: str) -> pd.DataFrame:
+        """Read, normalize and type-convert one sheet (no caching)."""
         if self.verbose:
             print(f"[DataLoader] Loading sheet: {sheet_name}")
         
@@ -138,7 +213,7 @@ class XLSXDataLoader:
             df = pd.read_excel(
                 self.file_path,
                 sheet_name=sheet_name,
-                engine='openpyxl'
+                engine=self.engine
             )
         except Exception as e:
             raise ValueError(f"Error loading sheet '{sheet_name}': {e}")
@@ -155,21 +230,19 @@ class XLSXDataLoader:
                     print(f"   Normalized {len(changed)} column names")
         
         # Get schema for type conversion
-        schema = self.schema.get_sheet_schema(sheet_name)
-        if schema:
+        schema_cols = self._get_schema_columns(sheet_name)
+        if schema_cols:
+            date_cols, numeric_cols = schema_cols
+            
             # Convert date columns
-            date_cols = [self._normalize_column_name(c) for c in schema.date_columns]
             df = self._convert_dates(df, date_cols)
             
             # Convert numeric columns
-            numeric_cols = [self._normalize_column_name(c) for c in schema.numeric_columns]
             df = self._convert_numeric(df, numeric_cols)
         
         if self.verbose:
             print(f"   Loaded {len(df):,} rows, {len(df.columns)} columns")
         
-        # Cache the result
-        self._data[sheet_name] = df
         return df
     
     def load_all(self, sheets: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
@@ -198,12 +271,20 @@ class XLSXDataLoader:
             print(f"{'='*60}")
         
         result = {}
-        for sheet in sheets_to_load:
-            try:
-                result[sheet] = self.load_sheet(sheet)
-            except Exception as e:
-                if self.verbose:
-                    print(f"[ERROR] Failed to load {sheet}: {e}")
+        if not sheets_to_load:
+            return result
+        
+        # Each read_excel call opens its own file handle, so sheets can be
+        # parsed concurrently; results are collected in sheet order.
+        max_workers = min(len(sheets_to_load), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(sheet, executor.submit(self.load_sheet, sheet)) for sheet in sheets_to_load]
+            for sheet, future in futures:
+                try:
+                    result[sheet] = future.result()
+                except Exception as e:
+                    if self.verbose:
+                        print(f"[ERROR] Failed to load {sheet}: {e}")
         
         if self.verbose:
             print(f"\n[OK] Loaded {len(result)} sheets successfully")
@@ -261,6 +342,11 @@ class XLSXDataLoader:
         if missing_required:
             raise ValueError(f"Missing required sheets: {missing_required}")
         
+        # Parse date-like columns once here so extractors don't re-parse them
+        for df in result.values():
+            if df is not None:
+                self._parse_date_like_columns(df)
+        
         # Remove None values from result only if they are truly optional
         # Keep keys for sales_by_customer/product even if None (will be derived)
         
@@ -281,26 +367,57 @@ class XLSXDataLoader:
         
         summary_data = []
         for name, df in self._data.items():
+            # count() uses per-column non-null counts; no boolean mask built
+            null_count = int(df.size - df.count().sum())
             summary_data.append({
                 "sheet": name,
                 "rows": len(df),
                 "columns": len(df.columns),
                 "memory_mb": df.memory_usage(deep=True).sum() / 1024 / 1024,
-                "null_pct": (df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100) if len(df) > 0 else 0,
+                "null_pct": (null_count / df.size * 100) if df.size else 0,
             })
         
         return pd.DataFrame(summary_data)
     
     def clear_cache(self):
         """Clear cached data."""
-        self._data = {}
+        with self._lock:
+            self._data = {}
         if self.verbose:
             print("[DataLoader] Cache cleared")
     
+    @staticmethod
+    def _csv_name(sheet_name: str) -> str:
+        """Clean sheet name into CSV filename."""
+        # Clean filename: remove leading numbers and special chars
+        clean_name = sheet_name.replace(" ", "_").replace("/", "_")
+        # Remove leading number pattern like "5_"
+        if clean_name[0].isdigit() and clean_name[1] == "_":
+            clean_name = clean_name[2:]
+        return f"{clean_name.lower()}.csv"
+    
+    def _stream_sheet_to_csv(self, sheet_name: str, csv_path: Path) -> int:
+        """Write sheet rows straight to CSV. Returns number of data rows."""
+        n_rows = 0
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            rows = self.iter_sheet_rows(sheet_name)
+            header = next(rows, None)
+            if header is None:
+                return 0
+            if self.auto_normalize:
+                header = [_normalize_column_name(str(c)) for c in header]
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(row)
+                n_rows += 1
+        return n_rows
+    
     def convert_all_to_csv(
         self,
         output_folder: Union[str, Path],
         sheets: Optional[List[str]] = None,
+        streaming: bool = False,
     ) -> Dict[str, Path]:
         """
         Convert all sheets from XLSX to CSV files.
@@ -308,6 +425,9 @@ class XLSXDataLoader:
         Args:
             output_folder: Folder to save CSV files
             sheets: Specific sheets to convert. None = all sheets.
+            streaming: Write rows directly from the XLSX reader to CSV
+                without building DataFrames (values are written as stored
+                in the workbook, no type conversion)
             
         Returns:
             Dictionary of {sheet_name: csv_path}
@@ -315,27 +435,65 @@ class XLSXDataLoader:
         output_folder = Path(output_folder)
         output_folder.mkdir(parents=True, exist_ok=True)
         
-        # Load all sheets
-        data = self.load_all(sheets)
+        if streaming:
+            available_sheets = self.get_sheet_names()
+            sheets_to_convert = available_sheets if sheets is None else [s for s in sheets if s in available_sheets]
+            
+            if self.verbose:
+                print(f"\n[CSV Export] Streaming {len(sheets_to_convert)} sheets to CSV...")
+            
+            created_files = {}
+            for sheet_name in sheets_to_convert:
+                csv_path = output_folder / self._csv_name(sheet_name)
+                n_rows = self._stream_sheet_to_csv(sheet_name, csv_path)
+                created_files[sheet_name] = csv_path
+                
+                if self.verbose:
+                    print(f"   Saved: {csv_path.name} ({n_rows:,} rows)")
+            
+            if self.verbose:
+                print(f"\n[OK] Exported {len(created_files)} CSV files to: {output_folder}")
+            
+            return created_files
+        
+        available_sheets = self.get_sheet_names()
+        if sheets is None:
+            sheets_to_convert = available_sheets
+        else:
+            sheets_to_convert = [s for s in sheets if s in available_sheets]
+            missing = set(sheets) - set(available_sheets)
+            if missing and self.verbose:
+                print(f"[WARN] Sheets not found: {missing}")
         
         if self.verbose:
-            print(f"\n[CSV Export] Converting {len(data)} sheets to CSV...")
+            print(f"\n[CSV Export] Converting {len(sheets_to_convert)} sheets to CSV...")
+        
+        def convert_sheet(sheet_name: str) -> Tuple[Path, int]:
+            # Read -> write -> drop: the DataFrame is not kept in the cache,
+            # so peak memory is bounded by the sheets in flight, not all sheets
+            df = self._read_sheet(sheet_name)
+            csv_path = output_folder / self._csv_name(sheet_name)
+            df.to_csv(csv_path, index=False, encoding='utf-8')
+            return csv_path, len(df)
         
         created_files = {}
+        if not sheets_to_convert:
+            return created_files
         
-        for sheet_name, df in data.items():
-            # Clean filename: remove leading numbers and special chars
-            clean_name = sheet_name.replace(" ", "_").replace("/", "_")
-            # Remove leading number pattern like "5_"
-            if clean_name[0].isdigit() and clean_name[1] == "_":
-                clean_name = clean_name[2:]
-            
-            csv_path = output_folder / f"{clean_name.lower()}.csv"
-            df.to_csv(csv_path, index=False, encoding='utf-8')
-            created_files[sheet_name] = csv_path
-            
-            if self.verbose:
-                print(f"   Saved: {csv_path.name} ({len(df):,} rows)")
+        max_workers = min(len(sheets_to_convert), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(sheet, executor.submit(convert_sheet, sheet)) for sheet in sheets_to_convert]
+            for sheet_name, future in futures:
+                try:
+                    csv_path, n_rows = future.result()
+                except Exception as e:
+                    if self.verbose:
+                        print(f"[ERROR] Failed to convert {sheet_name}: {e}")
+                    continue
+                created_files[sheet_name] = csv_path
+                
+                if self.verbose:
+                    print(f"   Saved: {csv_path.name} ({n_rows:,} rows)")
         
         if self.verbose:
             print(f"\n[OK] Exported {len(created_files)} CSV files to: {output_folder}")
@@ -390,6 +548,7 @@ def convert_xlsx_to_csv(
     output_folder: Union[str, Path],
     sheets: Optional[List[str]] = None,
     verbose: bool = True,
+    streaming: bool = False,
 ) -> Dict[str, Path]:
     """
     Convert XLSX sheets to CSV files.
@@ -399,9 +558,10 @@ def convert_xlsx_to_csv(
         output_folder: Folder to save CSV files
         sheets: List of sheets to convert. None = all sheets.
         verbose: Print progress
+        streaming: Write rows directly to CSV without building DataFrames
         
     Returns:
         Dictionary of {sheet_name: csv_path}
     """
     loader = XLSXDataLoader(xlsx_path, verbose=verbose)
-    return loader.convert_all_to_csv(output_folder, sheets)
+    return loader.convert_all_to_csv(output_folder, sheets, streaming=streaming)
@@ -15,6 +15,9 @@ Version: 1.4 - Added comprehensive error handling and None checks
 
 import os
 import sys
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
 
@@ -22,8 +25,21 @@ _CURRENT_DIR = Path(__file__).resolve().parent
 if str(_CURRENT_DIR) not in sys.path:
     sys.path.insert(0, str(_CURRENT_DIR))
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
 # Import modules using absolute imports from current directory
 from data_loader.xlsx_loader import XLSXDataLoader, convert_xlsx_to_csv
 from data_loader.data_validator import DataValidator, detect_columns
@@ -53,7 +69,25 @@ OUTPUT_DIR = "output/features"
 CSV_OUTPUT_DIR = "output/csv_data"
 
 # Export formats
-EXPORT_FORMATS = ["csv", "pkl"]
+EXPORT_FORMATS = ["csv", "parquet"]
+
+# Cache parsed sheets (Parquet) keyed by XLSX hash to skip re-parsing
+USE_SHEET_CACHE = True
+
+# Run RFM / Behavioral / Temporal extractors in parallel processes
+PARALLEL_EXTRACTION = True
+
+# Send sales_details to extractor processes as one Arrow IPC buffer instead of
+# pickling the DataFrame. Helps on large numeric tables; for small tables
+# with many repeated strings pickle is smaller (it dedups string objects).
+USE_ARROW_IPC = False
+
+# STEP 6: align behavioral & temporal ke RFM lewat satu Polars LazyFrame
+# (left joins + satu streaming collect). Needs polars; output sama dengan pandas.
+USE_POLARS_LAZY = False
+
+# Set FE_PROFILE=1 to time each step/extractor and write {OUTPUT_DIR}/profile.csv
+PROFILE = os.getenv("FE_PROFILE") == "1"
 
 
 # ============================================================
@@ -71,8 +105,7 @@ def auto_detect_date_column(df: pd.DataFrame) -> str:
     ]
     
     for name in possible_names:
-        actual = find_column(df, name, COLUMN_ALIASES)
-        if actual:
+        if (actual := find_column(df, name, COLUMN_ALIASES)):
             return actual
     
     # Fallback: find any column with 'date' in name
@@ -94,8 +127,7 @@ def auto_detect_amount_column(df: pd.DataFrame) -> str:
     ]
     
     for name in possible_names:
-        actual = find_column(df, name, COLUMN_ALIASES)
-        if actual:
+        if (actual := find_column(df, name, COLUMN_ALIASES)):
             return actual
     
     raise ValueError("No amount column found in sales_details!")
@@ -106,12 +138,254 @@ def filter_none_dataframes(data: dict) -> dict:
     return {k: v for k, v in data.items() if v is not None}
 
 
+def categorize_customer_ids(data: dict, customer_id_col: str = "customer_id"):
+    """
+    Convert customer_id to one shared CategoricalDtype across all sheets.
+    
+    Group-by dan join di extractor jadi bekerja di integer codes. Kolom ID
+    yang sudah numerik dibiarkan (hashing int64 sudah murah). Categories
+    diurutkan supaya urutan group-by sama dengan group-by object ID (sorted).
+    
+    Returns:
+        The shared CategoricalDtype, or None if nothing was converted
+    """
+    id_columns = [
+        df[customer_id_col] for df in data.values()
+        if df is not None and customer_id_col in df.columns
+    ]
+    if not id_columns or all(pd.api.types.is_numeric_dtype(c) for c in id_columns):
+        return None
+    
+    categories = pd.Index(pd.concat(id_columns, ignore_index=True).dropna().unique())
+    id_dtype = pd.CategoricalDtype(categories.sort_values())
+    
+    for df in data.values():
+        if df is not None and customer_id_col in df.columns:
+            df[customer_id_col] = df[customer_id_col].astype(id_dtype)
+    
+    return id_dtype
+
+
+def restore_customer_ids(data: dict, id_dtype, customer_id_col: str = "customer_id") -> dict:
+    """
+    Cast categorical customer_id columns back to their original dtype.
+    
+    Dipakai sebelum export supaya file CSV/Parquet/PKL tetap berisi
+    customer_id asli (bukan category).
+    
+    Returns:
+        New dict; frames with a converted column are shallow copies
+    """
+    if id_dtype is None:
+        return data
+    
+    restored = {}
+    for name, df in data.items():
+        if (
+            df is not None
+            and customer_id_col in df.columns
+            and isinstance(df[customer_id_col].dtype, pd.CategoricalDtype)
+        ):
+            df = df.copy(deep=False)
+            df[customer_id_col] = df[customer_id_col].astype(id_dtype.categories.dtype)
+        restored[name] = df
+    return restored
+
+
+def to_arrow_ipc(df: pd.DataFrame):
+    """
+    Serialize DataFrame once to an Arrow IPC stream buffer.
+    
+    Returns None if pyarrow is missing or the frame can't be converted.
+    """
+    if not HAS_PYARROW:
+        return None
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError) as e:
+        print(f"   [WARN] Arrow IPC not available for sales_details: {e}")
+        return None
+    
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def extract_from_arrow_ipc(extract_func, ipc_buffer, kwargs: dict):
+    """Worker entry point: rebuild sales_details from Arrow IPC, then extract."""
+    table = pa.ipc.open_stream(ipc_buffer).read_all()
+    sales_details = table.to_pandas(self_destruct=True)
+    return extract_func(sales_details=sales_details, **kwargs)
+
+
+_profile_records = []
+_profile_last = [time.perf_counter()]
+
+
+def profile_mark(stage: str) -> None:
+    """Record wall time since the previous mark under `stage`."""
+    now = time.perf_counter()
+    _profile_records.append({"stage": stage, "seconds": round(now - _profile_last[0], 4)})
+    _profile_last[0] = now
+
+
+def run_extractor(extract_func, kwargs: dict, sales_details=None, ipc_buffer=None):
+    """Run one extractor (in-process or in a worker) and return (result, seconds)."""
+    start = time.perf_counter()
+    if ipc_buffer is not None:
+        result = extract_from_arrow_ipc(extract_func, ipc_buffer, kwargs)
+    else:
+        result = extract_func(sales_details=sales_details, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def compute_file_hash(file_path) -> str:
+    """Compute blake2b hash of a file (used as sheet cache key)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_cached_sheets(cache_dir: Path):
+    """Load cached sheets from Parquet. Returns None on cache miss."""
+    if not cache_dir.exists():
+        return None
+    
+    try:
+        data = {p.stem: pd.read_parquet(p) for p in sorted(cache_dir.glob("*.parquet"))}
+    except Exception as e:
+        print(f"   [WARN] Failed to read sheet cache: {e}")
+        return None
+    
+    return data or None
+
+
+def save_cached_sheets(data: dict, cache_dir: Path) -> None:
+    """Save loaded sheets to Parquet (zstd) for the next run."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        for name, df in filter_none_dataframes(data).items():
+            df.to_parquet(cache_dir / f"{name}.parquet", compression="zstd", index=False)
+    except Exception as e:
+        print(f"   [WARN] Failed to write sheet cache: {e}")
+        for p in cache_dir.glob("*.parquet"):
+            p.unlink()
+        cache_dir.rmdir()
+        return
+    
+    print(f"   Sheet cache saved: {cache_dir}")
+
+
+def _drop_duplicate_feature_columns(rfm_features, behavioral_features, temporal_features):
+    """
+    Index the three feature frames on customer_id and drop duplicate columns.
+    
+    Kolom duplikat dibuang (versi RFM dipertahankan, lalu behavioral).
+    
+    Returns:
+        Tuple of (rfm_indexed, behavioral_indexed, temporal_indexed)
+    """
+    rfm_indexed = rfm_features.set_index("customer_id")
+    behavioral_indexed = behavioral_features.set_index("customer_id")
+    temporal_indexed = temporal_features.set_index("customer_id")
+    
+    behavioral_indexed = behavioral_indexed.drop(
+        columns=behavioral_indexed.columns.intersection(rfm_indexed.columns)
+    )
+    temporal_indexed = temporal_indexed.drop(
+        columns=temporal_indexed.columns.intersection(
+            rfm_indexed.columns.union(behavioral_indexed.columns)
+        )
+    )
+    return rfm_indexed, behavioral_indexed, temporal_indexed
+
+
+def combine_features(rfm_features, behavioral_features, temporal_features) -> pd.DataFrame:
+    """
+    Combine all customer features on a shared customer_id index.
+    
+    Behavioral & temporal di-align ke customer RFM (setara left join).
+    """
+    rfm_indexed, behavioral_indexed, temporal_indexed = _drop_duplicate_feature_columns(
+        rfm_features, behavioral_features, temporal_features
+    )
+    
+    return pd.concat(
+        [
+            rfm_indexed,
+            behavioral_indexed.reindex(rfm_indexed.index),
+            temporal_indexed.reindex(rfm_indexed.index),
+        ],
+        axis=1,
+    ).reset_index()
+
+
+def _polars_join_key(customer_ids: pd.Index):
+    """customer_id as a NumPy array Polars can join on (float64 or str)."""
+    if pd.api.types.is_numeric_dtype(customer_ids):
+        return customer_ids.to_numpy(dtype="float64")
+    return customer_ids.astype(str).to_numpy()
+
+
+def combine_features_polars(rfm_features, behavioral_features, temporal_features) -> pd.DataFrame:
+    """
+    Polars version of combine_features() (USE_POLARS_LAZY).
+    
+    Only customer_id and a row id per frame go through one LazyFrame plan
+    (two left joins, collected once with the streaming engine); the feature
+    columns stay pandas and are gathered by row position, so dtypes and NaN
+    fill match the pandas reindex exactly.
+    
+    Returns:
+        Combined DataFrame, same rows/order/columns as combine_features()
+    """
+    rfm_indexed, behavioral_indexed, temporal_indexed = _drop_duplicate_feature_columns(
+        rfm_features, behavioral_features, temporal_features
+    )
+    
+    def key_frame(indexed: pd.DataFrame, row_col: str):
+        return pl.DataFrame({
+            "customer_id": _polars_join_key(indexed.index),
+            row_col: np.arange(len(indexed)),
+        }).lazy()
+    
+    positions = (
+        key_frame(rfm_indexed, "_rfm_row")
+        .join(key_frame(behavioral_indexed, "_beh_row"), on="customer_id",
+              how="left", maintain_order="left")
+        .join(key_frame(temporal_indexed, "_temp_row"), on="customer_id",
+              how="left", maintain_order="left")
+        .select(pl.col(["_beh_row", "_temp_row"]).fill_null(-1))
+        .collect(engine="streaming")
+    )
+    
+    def gather(indexed: pd.DataFrame, row_col: str) -> pd.DataFrame:
+        # -1 tidak ada di RangeIndex -> baris NaN, sama seperti reindex by label
+        aligned = indexed.reset_index(drop=True).reindex(positions[row_col].to_numpy())
+        aligned.index = rfm_indexed.index
+        return aligned
+    
+    return pd.concat(
+        [
+            rfm_indexed,
+            gather(behavioral_indexed, "_beh_row"),
+            gather(temporal_indexed, "_temp_row"),
+        ],
+        axis=1,
+    ).reset_index()
+
+
 # ============================================================
 # MAIN PIPELINE
 # ============================================================
 
 def main():
     """Main feature engineering pipeline."""
+    _profile_last[0] = time.perf_counter()
     
     print("\n" + "="*70)
     print(" FEATURE ENGINEERING PIPELINE ")
@@ -143,30 +417,52 @@ def main():
         print("atau edit XLSX_PATH di bagian CONFIG.")
         sys.exit(1)
     
-    csv_files = convert_xlsx_to_csv(
-        xlsx_path=XLSX_PATH,
-        output_folder=csv_output_path,
-        verbose=True
-    )
-    
-    print(f"\n[OK] Raw data saved to: {csv_output_path}")
+    data = None
+    cache_dir = None
+    if USE_SHEET_CACHE:
+        cache_dir = csv_output_path / "_cache" / compute_file_hash(XLSX_PATH)
+        data = load_cached_sheets(cache_dir)
+    
+    if data is not None:
+        print(f"   [CACHE] XLSX unchanged, skipping conversion ({cache_dir})")
+    else:
+        csv_files = convert_xlsx_to_csv(
+            xlsx_path=XLSX_PATH,
+            output_folder=csv_output_path,
+            verbose=True
+        )
+        
+        print(f"\n[OK] Raw data saved to: {csv_output_path}")
     
     # ========================================
     # STEP 1: Load Data
     # ========================================
-    print("\n[STEP 1] Loading data from XLSX...")
-    
-    loader = XLSXDataLoader(XLSX_PATH, verbose=True)
-    data = loader.load_for_feature_engineering()
-    
-    # Show summary
-    print("\nData Summary:")
-    summary = loader.get_summary()
-    print(summary.to_string(index=False))
+    if data is not None:
+        print("\n[STEP 1] Loading data from sheet cache...")
+        for name, df in data.items():
+            print(f"   {name}: {len(df):,} rows, {len(df.columns)} cols")
+    else:
+        print("\n[STEP 1] Loading data from XLSX...")
+        
+        loader = XLSXDataLoader(XLSX_PATH, verbose=True)
+        data = loader.load_for_feature_engineering()
+        
+        # Show summary
+        print("\nData Summary:")
+        summary = loader.get_summary()
+        print(summary.to_string(index=False))
+        
+        if cache_dir is not None:
+            save_cached_sheets(data, cache_dir)
+    
+    id_dtype = categorize_customer_ids(data)
+    if id_dtype is not None:
+        print(f"   customer_id -> category ({len(id_dtype.categories):,} ids)")
     
     # ========================================
     # STEP 2: Validate Data
     # ========================================
+    profile_mark("step_0_1_load")
     print("\n[STEP 2] Validating data...")
     
     validator = DataValidator(verbose=True)
@@ -193,55 +489,72 @@ def main():
     print(f"   Date column: {date_col}")
     print(f"   Amount column: {amount_col}")
     
-    # Detect all columns
-    detected = detect_columns(sales_df)
+    # Detect all columns (reuse date/amount yang sudah ditemukan di atas)
+    detected = detect_columns(
+        sales_df,
+        preknown={"transaction_date": date_col, "total_amount": amount_col},
+    )
     print(f"   All detected columns: {detected}")
     
     # ========================================
-    # STEP 3: Extract RFM Features
+    # STEP 3-5: Extract RFM / Behavioral / Temporal Features
     # ========================================
-    print("\n[STEP 3] Extracting RFM features...")
+    profile_mark("step_2_validate")
     
+    # Ketiga extractor independen (hanya membaca sales_df), jadi bisa paralel
     rfm_extractor = RFMFeatureExtractor(config.rfm)
-    
-    rfm_features = rfm_extractor.extract(
-        sales_details=sales_df,
-        reference_date=REFERENCE_DATE,
-        date_col=date_col,
-        amount_col=amount_col,
-    )
-    
-    print(f"   RFM features: {rfm_features.shape[0]} customers, {rfm_features.shape[1]} features")
-    print(f"   Columns: {list(rfm_features.columns)[:8]}...")
-    
-    # ========================================
-    # STEP 4: Extract Behavioral Features
-    # ========================================
-    print("\n[STEP 4] Extracting behavioral features...")
-    
     behavioral_extractor = BehavioralFeatureExtractor(config.behavioral)
+    temporal_extractor = TemporalFeatureExtractor(config.temporal)
     
-    behavioral_features = behavioral_extractor.extract(
-        sales_details=sales_df,
-        sales_by_customer=data.get("sales_by_customer"),  # Can be None
-        date_col=date_col,
-        amount_col=amount_col,
-    )
+    extract_jobs = {
+        "rfm": (rfm_extractor.extract, dict(
+            reference_date=REFERENCE_DATE,
+            date_col=date_col,
+            amount_col=amount_col,
+            return_segment_summary=True,  # STEP 8 summary ikut dihitung di worker
+        )),
+        "behavioral": (behavioral_extractor.extract, dict(
+            sales_by_customer=data.get("sales_by_customer"),  # Can be None
+            date_col=date_col,
+            amount_col=amount_col,
+        )),
+        "temporal": (temporal_extractor.extract, dict(
+            date_col=date_col,
+        )),
+    }
     
-    print(f"   Behavioral features: {behavioral_features.shape[0]} customers, {behavioral_features.shape[1]} features")
+    if PARALLEL_EXTRACTION:
+        print("\n[STEP 3-5] Extracting RFM, behavioral and temporal features in parallel...")
+        # sales_df dikirim ke worker sebagai satu buffer Arrow IPC (bukan pickle
+        # DataFrame per worker); fallback ke DataFrame jika tidak bisa
+        ipc_buffer = to_arrow_ipc(sales_df) if USE_ARROW_IPC else None
+        with ProcessPoolExecutor(max_workers=len(extract_jobs)) as executor:
+            futures = {
+                name: executor.submit(
+                    run_extractor, func, kwargs,
+                    sales_details=None if ipc_buffer is not None else sales_df,
+                    ipc_buffer=ipc_buffer,
+                )
+                for name, (func, kwargs) in extract_jobs.items()
+            }
+            extracted = {name: future.result() for name, future in futures.items()}
+    else:
+        extracted = {}
+        for step, (name, (func, kwargs)) in zip((3, 4, 5), extract_jobs.items()):
+            print(f"\n[STEP {step}] Extracting {name} features...")
+            extracted[name] = run_extractor(func, kwargs, sales_details=sales_df)
     
-    # ========================================
-    # STEP 5: Extract Temporal Features
-    # ========================================
-    print("\n[STEP 5] Extracting temporal features...")
+    for name, (_, seconds) in extracted.items():
+        _profile_records.append({"stage": f"extract_{name}", "seconds": round(seconds, 4)})
+    profile_mark("step_3_5_extract_wall")
     
-    temporal_extractor = TemporalFeatureExtractor(config.temporal)
-    
-    temporal_features = temporal_extractor.extract(
-        sales_details=sales_df,
-        date_col=date_col,
-    )
+    rfm_features, segment_summary = extracted["rfm"][0]
+    behavioral_features = extracted["behavioral"][0]
+    temporal_features = extracted["temporal"][0]
     
+    print(f"   RFM features: {rfm_features.shape[0]} customers, {rfm_features.shape[1]} features")
+    print(f"   Columns: {list(rfm_features.columns)[:8]}...")
+    print(f"   Behavioral features: {behavioral_features.shape[0]} customers, {behavioral_features.shape[1]} features")
     print(f"   Temporal features: {temporal_features.shape[0]} customers, {temporal_features.shape[1]} features")
     
     # ========================================
@@ -249,31 +562,24 @@ def main():
     # ========================================
     print("\n[STEP 6] Combining all features...")
     
-    # Merge all customer features
-    customer_features = rfm_features.merge(
-        behavioral_features, 
-        on="customer_id", 
-        how="left",
-        suffixes=("", "_behavioral")
-    )
+    if USE_POLARS_LAZY and not HAS_POLARS:
+        print("   [WARN] polars not installed, using pandas for STEP 6")
     
-    customer_features = customer_features.merge(
-        temporal_features,
-        on="customer_id",
-        how="left",
-        suffixes=("", "_temporal")
-    )
-    
-    # Remove duplicate columns that might have been created
-    duplicate_cols = [col for col in customer_features.columns if col.endswith('_behavioral') or col.endswith('_temporal')]
-    if duplicate_cols:
-        customer_features = customer_features.drop(columns=duplicate_cols)
+    if USE_POLARS_LAZY and HAS_POLARS:
+        customer_features = combine_features_polars(
+            rfm_features, behavioral_features, temporal_features
+        )
+    else:
+        customer_features = combine_features(
+            rfm_features, behavioral_features, temporal_features
+        )
     
     print(f"   Combined: {customer_features.shape[0]} customers, {customer_features.shape[1]} features")
     
     # ========================================
-    # STEP 7: Export Results (CSV + PKL)
+    # STEP 7: Export Results (CSV + Parquet + PKL)
     # ========================================
+    profile_mark("step_6_combine")
     print("\n[STEP 7] Exporting results...")
     
     # Initialize exporter
@@ -298,9 +604,13 @@ def main():
     if data.get("sales_by_product") is not None:
         feature_data["sales_by_product"] = data["sales_by_product"]
     
+    # customer_id kembali ke dtype asli (category hanya untuk STEP 3-6)
+    feature_data = restore_customer_ids(feature_data, id_dtype)
+    
     # Export for Streamlit
     export_result = exporter.export_for_streamlit(
         feature_data=feature_data,
+        formats=EXPORT_FORMATS,
         metadata={
             "project": "Sales Performance Analytics",
             "reference_date": REFERENCE_DATE,
@@ -316,11 +626,11 @@ def main():
     )
     
     # ========================================
-    # STEP 8: Generate RFM Segment Summary
+    # STEP 8: Save RFM Segment Summary
     # ========================================
-    print("\n[STEP 8] Generating RFM segment summary...")
+    profile_mark("step_7_export")
+    print("\n[STEP 8] Saving RFM segment summary...")
     
-    segment_summary = rfm_extractor.get_segment_summary(rfm_features)
     exporter.to_csv(segment_summary, "rfm_segment_summary")
     
     print("\nRFM Segment Distribution:")
@@ -345,6 +655,7 @@ Output Files:
   - Raw CSV data: {csv_output_path}/
   - Feature CSV: {output_path}/csv/
   - Feature PKL: {output_path}/pkl/
+  - Feature Parquet: {output_path}/
   - Metadata: {output_path}/metadata.json
 
 Streamlit Usage:
@@ -368,6 +679,14 @@ Next Steps:
 """)
     
     # Export summary
+    profile_mark("step_8_summary")
+    
+    if PROFILE:
+        profile_df = pd.DataFrame(_profile_records)
+        profile_df.to_csv(output_path / "profile.csv", index=False)
+        print("\nProfile (FE_PROFILE=1):")
+        print(profile_df.to_string(index=False))
+    
     export_summary = exporter.get_export_summary()
     print("\nExported Files:")
     print(export_summary.to_string(index=False))
@@ -17,6 +17,7 @@ from utils.feature_utils import (
     log_progress,
     calculate_coefficient_of_variation,
     calculate_recency,
+    ensure_datetime,
     bin_values,
     create_feature_summary,
 )
@@ -31,6 +32,7 @@ __all__ = [
     "log_progress",
     "calculate_coefficient_of_variation",
     "calculate_recency",
+    "ensure_datetime",
     "bin_values",
     "create_feature_summary",
 ]
@@ -13,11 +13,87 @@ from typing import List, Optional, Tuple, Union, Dict, Any
 from datetime import datetime
 import logging
 
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    from scipy import sparse
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _nan_mean_std(a: np.ndarray) -> Tuple[float, float]:
+        """Mean dan sample std (ddof=1) yang skip NaN, tanpa alokasi array temp."""
+        total = 0.0
+        count = 0
+        for i in range(a.size):
+            x = a[i]
+            if not np.isnan(x):
+                total += x
+                count += 1
+        if count == 0:
+            return np.nan, np.nan
+        mean = total / count
+        if count < 2:
+            return mean, np.nan
+        sq = 0.0
+        for i in range(a.size):
+            x = a[i]
+            if not np.isnan(x):
+                sq += (x - mean) * (x - mean)
+        return mean, np.sqrt(sq / (count - 1))
+else:
+    def _nan_mean_std(a: np.ndarray) -> Tuple[float, float]:
+        """Mean dan sample std (ddof=1) yang skip NaN."""
+        valid = a[~np.isnan(a)]
+        if valid.size == 0:
+            return np.nan, np.nan
+        mean = valid.mean()
+        if valid.size < 2:
+            return mean, np.nan
+        return mean, valid.std(ddof=1)
+
+
+def _to_float_array(values: Union[pd.Series, np.ndarray, float]) -> np.ndarray:
+    """Convert Series/array/scalar to a float64 numpy array (NA -> NaN)."""
+    if isinstance(values, pd.Series):
+        return values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(values, dtype=np.float64)
+
+
+def _partition_quantiles(values: np.ndarray, qs: Tuple[float, ...]) -> List[float]:
+    """
+    Linear-interpolated quantiles (same as Series.quantile) via np.partition.
+    
+    O(n) selection instead of a full sort; NaN values are ignored.
+    """
+    arr = values[~np.isnan(values)]
+    n = arr.size
+    if n == 0:
+        return [np.nan] * len(qs)
+    
+    positions = [q * (n - 1) for q in qs]
+    kth = sorted({min(int(p) + i, n - 1) for p in positions for i in (0, 1)})
+    part = np.partition(arr, kth)
+    
+    result = []
+    for pos in positions:
+        lo = int(pos)
+        hi = min(lo + 1, n - 1)
+        result.append(part[lo] + (part[hi] - part[lo]) * (pos - lo))
+    return result
+
+
 def safe_divide(
     numerator: Union[pd.Series, np.ndarray, float],
     denominator: Union[pd.Series, np.ndarray, float],
@@ -49,12 +125,27 @@ def safe_divide(
     1    0.0
     dtype: float64
     """
-    if isinstance(numerator, pd.Series) or isinstance(denominator, pd.Series):
-        result = numerator / denominator
-        if isinstance(result, pd.Series):
-            result = result.replace([np.inf, -np.inf], fill_value)
-            result = result.fillna(fill_value)
-        return result
+    num_is_series = isinstance(numerator, pd.Series)
+    den_is_series = isinstance(denominator, pd.Series)
+    
+    if num_is_series or den_is_series:
+        if num_is_series and den_is_series:
+            if not numerator.index.equals(denominator.index):
+                numerator, denominator = numerator.align(denominator)
+            index = numerator.index
+            name = numerator.name if numerator.name == denominator.name else None
+        else:
+            series = numerator if num_is_series else denominator
+            index, name = series.index, series.name
+        
+        num = _to_float_array(numerator)
+        den = _to_float_array(denominator)
+        
+        # Single masked division; x/0, NaN and inf results -> fill_value
+        out = np.full(np.broadcast_shapes(num.shape, den.shape), fill_value, dtype=np.float64)
+        np.divide(num, den, out=out, where=den != 0)
+        out[~np.isfinite(out)] = fill_value
+        return pd.Series(out, index=index, name=name)
     else:
         if denominator == 0:
             return fill_value
@@ -128,20 +219,20 @@ def detect_outliers(
     dtype: bool
     """
     if method == "iqr":
-        Q1 = series.quantile(0.25)
-        Q3 = series.quantile(0.75)
+        arr = _to_float_array(series)
+        Q1, Q3 = _partition_quantiles(arr, (0.25, 0.75))
         IQR = Q3 - Q1
         lower_bound = Q1 - threshold * IQR
         upper_bound = Q3 + threshold * IQR
-        return (series < lower_bound) | (series > upper_bound)
+        return pd.Series((arr < lower_bound) | (arr > upper_bound), index=series.index, name=series.name)
     
     elif method == "zscore":
-        mean = series.mean()
-        std = series.std()
+        arr = _to_float_array(series)
+        mean, std = _nan_mean_std(arr)
         if std == 0:
             return pd.Series([False] * len(series), index=series.index)
-        z_scores = (series - mean) / std
-        return z_scores.abs() > threshold
+        z_scores = np.abs((arr - mean) / std)
+        return pd.Series(z_scores > threshold, index=series.index, name=series.name)
     
     else:
         raise ValueError(f"Unknown method: {method}. Use 'iqr' or 'zscore'")
@@ -185,16 +276,13 @@ def normalize_series(
         return (series - min_val) / (max_val - min_val)
     
     elif method == "zscore":
-        mean = series.mean()
-        std = series.std()
+        mean, std = _nan_mean_std(_to_float_array(series))
         if std == 0:
             return pd.Series([0.0] * len(series), index=series.index)
         return (series - mean) / std
     
     elif method == "robust":
-        median = series.median()
-        Q1 = series.quantile(0.25)
-        Q3 = series.quantile(0.75)
+        Q1, median, Q3 = _partition_quantiles(_to_float_array(series), (0.25, 0.5, 0.75))
         IQR = Q3 - Q1
         if IQR == 0:
             return pd.Series([0.0] * len(series), index=series.index)
@@ -217,14 +305,16 @@ def encode_categorical(
     series : pd.Series
         Categorical series to encode
     method : str
-        Encoding method: 'label', 'onehot', 'frequency'
+        Encoding method: 'label', 'onehot', 'onehot_sparse', 'frequency'
     categories : list, optional
         Explicit category order for label encoding
         
     Returns
     -------
     pd.Series or pd.DataFrame
-        Encoded values (Series for label/frequency, DataFrame for onehot)
+        Encoded values (Series for label/frequency, uint8 DataFrame for
+        onehot, sparse uint8 DataFrame for onehot_sparse; use
+        ``.sparse.to_coo().tocsr()`` to pass it to scikit-learn)
         
     Example
     -------
@@ -243,7 +333,24 @@ def encode_categorical(
         return series.astype("category").cat.codes
     
     elif method == "onehot":
-        return pd.get_dummies(series, prefix=series.name)
+        return pd.get_dummies(series, prefix=series.name, dtype=np.uint8)
+    
+    elif method == "onehot_sparse":
+        if not HAS_SCIPY:
+            raise ImportError("scipy is required for method='onehot_sparse'")
+        # Same columns as get_dummies (sorted categories, NaN -> all zeros),
+        # but only non-zero entries are stored: O(n) instead of O(n x k)
+        codes, uniques = pd.factorize(series, sort=True)
+        rows = np.flatnonzero(codes >= 0)
+        matrix = sparse.csr_matrix(
+            (np.ones(rows.size, dtype=np.uint8), (rows, codes[rows])),
+            shape=(len(series), len(uniques)),
+        )
+        if series.name is not None:
+            columns = [f"{series.name}_{u}" for u in uniques]
+        else:
+            columns = list(uniques)
+        return pd.DataFrame.sparse.from_spmatrix(matrix, index=series.index, columns=columns)
     
     elif method == "frequency":
         freq = series.value_counts(normalize=True)
@@ -296,16 +403,19 @@ def validate_dataframe(
     
     # Check numeric columns
     if numeric_columns:
-        for col in numeric_columns:
-            if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+        present = [col for col in numeric_columns if col in df.columns]
+        is_numeric = df.dtypes[present].map(pd.api.types.is_numeric_dtype) if present else {}
+        for col in present:
+            if not is_numeric[col]:
                 errors.append(f"Column '{col}' must be numeric")
     
-    # Check non-null columns
+    # Check non-null columns (one isnull pass for all columns)
     if non_null_columns:
-        for col in non_null_columns:
-            if col in df.columns and df[col].isnull().any():
-                null_count = df[col].isnull().sum()
-                errors.append(f"Column '{col}' has {null_count} null values")
+        present = [col for col in non_null_columns if col in df.columns]
+        null_counts = df[present].isnull().sum() if present else {}
+        for col in present:
+            if null_counts[col]:
+                errors.append(f"Column '{col}' has {null_counts[col]} null values")
     
     is_valid = len(errors) == 0
     
@@ -341,6 +451,25 @@ def log_progress(
     log_func(f"{prefix}{message}")
 
 
+def ensure_datetime(series: pd.Series) -> pd.Series:
+    """
+    Convert series to datetime, skipping the parse if it already is datetime.
+    
+    Parameters
+    ----------
+    series : pd.Series
+        Date values (datetime64 or parseable strings)
+        
+    Returns
+    -------
+    pd.Series
+        Datetime series (same object if no conversion was needed)
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    return pd.to_datetime(series, cache=True)
+
+
 def calculate_recency(
     last_purchase_date: pd.Series,
     reference_date: Optional[datetime] = None
@@ -363,11 +492,17 @@ def calculate_recency(
     if reference_date is None:
         reference_date = datetime.now()
     
-    # Ensure datetime type
-    last_purchase_date = pd.to_datetime(last_purchase_date)
+    # Ensure datetime type (skip conversion if already datetime)
+    last_purchase_date = ensure_datetime(last_purchase_date)
+    
+    # Calculate days difference directly on datetime64 values
+    delta = pd.Timestamp(reference_date).to_datetime64() - last_purchase_date.to_numpy(dtype="datetime64[ns]")
+    days = delta.astype("timedelta64[D]").astype(np.float64)
+    days[np.isnat(delta)] = np.nan
     
-    # Calculate days difference
-    recency = (reference_date - last_purchase_date).dt.days
+    recency = pd.Series(days, index=last_purchase_date.index, name=last_purchase_date.name)
+    if not np.isnan(days).any():
+        recency = recency.astype(np.int64)
     
     return recency
 
@@ -394,6 +529,23 @@ def bin_values(
     pd.Series
         Binned categories
     """
+    # Fast path: explicit increasing edges + labels -> searchsorted, tanpa
+    # membangun IntervalIndex. Kasus lain (jumlah bin, tanpa label) via pd.cut.
+    if labels is not None and labels is not False and not isinstance(bins, int):
+        edges = np.asarray(bins, dtype=np.float64)
+        if edges.ndim == 1 and len(labels) == edges.size - 1 and np.all(np.diff(edges) > 0):
+            values = _to_float_array(series)
+            # Right-closed bins (a, b]; include_lowest puts values == edges[0] in bin 0
+            codes = np.searchsorted(edges, values, side="left") - 1
+            codes[values == edges[0]] = 0
+            codes[(codes < 0) | (codes >= edges.size - 1) | np.isnan(values)] = -1
+            categories = pd.CategoricalDtype(categories=list(labels), ordered=True)
+            return pd.Series(
+                pd.Categorical.from_codes(codes, dtype=categories),
+                index=series.index,
+                name=series.name,
+            )
+    
     return pd.cut(series, bins=bins, labels=labels, include_lowest=True)
 
 
@@ -411,8 +563,7 @@ def calculate_coefficient_of_variation(series: pd.Series) -> float:
     float
         Coefficient of variation (0 if mean is 0)
     """
-    mean = series.mean()
-    std = series.std()
+    mean, std = _nan_mean_std(_to_float_array(series))
     
     if mean == 0:
         return 0.0
@@ -443,7 +594,8 @@ def create_feature_summary(
         feature_columns = features_df.select_dtypes(include=[np.number]).columns.tolist()
     
     summary = features_df[feature_columns].describe()
-    summary.loc['missing'] = features_df[feature_columns].isnull().sum()
-    summary.loc['missing_pct'] = (features_df[feature_columns].isnull().sum() / len(features_df) * 100).round(2)
+    null_counts = features_df[feature_columns].isnull().sum()
+    summary.loc['missing'] = null_counts
+    summary.loc['missing_pct'] = (null_counts / len(features_df) * 100).round(2)
     
     return summary
@@ -1,6 +1,6 @@
 """MBA Algorithm Module"""
 from .apriori_runner import AprioriRunner
 from .fpgrowth_runner import FPGrowthRunner
-from .base_runner import BaseAlgorithmRunner
+from .base_runner import BaseAlgorithmRunner, ItemsetStore
 
-__all__ = ['AprioriRunner', 'FPGrowthRunner', 'BaseAlgorithmRunner']
+__all__ = ['AprioriRunner', 'FPGrowthRunner', 'BaseAlgorithmRunner', 'ItemsetStore']
@@ -9,10 +9,15 @@ Author: Project 2 - Sales Analytics
 Version: 1.0.0
 """
 
+import os
+import copy
 import pandas as pd
 import numpy as np
 import logging
-from typing import Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional, Dict, Any, List, Tuple
 from mlxtend.frequent_patterns import apriori, association_rules
 
 from .base_runner import BaseAlgorithmRunner
@@ -20,6 +25,51 @@ from .base_runner import BaseAlgorithmRunner
 logger = logging.getLogger(__name__)
 
 
+def _summarize_rules(support: float, n_itemsets: int, rules: pd.DataFrame) -> Dict[str, Any]:
+    """Summary row for run_with_multiple_supports."""
+    return {
+        'min_support': support,
+        'frequent_itemsets': n_itemsets,
+        'association_rules': len(rules),
+        'max_lift': rules['lift'].max() if len(rules) > 0 else 0,
+        'avg_confidence': rules['confidence'].mean() if len(rules) > 0 else 0
+    }
+
+
+def _mine_support_worker(
+    shm_name: str,
+    bits_shape: Tuple[int, int],
+    item_names: List[str],
+    item_counts: np.ndarray,
+    n_tx: int,
+    config
+) -> Dict[str, Any]:
+    """
+    Worker process: mine one support threshold on the shared bitset.
+    
+    The packed bit matrix lives in shared memory created by the parent,
+    so each worker maps it instead of receiving a pickled copy.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        bits = np.ndarray(bits_shape, dtype=np.uint64, buffer=shm.buf)
+        runner = AprioriRunner(config)
+        itemsets = runner._mine_bitsets(
+            bits,
+            item_names,
+            n_tx=n_tx,
+            min_support=config.min_support,
+            max_len=config.max_length,
+            use_numba=getattr(config, 'use_numba', False),
+            item_counts=item_counts
+        )
+        del bits
+        rules = runner._generate_rules(itemsets, lightweight=True)
+        return _summarize_rules(config.min_support, len(itemsets), rules)
+    finally:
+        shm.close()
+
+
 class AprioriRunner(BaseAlgorithmRunner):
     """
     Apriori algorithm implementation for Market Basket Analysis.
@@ -62,26 +112,44 @@ class AprioriRunner(BaseAlgorithmRunner):
             basket_matrix: Binary encoded transaction matrix
             
         Returns:
-            DataFrame with columns: ['support', 'itemsets']
+            DataFrame with columns: ['support', 'itemsets', 'length'],
+            in mining order (run() sorts by support when needed)
         """
         try:
-            # Run Apriori
-            frequent_itemsets = apriori(
-                basket_matrix,
-                min_support=self.config.min_support,
-                use_colnames=True,
-                max_len=self.config.max_length,
-                verbose=0
-            )
+            if getattr(self.config, 'use_bitset_miner', False):
+                # Apriori on packed uint64 bit-vectors (AND + popcount)
+                bits, item_names, item_counts = self._to_bitsets(basket_matrix)
+                frequent_itemsets = self._mine_bitsets(
+                    bits,
+                    item_names,
+                    n_tx=len(basket_matrix),
+                    min_support=self.config.min_support,
+                    max_len=self.config.max_length,
+                    use_numba=getattr(self.config, 'use_numba', False),
+                    item_counts=item_counts
+                )
+            else:
+                # Buang item yang tidak frequent sendiri (downward closure)
+                candidates = self._prefilter_items(basket_matrix, self.config.min_support)
+                if candidates.shape[1] == 0:
+                    frequent_itemsets = pd.DataFrame(columns=['support', 'itemsets'])
+                else:
+                    # Run Apriori
+                    frequent_itemsets = apriori(
+                        candidates,
+                        min_support=self.config.min_support,
+                        use_colnames=True,
+                        max_len=self.config.max_length,
+                        verbose=0
+                    )
             
-            # Add itemset length
-            frequent_itemsets['length'] = frequent_itemsets['itemsets'].apply(len)
-            
-            # Sort by support
-            frequent_itemsets = frequent_itemsets.sort_values(
-                'support', 
-                ascending=False
-            ).reset_index(drop=True)
+            # Add itemset length (bitset miner already emits it per level)
+            if 'length' not in frequent_itemsets.columns:
+                frequent_itemsets['length'] = np.fromiter(
+                    map(len, frequent_itemsets['itemsets']),
+                    dtype=np.int32,
+                    count=len(frequent_itemsets)
+                )
             
             return frequent_itemsets
             
@@ -89,12 +157,18 @@ class AprioriRunner(BaseAlgorithmRunner):
             logger.error(f"Apriori failed: {str(e)}")
             raise
     
-    def _generate_rules(self, frequent_itemsets: pd.DataFrame) -> pd.DataFrame:
+    def _generate_rules(
+        self, 
+        frequent_itemsets: pd.DataFrame,
+        lightweight: bool = False
+    ) -> pd.DataFrame:
         """
         Generate association rules from frequent itemsets.
         
         Args:
             frequent_itemsets: DataFrame from Apriori
+            lightweight: Only return the lift-filtered mlxtend metrics
+                (skip string formatting, extra metrics and sorting)
             
         Returns:
             DataFrame with association rules and metrics
@@ -103,6 +177,9 @@ class AprioriRunner(BaseAlgorithmRunner):
             logger.warning("No frequent itemsets found, cannot generate rules")
             return pd.DataFrame()
         
+        # Duplicate itemset rows would yield duplicate rules downstream
+        frequent_itemsets = self._dedupe_itemsets(frequent_itemsets)
+        
         try:
             # Generate rules using confidence metric
             rules = association_rules(
@@ -112,8 +189,14 @@ class AprioriRunner(BaseAlgorithmRunner):
                 num_itemsets=len(frequent_itemsets)
             )
             
-            # Filter by lift
-            rules = rules[rules['lift'] >= self.config.min_lift]
+            # Filter by lift: positional take, no boolean mask over every
+            # column; the result is a new frame, so the formatting steps
+            # below can add columns to it without a copy
+            keep = np.flatnonzero(rules['lift'].to_numpy() >= self.config.min_lift)
+            rules = rules.take(keep)
+            
+            if lightweight:
+                return rules
             
             # Add formatted columns
             rules = self._add_formatted_columns(rules)
@@ -127,76 +210,117 @@ class AprioriRunner(BaseAlgorithmRunner):
             logger.error(f"Rule generation failed: {str(e)}")
             raise
     
-    def _add_formatted_columns(self, rules: pd.DataFrame) -> pd.DataFrame:
-        """Add human-readable formatted columns to rules."""
-        df = rules.copy()
-        
-        # Format antecedents and consequents as strings
-        df['antecedents_str'] = df['antecedents'].apply(
-            lambda x: ', '.join(sorted(str(i) for i in x))
-        )
-        df['consequents_str'] = df['consequents'].apply(
-            lambda x: ', '.join(sorted(str(i) for i in x))
-        )
-        
-        # Format full rule
-        df['rule_str'] = df.apply(
-            lambda row: f"{row['antecedents_str']} -> {row['consequents_str']}",
-            axis=1
-        )
-        
-        # Add itemset sizes
-        df['antecedent_size'] = df['antecedents'].apply(len)
-        df['consequent_size'] = df['consequents'].apply(len)
-        df['rule_size'] = df['antecedent_size'] + df['consequent_size']
-        
-        return df
-    
     def run_with_multiple_supports(
         self, 
         basket_matrix: pd.DataFrame,
-        support_values: list = [0.005, 0.01, 0.02, 0.05]
+        support_values: list = [0.005, 0.01, 0.02, 0.05],
+        max_workers: Optional[int] = None
     ) -> pd.DataFrame:
         """
         Run Apriori with multiple support thresholds for comparison.
         
+        With the bitset miner and config.parallel_supports enabled, all but
+        the last threshold are mined in worker processes sharing the packed
+        bitset via multiprocessing.shared_memory; the last one runs here so
+        self.rules / self.frequent_itemsets end up as in the serial loop.
+        
         Args:
             basket_matrix: Binary encoded transaction matrix
             support_values: List of support thresholds to try
+            max_workers: Worker count for the parallel path
+                (default: min(len(support_values) - 1, cpu_count))
             
         Returns:
             DataFrame comparing results across thresholds
         """
-        results = []
+        use_bitsets = getattr(self.config, 'use_bitset_miner', False)
         
-        for support in support_values:
-            try:
-                # Update config temporarily
-                original_support = self.config.min_support
-                self.config.min_support = support
-                
-                # Run algorithm
-                itemsets, rules = self.run(basket_matrix)
-                
-                results.append({
-                    'min_support': support,
-                    'frequent_itemsets': len(itemsets),
-                    'association_rules': len(rules),
-                    'max_lift': rules['lift'].max() if len(rules) > 0 else 0,
-                    'avg_confidence': rules['confidence'].mean() if len(rules) > 0 else 0
-                })
+        # Pack bitsets sekali; setiap run() memakai cache yang sama
+        if use_bitsets:
+            self._to_bitsets(basket_matrix)
+        
+        if use_bitsets and getattr(self.config, 'parallel_supports', False) and len(support_values) > 1:
+            return self._run_supports_parallel(basket_matrix, support_values, max_workers)
+        
+        results = [self._run_single_support(basket_matrix, support) for support in support_values]
+        
+        return pd.DataFrame(results)
+    
+    def _run_single_support(self, basket_matrix: pd.DataFrame, support: float) -> Dict[str, Any]:
+        """Run the full lightweight mine for one threshold in this process."""
+        original_support = self.config.min_support
+        try:
+            # Update config temporarily
+            self.config.min_support = support
+            
+            # Run algorithm
+            itemsets, rules = self.run(basket_matrix, lightweight=True)
+            
+            return _summarize_rules(support, len(itemsets), rules)
+            
+        except Exception as e:
+            logger.warning(f"Failed for support={support}: {str(e)}")
+            return _summarize_rules(support, 0, pd.DataFrame())
+        
+        finally:
+            # Restore original config
+            self.config.min_support = original_support
+    
+    def _run_supports_parallel(
+        self,
+        basket_matrix: pd.DataFrame,
+        support_values: list,
+        max_workers: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Mine each support threshold in a separate process on a shared bitset.
+        
+        Workers are started with the spawn context: a forked child of a
+        process that already ran the Numba parallel kernels can hang the
+        interpreter at exit.
+        """
+        bits, item_names, item_counts = self._to_bitsets(basket_matrix)
+        *pool_supports, last_support = support_values
+        n_workers = max_workers or min(len(pool_supports), os.cpu_count() or 1)
+        
+        shm = shared_memory.SharedMemory(create=True, size=max(bits.nbytes, 1))
+        try:
+            shared_bits = np.ndarray(bits.shape, dtype=np.uint64, buffer=shm.buf)
+            shared_bits[:] = bits
+            del shared_bits
+            
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = []
+                for support in pool_supports:
+                    worker_config = copy.copy(self.config)
+                    worker_config.min_support = support
+                    futures.append(executor.submit(
+                        _mine_support_worker,
+                        shm.name,
+                        bits.shape,
+                        item_names,
+                        item_counts,
+                        len(basket_matrix),
+                        worker_config
+                    ))
                 
-                # Restore original config
-                self.config.min_support = original_support
+                # Threshold terakhir di proses ini (sambil worker jalan) agar
+                # state runner sama dengan loop serial
+                last_result = self._run_single_support(basket_matrix, last_support)
                 
-            except Exception as e:
-                logger.warning(f"Failed for support={support}: {str(e)}")
-                results.append({
-                    'min_support': support,
-                    'frequent_itemsets': 0,
-                    'association_rules': 0,
-                    'max_lift': 0,
-                    'avg_confidence': 0
-                })
+                results = []
+                for support, future in zip(pool_supports, futures):
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        logger.warning(f"Failed for support={support}: {str(e)}")
+                        results.append(_summarize_rules(support, 0, pd.DataFrame()))
+                results.append(last_result)
+        finally:
+            shm.close()
+            shm.unlink()
         
         return pd.DataFrame(results)
@@ -11,13 +11,114 @@ Version: 1.0.0
 
 import pandas as pd
 import numpy as np
+import time
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, Tuple
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Tuple, List, Iterable, FrozenSet
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from ._apriori_numba import HAS_NUMBA
+
+if HAS_NUMBA:
+    from ._apriori_numba import prefix_join, count_supports
+
 logger = logging.getLogger(__name__)
 
+# Popcount per uint64 word; np.bitwise_count tersedia sejak NumPy 2.0
+if hasattr(np, "bitwise_count"):
+    def _popcount_rows(words: np.ndarray) -> np.ndarray:
+        """Count set bits per row of a 2D uint64 array."""
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount_rows(words: np.ndarray) -> np.ndarray:
+        """Count set bits per row of a 2D uint64 array."""
+        as_bytes = np.ascontiguousarray(words).view(np.uint8)
+        return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+@dataclass
+class ItemsetStore:
+    """
+    Columnar (CSR) view of frequent itemsets.
+    
+    Items of row i are values[offsets[i]:offsets[i + 1]] (ids into vocab),
+    so length and membership queries are NumPy operations instead of
+    Python calls on frozensets. When the vocabulary fits in 64 items each
+    itemset is also stored as a uint64 bitmask.
+    
+    Example:
+        >>> store = runner.get_itemset_store()
+        >>> store.lengths()
+        >>> runner.frequent_itemsets[store.contains('Product A')]
+    """
+    offsets: np.ndarray
+    values: np.ndarray
+    vocab: List[Any]
+    masks: Optional[np.ndarray] = None
+    
+    @classmethod
+    def from_itemsets(cls, itemsets: Iterable[FrozenSet]) -> 'ItemsetStore':
+        """Build the store from an iterable of frozensets."""
+        item_ids: Dict[Any, int] = {}
+        values = []
+        offsets = [0]
+        
+        for itemset in itemsets:
+            for item in itemset:
+                values.append(item_ids.setdefault(item, len(item_ids)))
+            offsets.append(len(values))
+        
+        offsets = np.asarray(offsets, dtype=np.int32)
+        values = np.asarray(values, dtype=np.int32)
+        
+        masks = None
+        if len(item_ids) <= 64:
+            rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+            masks = np.zeros(len(offsets) - 1, dtype=np.uint64)
+            np.bitwise_or.at(masks, rows, np.left_shift(np.uint64(1), values.astype(np.uint64)))
+        
+        return cls(offsets=offsets, values=values, vocab=list(item_ids), masks=masks)
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def lengths(self) -> np.ndarray:
+        """Number of items per itemset."""
+        return np.diff(self.offsets)
+    
+    def contains(self, item: Any) -> np.ndarray:
+        """Boolean mask of itemsets that contain item."""
+        try:
+            item_id = self.vocab.index(item)
+        except ValueError:
+            return np.zeros(len(self), dtype=bool)
+        
+        if self.masks is not None:
+            return (self.masks >> np.uint64(item_id)) & np.uint64(1) == 1
+        
+        found = np.zeros(len(self), dtype=bool)
+        rows = np.repeat(np.arange(len(self)), self.lengths())
+        found[rows[self.values == item_id]] = True
+        return found
+    
+    def to_frozensets(self) -> List[FrozenSet]:
+        """Materialize the itemsets back into frozensets."""
+        vocab = np.asarray(self.vocab, dtype=object)
+        return [
+            frozenset(vocab[self.values[start:end]])
+            for start, end in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+
 
 class BaseAlgorithmRunner(ABC):
     """
@@ -46,6 +147,12 @@ class BaseAlgorithmRunner(ABC):
         self.performance_metrics: Dict[str, Any] = {}
         self.algorithm_name: str = "base"
         
+        # Packed bitsets per basket matrix: (id, n_tx, n_items) -> (bits, names, item_counts)
+        self._bitset_cache: Dict[Tuple[int, int, int], Tuple[np.ndarray, List[str], np.ndarray]] = {}
+        self._bitset_source: Optional[pd.DataFrame] = None
+        self._itemset_store: Optional[ItemsetStore] = None
+        self._itemset_store_source: Optional[pd.DataFrame] = None
+        
     @abstractmethod
     def _run_frequent_itemsets(self, basket_matrix: pd.DataFrame) -> pd.DataFrame:
         """
@@ -56,58 +163,269 @@ class BaseAlgorithmRunner(ABC):
             
         Returns:
             DataFrame with frequent itemsets and support values
+            (unsorted; run() sorts by support)
         """
         pass
     
     @abstractmethod
-    def _generate_rules(self, frequent_itemsets: pd.DataFrame) -> pd.DataFrame:
+    def _generate_rules(
+        self, 
+        frequent_itemsets: pd.DataFrame,
+        lightweight: bool = False
+    ) -> pd.DataFrame:
         """
         Generate association rules from frequent itemsets.
         
         Args:
             frequent_itemsets: DataFrame from frequent itemset mining
+            lightweight: Skip formatting/extra metrics, numeric columns only
             
         Returns:
             DataFrame with association rules
         """
         pass
     
-    def run(
+    def _to_bitsets(
         self, 
         basket_matrix: pd.DataFrame
+    ) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """
+        Pack basket matrix into vertical per-item bit-vectors.
+        
+        Each item gets one row of uint64 words with one bit per transaction,
+        so support counting becomes AND + popcount over n_tx / 64 words
+        instead of a scan over the dense 0/1 matrix.
+        
+        The result is cached for the last basket matrix seen, so repeated
+        runs (e.g. run_with_multiple_supports) pack it only once. The matrix
+        must not be modified in place between runs.
+        
+        Args:
+            basket_matrix: Binary encoded transaction matrix
+            
+        Returns:
+            Tuple of (bits with shape (n_items, ceil(n_tx / 64)), item_names,
+            item_counts with the number of transactions per item)
+        """
+        key = (id(basket_matrix), basket_matrix.shape[0], basket_matrix.shape[1])
+        if key in self._bitset_cache:
+            return self._bitset_cache[key]
+        
+        n_tx = len(basket_matrix)
+        n_words = (n_tx + 63) // 64
+        
+        packed = np.packbits(
+            basket_matrix.to_numpy(dtype=bool).T, axis=1, bitorder='little'
+        )
+        padding = n_words * 8 - packed.shape[1]
+        if padding:
+            packed = np.pad(packed, ((0, 0), (0, padding)))
+        
+        bits = np.ascontiguousarray(packed).view(np.uint64)
+        item_counts = _popcount_rows(bits)
+        
+        # Simpan satu entry saja; referensi ke matrix menjaga id() tetap valid
+        self._bitset_cache = {key: (bits, list(basket_matrix.columns), item_counts)}
+        self._bitset_source = basket_matrix
+        
+        return self._bitset_cache[key]
+    
+    def _prefilter_items(
+        self, 
+        basket_matrix: pd.DataFrame, 
+        min_support: float
+    ) -> pd.DataFrame:
+        """
+        Drop items that are infrequent on their own (downward closure).
+        
+        No itemset containing such an item can reach min_support, so the
+        miner never needs to see those columns. Column order is kept.
+        
+        Args:
+            basket_matrix: Binary encoded transaction matrix
+            min_support: Minimum support threshold
+            
+        Returns:
+            basket_matrix restricted to frequent single items
+        """
+        n_tx = len(basket_matrix)
+        if n_tx == 0:
+            return basket_matrix
+        
+        item_support = np.count_nonzero(basket_matrix.to_numpy(), axis=0) / n_tx
+        keep = item_support >= min_support
+        
+        if keep.all():
+            return basket_matrix
+        
+        logger.info(f"   Pre-filter: {int(keep.sum()):,} of {len(keep):,} items meet min_support")
+        return basket_matrix.iloc[:, np.flatnonzero(keep)]
+    
+    def _mine_bitsets(
+        self,
+        bits: np.ndarray,
+        item_names: List[str],
+        n_tx: int,
+        min_support: float,
+        max_len: Optional[int] = None,
+        use_numba: bool = False,
+        item_counts: Optional[np.ndarray] = None
+    ) -> pd.DataFrame:
+        """
+        Level-wise (Apriori) frequent itemset mining on packed bit-vectors.
+        
+        Candidates of size k+1 are built by joining frequent k-itemsets that
+        share the same first k-1 items; support is the popcount of the AND
+        of their transaction bit-vectors.
+        
+        Args:
+            bits: Packed item bit-vectors from _to_bitsets()
+            item_names: Column names matching the rows of bits
+            n_tx: Number of transactions
+            min_support: Minimum support threshold
+            max_len: Maximum itemset length (None = unlimited)
+            use_numba: Use the compiled join/count kernels (needs numba)
+            item_counts: Precomputed per-item transaction counts (optional)
+            
+        Returns:
+            DataFrame with columns: ['support', 'itemsets', 'length']
+        """
+        if use_numba and not HAS_NUMBA:
+            logger.warning("numba not installed, using NumPy bitset miner")
+            use_numba = False
+        
+        if n_tx == 0 or len(item_names) == 0:
+            return pd.DataFrame(columns=['support', 'itemsets', 'length'])
+        
+        supports = []
+        lengths = []
+        itemsets = []
+        
+        # Level 1: frequent single items (downward closure prunes the rest)
+        if item_counts is None:
+            item_counts = _popcount_rows(bits)
+        item_support = item_counts / n_tx
+        level_items = np.flatnonzero(item_support >= min_support).reshape(-1, 1)
+        level_bits = bits[level_items[:, 0]]
+        level_support = item_support[level_items[:, 0]]
+        k = 1
+        
+        while len(level_items) > 0:
+            supports.append(level_support)
+            lengths.append(np.full(len(level_support), k, dtype=np.int32))
+            itemsets.extend(level_items)
+            
+            if max_len is not None and k >= max_len:
+                break
+            
+            if use_numba:
+                left, right = prefix_join(level_items)
+                if len(left) == 0:
+                    break
+                
+                # Hitung support dulu, materialisasi bit-vector hanya untuk
+                # kandidat yang lolos min_support
+                last_items = level_items[right, -1]
+                cand_support = count_supports(level_bits, bits, left, last_items) / n_tx
+                keep = np.flatnonzero(cand_support >= min_support)
+                left, last_items = left[keep], last_items[keep]
+                
+                level_items = np.column_stack([level_items[left], last_items])
+                level_bits = level_bits[left] & bits[last_items]
+                level_support = cand_support[keep]
+                k += 1
+                continue
+            
+            # Prefix join: itemset disimpan terurut, jadi itemset dengan
+            # prefix (k-1) yang sama berada berdampingan
+            left, right = [], []
+            start = 0
+            n_level = len(level_items)
+            while start < n_level:
+                end = start + 1
+                while end < n_level and np.array_equal(
+                    level_items[end, :-1], level_items[start, :-1]
+                ):
+                    end += 1
+                for i in range(start, end - 1):
+                    left.extend([i] * (end - i - 1))
+                    right.extend(range(i + 1, end))
+                start = end
+            
+            if not left:
+                break
+            
+            left = np.asarray(left, dtype=np.intp)
+            right = np.asarray(right, dtype=np.intp)
+            last_items = level_items[right, -1]
+            
+            cand_bits = level_bits[left] & bits[last_items]
+            cand_support = _popcount_rows(cand_bits) / n_tx
+            keep = cand_support >= min_support
+            
+            level_items = np.column_stack([level_items[left], last_items])[keep]
+            level_bits = cand_bits[keep]
+            level_support = cand_support[keep]
+            k += 1
+        
+        if not supports:
+            return pd.DataFrame(columns=['support', 'itemsets', 'length'])
+        
+        names = np.asarray(item_names, dtype=object)
+        return pd.DataFrame({
+            'support': np.concatenate(supports),
+            'itemsets': [frozenset(names[idx]) for idx in itemsets],
+            'length': np.concatenate(lengths)
+        })
+    
+    def run(
+        self, 
+        basket_matrix: pd.DataFrame,
+        lightweight: bool = False
     ) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
         Execute complete association rule mining pipeline.
         
         Args:
             basket_matrix: Binary encoded transaction matrix
+            lightweight: Generate rules with numeric mlxtend columns only
+                (no formatted strings or extra metrics) and leave the
+                itemsets unsorted
             
         Returns:
             Tuple of (frequent_itemsets, association_rules)
         """
         logger.info(f"Running {self.algorithm_name} algorithm...")
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         # Step 1: Find frequent itemsets
         logger.info("   Step 1: Finding frequent itemsets...")
-        itemset_start = datetime.now()
+        itemset_start = time.perf_counter()
         
         self.frequent_itemsets = self._run_frequent_itemsets(basket_matrix)
         
-        itemset_time = (datetime.now() - itemset_start).total_seconds()
+        # Full sort only for the complete result; lightweight runs only need
+        # counts, and get_top_itemsets() uses nlargest
+        if not lightweight:
+            self.frequent_itemsets = self.frequent_itemsets.sort_values(
+                'support', 
+                ascending=False
+            ).reset_index(drop=True)
+        
+        itemset_time = time.perf_counter() - itemset_start
         logger.info(f"   Found {len(self.frequent_itemsets):,} frequent itemsets in {itemset_time:.2f}s")
         
         # Step 2: Generate association rules
         logger.info("   Step 2: Generating association rules...")
-        rules_start = datetime.now()
+        rules_start = time.perf_counter()
         
-        self.rules = self._generate_rules(self.frequent_itemsets)
+        self.rules = self._generate_rules(self.frequent_itemsets, lightweight=lightweight)
         
-        rules_time = (datetime.now() - rules_start).total_seconds()
+        rules_time = time.perf_counter() - rules_start
         logger.info(f"   Generated {len(self.rules):,} rules in {rules_time:.2f}s")
         
         # Calculate performance metrics
-        total_time = (datetime.now() - start_time).total_seconds()
+        total_time = time.perf_counter() - start_time
         self._calculate_performance_metrics(
             basket_matrix, 
             itemset_time, 
@@ -117,6 +435,95 @@ class BaseAlgorithmRunner(ABC):
         
         return self.frequent_itemsets, self.rules
     
+    def _dedupe_itemsets(self, frequent_itemsets: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop repeated itemsets before rule generation.
+        
+        mlxtend emits each antecedent/consequent split of an itemset once, so
+        duplicate rules can only come from duplicate itemset rows (e.g. frames
+        concatenated from several runs). Deduplicating the itemsets (hashing
+        the frozensets) is far cheaper than deduplicating the rules.
+        
+        Args:
+            frequent_itemsets: DataFrame with an 'itemsets' column
+            
+        Returns:
+            DataFrame keeping the first occurrence of each itemset
+        """
+        duplicated = frequent_itemsets['itemsets'].duplicated().to_numpy()
+        if not duplicated.any():
+            return frequent_itemsets
+        
+        logger.info(f"   Dropping {int(duplicated.sum()):,} duplicate itemsets")
+        return frequent_itemsets[~duplicated]
+    
+    def _add_formatted_columns(self, rules: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add human-readable formatted columns to rules.
+        
+        Each distinct itemset is formatted once: an antecedent appears in
+        many rules, so the sorted/joined string is memoized per frozenset
+        (and str() per item). With pyarrow installed the string columns are
+        Arrow-backed (string[pyarrow]) and the rule string join runs in an
+        Arrow compute kernel; size columns are int8.
+        
+        Columns are added to rules in place (no defensive copy); callers
+        pass the frame freshly returned by association_rules.
+        
+        Args:
+            rules: Association rules with frozenset antecedents/consequents
+            
+        Returns:
+            The same DataFrame with *_str and *_size columns added
+        """
+        df = rules
+        
+        item_str: Dict[Any, str] = {}
+        itemset_str: Dict[FrozenSet, str] = {}
+        
+        def format_items(items: FrozenSet) -> str:
+            text = itemset_str.get(items)
+            if text is None:
+                names = []
+                for item in items:
+                    name = item_str.get(item)
+                    if name is None:
+                        name = item_str[item] = str(item)
+                    names.append(name)
+                text = itemset_str[items] = ', '.join(sorted(names))
+            return text
+        
+        # Format antecedents, consequents and full rule as strings
+        ant_str = [format_items(x) for x in df['antecedents']]
+        cons_str = [format_items(x) for x in df['consequents']]
+        
+        if HAS_PYARROW:
+            # Arrow-backed string columns: contiguous buffers instead of
+            # one Python str object per cell; rule_str stays in Arrow
+            ant_arr = pa.array(ant_str, type=pa.string())
+            cons_arr = pa.array(cons_str, type=pa.string())
+            rule_arr = pc.binary_join_element_wise(ant_arr, cons_arr, ' -> ')
+            df['antecedents_str'] = pd.arrays.ArrowStringArray(ant_arr)
+            df['consequents_str'] = pd.arrays.ArrowStringArray(cons_arr)
+            df['rule_str'] = pd.arrays.ArrowStringArray(rule_arr)
+        else:
+            df['antecedents_str'] = ant_str
+            df['consequents_str'] = cons_str
+            df['rule_str'] = df['antecedents_str'] + ' -> ' + df['consequents_str']
+        
+        # Add itemset sizes (int8: itemsets never exceed config.max_length)
+        # Satu pass untuk antecedent + consequent
+        sizes = np.fromiter(
+            ((len(a), len(c)) for a, c in zip(df['antecedents'], df['consequents'])),
+            dtype=np.dtype([('ant', np.int8), ('cons', np.int8)]),
+            count=len(df)
+        )
+        df['antecedent_size'] = sizes['ant']
+        df['consequent_size'] = sizes['cons']
+        df['rule_size'] = sizes['ant'] + sizes['cons']
+        
+        return df
+    
     def _calculate_performance_metrics(
         self,
         basket_matrix: pd.DataFrame,
@@ -125,6 +532,18 @@ class BaseAlgorithmRunner(ABC):
         total_time: float
     ) -> None:
         """Calculate and store performance metrics."""
+        n_cells = basket_matrix.shape[0] * basket_matrix.shape[1]
+        key = (id(basket_matrix), basket_matrix.shape[0], basket_matrix.shape[1])
+        
+        # Matrix biner: density = jumlah sel bernilai 1 / total sel. Pakai
+        # popcount dari bitset cache kalau ada, tanpa scan ulang matrix.
+        if n_cells == 0:
+            density = float('nan')
+        elif key in self._bitset_cache:
+            density = int(self._bitset_cache[key][2].sum()) / n_cells
+        else:
+            density = np.count_nonzero(basket_matrix.to_numpy()) / n_cells
+        
         self.performance_metrics = {
             'algorithm': self.algorithm_name,
             'parameters': {
@@ -136,7 +555,7 @@ class BaseAlgorithmRunner(ABC):
             'input': {
                 'transactions': len(basket_matrix),
                 'products': len(basket_matrix.columns),
-                'matrix_density': basket_matrix.values.mean()
+                'matrix_density': density
             },
             'output': {
                 'frequent_itemsets': len(self.frequent_itemsets) if self.frequent_itemsets is not None else 0,
@@ -205,14 +624,46 @@ class BaseAlgorithmRunner(ABC):
         if self.frequent_itemsets is None:
             raise ValueError("No frequent itemsets found. Run algorithm first.")
         
-        df = self.frequent_itemsets.copy()
-        df['length'] = df['itemsets'].apply(len)
+        df = self.frequent_itemsets
+        if 'length' not in df.columns:
+            df = df.assign(length=np.fromiter(map(len, df['itemsets']), dtype=np.int32, count=len(df)))
         
         return {
             length: group.drop('length', axis=1)
             for length, group in df.groupby('length')
         }
     
+    def get_itemset_store(self) -> ItemsetStore:
+        """
+        Columnar view of the frequent itemsets, row-aligned with
+        self.frequent_itemsets. Built on first use and cached until the
+        itemsets are replaced by another run.
+        
+        Returns:
+            ItemsetStore for the current frequent itemsets
+        """
+        if self.frequent_itemsets is None:
+            raise ValueError("No frequent itemsets found. Run algorithm first.")
+        
+        if self._itemset_store_source is not self.frequent_itemsets:
+            self._itemset_store = ItemsetStore.from_itemsets(self.frequent_itemsets['itemsets'])
+            self._itemset_store_source = self.frequent_itemsets
+        
+        return self._itemset_store
+    
+    def get_itemsets_containing(self, item: Any) -> pd.DataFrame:
+        """
+        Get frequent itemsets that contain a specific item.
+        
+        Args:
+            item: Product to look for
+            
+        Returns:
+            DataFrame with matching itemsets
+        """
+        store = self.get_itemset_store()
+        return self.frequent_itemsets[store.contains(item)]
+    
     def get_top_itemsets(self, n: int = 20) -> pd.DataFrame:
         """
         Get top N frequent itemsets by support.
@@ -12,9 +12,16 @@ Version: 1.0.0
 import pandas as pd
 import numpy as np
 import logging
-from typing import Optional
+from collections import defaultdict
+from typing import Optional, Dict
 from mlxtend.frequent_patterns import fpgrowth, association_rules
 
+try:
+    import numexpr as ne
+    HAS_NUMEXPR = True
+except ImportError:
+    HAS_NUMEXPR = False
+
 from .base_runner import BaseAlgorithmRunner
 
 logger = logging.getLogger(__name__)
@@ -54,6 +61,11 @@ class FPGrowthRunner(BaseAlgorithmRunner):
         super().__init__(config)
         self.algorithm_name = "fpgrowth"
         
+        # Inverted index item -> row positions in self.rules (lift order)
+        self._ant_index: Dict[str, np.ndarray] = {}
+        self._cons_index: Dict[str, np.ndarray] = {}
+        self._indexed_rules: Optional[pd.DataFrame] = None
+        
     def _run_frequent_itemsets(self, basket_matrix: pd.DataFrame) -> pd.DataFrame:
         """
         Run FP-Growth algorithm to find frequent itemsets.
@@ -62,7 +74,8 @@ class FPGrowthRunner(BaseAlgorithmRunner):
             basket_matrix: Binary encoded transaction matrix
             
         Returns:
-            DataFrame with columns: ['support', 'itemsets']
+            DataFrame with columns: ['support', 'itemsets', 'length'],
+            in mining order (run() sorts by support when needed)
         """
         try:
             # Run FP-Growth
@@ -75,13 +88,11 @@ class FPGrowthRunner(BaseAlgorithmRunner):
             )
             
             # Add itemset length
-            frequent_itemsets['length'] = frequent_itemsets['itemsets'].apply(len)
-            
-            # Sort by support
-            frequent_itemsets = frequent_itemsets.sort_values(
-                'support', 
-                ascending=False
-            ).reset_index(drop=True)
+            frequent_itemsets['length'] = np.fromiter(
+                map(len, frequent_itemsets['itemsets']),
+                dtype=np.int32,
+                count=len(frequent_itemsets)
+            )
             
             return frequent_itemsets
             
@@ -89,12 +100,18 @@ class FPGrowthRunner(BaseAlgorithmRunner):
             logger.error(f"FP-Growth failed: {str(e)}")
             raise
     
-    def _generate_rules(self, frequent_itemsets: pd.DataFrame) -> pd.DataFrame:
+    def _generate_rules(
+        self, 
+        frequent_itemsets: pd.DataFrame,
+        lightweight: bool = False
+    ) -> pd.DataFrame:
         """
         Generate association rules from frequent itemsets.
         
         Args:
             frequent_itemsets: DataFrame from FP-Growth
+            lightweight: Only return the lift-filtered mlxtend metrics
+                (skip string formatting, extra metrics and sorting)
             
         Returns:
             DataFrame with association rules and metrics
@@ -103,6 +120,9 @@ class FPGrowthRunner(BaseAlgorithmRunner):
             logger.warning("No frequent itemsets found, cannot generate rules")
             return pd.DataFrame()
         
+        # Duplicate itemset rows would yield duplicate rules downstream
+        frequent_itemsets = self._dedupe_itemsets(frequent_itemsets)
+        
         # Filter to itemsets with length >= 2 for rules
         itemsets_for_rules = frequent_itemsets[frequent_itemsets['length'] >= 2]
         
@@ -119,8 +139,14 @@ class FPGrowthRunner(BaseAlgorithmRunner):
                 num_itemsets=len(frequent_itemsets)
             )
             
-            # Filter by lift
-            rules = rules[rules['lift'] >= self.config.min_lift]
+            # Filter by lift: positional take, no boolean mask over every
+            # column; the result is a new frame, so the formatting steps
+            # below can add columns to it without a copy
+            keep = np.flatnonzero(rules['lift'].to_numpy() >= self.config.min_lift)
+            rules = rules.take(keep)
+            
+            if lightweight:
+                return rules
             
             # Add formatted columns
             rules = self._add_formatted_columns(rules)
@@ -131,76 +157,100 @@ class FPGrowthRunner(BaseAlgorithmRunner):
             # Sort by lift descending
             rules = rules.sort_values('lift', ascending=False).reset_index(drop=True)
             
+            self._build_item_index(rules)
+            
             return rules
             
         except Exception as e:
             logger.error(f"Rule generation failed: {str(e)}")
             raise
     
-    def _add_formatted_columns(self, rules: pd.DataFrame) -> pd.DataFrame:
-        """Add human-readable formatted columns to rules."""
-        df = rules.copy()
-        
-        # Format antecedents and consequents as strings
-        df['antecedents_str'] = df['antecedents'].apply(
-            lambda x: ', '.join(sorted(str(i) for i in x))
-        )
-        df['consequents_str'] = df['consequents'].apply(
-            lambda x: ', '.join(sorted(str(i) for i in x))
-        )
-        
-        # Format full rule
-        df['rule_str'] = df.apply(
-            lambda row: f"{row['antecedents_str']} -> {row['consequents_str']}",
-            axis=1
-        )
-        
-        # Add itemset sizes
-        df['antecedent_size'] = df['antecedents'].apply(len)
-        df['consequent_size'] = df['consequents'].apply(len)
-        df['rule_size'] = df['antecedent_size'] + df['consequent_size']
-        
-        return df
-    
     def _add_additional_metrics(
         self, 
         rules: pd.DataFrame, 
         total_itemsets: int
     ) -> pd.DataFrame:
-        """Add additional evaluation metrics to rules."""
-        df = rules.copy()
-        
-        # Conviction: (1 - consequent_support) / (1 - confidence)
-        # High conviction = strong rule
-        df['conviction'] = np.where(
-            df['confidence'] < 1,
-            (1 - df['consequent support']) / (1 - df['confidence']),
-            np.inf
-        )
-        
-        # Leverage: support - (antecedent_support * consequent_support)
-        # Positive = more co-occurrence than expected
-        df['leverage'] = (
-            df['support'] - 
-            (df['antecedent support'] * df['consequent support'])
-        )
-        
-        # Kulczynski: (confidence + consequent_confidence) / 2
-        # Where consequent_confidence = support / consequent_support
-        df['kulczynski'] = 0.5 * (
-            df['confidence'] + 
-            df['support'] / df['consequent support']
-        )
-        
-        # Imbalance Ratio
-        df['imbalance_ratio'] = abs(
-            df['antecedent support'] - df['consequent support']
-        ) / (
-            df['antecedent support'] + df['consequent support'] - df['support']
-        )
+        """Add additional evaluation metrics to rules (modifies rules in place)."""
+        df = rules
+        
+        # Baca kolom input sekali sebagai array float64 contiguous
+        sup = df['support'].to_numpy(dtype=np.float64)
+        asup = df['antecedent support'].to_numpy(dtype=np.float64)
+        csup = df['consequent support'].to_numpy(dtype=np.float64)
+        conf = df['confidence'].to_numpy(dtype=np.float64)
+        
+        if HAS_NUMEXPR:
+            local_dict = {'sup': sup, 'asup': asup, 'csup': csup, 'conf': conf, 'inf': np.inf}
+            
+            # Conviction: (1 - consequent_support) / (1 - confidence)
+            # High conviction = strong rule
+            df['conviction'] = ne.evaluate(
+                "where(conf < 1, (1 - csup) / (1 - conf), inf)", local_dict=local_dict
+            )
+            
+            # Leverage: support - (antecedent_support * consequent_support)
+            # Positive = more co-occurrence than expected
+            df['leverage'] = ne.evaluate("sup - asup * csup", local_dict=local_dict)
+            
+            # Kulczynski: (confidence + consequent_confidence) / 2
+            # Where consequent_confidence = support / consequent_support
+            df['kulczynski'] = ne.evaluate("0.5 * (conf + sup / csup)", local_dict=local_dict)
+            
+            # Imbalance Ratio
+            df['imbalance_ratio'] = ne.evaluate(
+                "abs(asup - csup) / (asup + csup - sup)", local_dict=local_dict
+            )
+            
+            return df
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Conviction (inf where confidence == 1)
+            conviction = np.full(len(df), np.inf)
+            np.divide(1 - csup, 1 - conf, out=conviction, where=conf < 1)
+            df['conviction'] = conviction
+            
+            # Leverage
+            df['leverage'] = sup - asup * csup
+            
+            # Kulczynski
+            df['kulczynski'] = 0.5 * (conf + sup / csup)
+            
+            # Imbalance Ratio
+            df['imbalance_ratio'] = np.abs(asup - csup) / (asup + csup - sup)
         
         return df
     
+    def _build_item_index(self, rules: pd.DataFrame) -> None:
+        """
+        Build item -> row position index for antecedents and consequents.
+        
+        Positions follow the row order of rules, so the first top_n entries
+        of an item are also its top_n rules by lift.
+        """
+        ant_index = defaultdict(list)
+        cons_index = defaultdict(list)
+        
+        if len(rules) > 0:
+            for pos, (ants, cons) in enumerate(zip(rules['antecedents'], rules['consequents'])):
+                for item in ants:
+                    ant_index[item].append(pos)
+                for item in cons:
+                    cons_index[item].append(pos)
+        
+        self._ant_index = {k: np.asarray(v, dtype=np.int32) for k, v in ant_index.items()}
+        self._cons_index = {k: np.asarray(v, dtype=np.int32) for k, v in cons_index.items()}
+        self._indexed_rules = rules
+    
+    def _get_rules_by_index(
+        self, 
+        index: Dict[str, np.ndarray], 
+        item: str, 
+        top_n: int
+    ) -> pd.DataFrame:
+        """Look up top_n rules for an item from an inverted index."""
+        positions = index.get(item, np.empty(0, dtype=np.int32))
+        return self.rules.iloc[positions[:top_n]]
+    
     def get_rules_for_consequent(
         self, 
         consequent_item: str,
@@ -221,11 +271,11 @@ class FPGrowthRunner(BaseAlgorithmRunner):
         if self.rules is None:
             raise ValueError("No rules generated. Run algorithm first.")
         
-        # Filter rules where consequent contains the item
-        mask = self.rules['consequents'].apply(lambda x: consequent_item in x)
-        filtered = self.rules[mask].head(top_n)
+        # Index dibangun ulang jika self.rules diganti setelah _generate_rules
+        if self._indexed_rules is not self.rules:
+            self._build_item_index(self.rules)
         
-        return filtered
+        return self._get_rules_by_index(self._cons_index, consequent_item, top_n)
     
     def get_rules_for_antecedent(
         self, 
@@ -247,11 +297,10 @@ class FPGrowthRunner(BaseAlgorithmRunner):
         if self.rules is None:
             raise ValueError("No rules generated. Run algorithm first.")
         
-        # Filter rules where antecedent contains the item
-        mask = self.rules['antecedents'].apply(lambda x: antecedent_item in x)
-        filtered = self.rules[mask].head(top_n)
+        if self._indexed_rules is not self.rules:
+            self._build_item_index(self.rules)
         
-        return filtered
+        return self._get_rules_by_index(self._ant_index, antecedent_item, top_n)
     
     def compare_with_apriori(
         self, 
@@ -260,6 +309,11 @@ class FPGrowthRunner(BaseAlgorithmRunner):
         """
         Run both FP-Growth and Apriori for comparison.
         
+        Apriori runs first in a temporary runner whose results are reduced
+        to counts and released before FP-Growth runs, so both result sets
+        are never held in memory at the same time. FP-Growth results stay
+        on self as before.
+        
         Args:
             basket_matrix: Binary encoded transaction matrix
             
@@ -267,36 +321,38 @@ class FPGrowthRunner(BaseAlgorithmRunner):
             DataFrame comparing both algorithms
         """
         from .apriori_runner import AprioriRunner
+        import gc
         import time
         
-        results = []
+        # Run Apriori (temporary runner, only the counts are kept)
+        apriori_runner = AprioriRunner(self.config)
+        start = time.perf_counter()
+        ap_itemsets, ap_rules = apriori_runner.run(basket_matrix)
+        ap_time = time.perf_counter() - start
+        
+        ap_result = {
+            'algorithm': 'Apriori',
+            'time_seconds': ap_time,
+            'itemsets_found': len(ap_itemsets),
+            'rules_generated': len(ap_rules)
+        }
+        
+        del apriori_runner, ap_itemsets, ap_rules
+        gc.collect()
         
         # Run FP-Growth
-        start = time.time()
+        start = time.perf_counter()
         fp_itemsets, fp_rules = self.run(basket_matrix)
-        fp_time = time.time() - start
+        fp_time = time.perf_counter() - start
         
-        results.append({
+        fp_result = {
             'algorithm': 'FP-Growth',
             'time_seconds': fp_time,
             'itemsets_found': len(fp_itemsets),
             'rules_generated': len(fp_rules)
-        })
-        
-        # Run Apriori
-        apriori_runner = AprioriRunner(self.config)
-        start = time.time()
-        ap_itemsets, ap_rules = apriori_runner.run(basket_matrix)
-        ap_time = time.time() - start
-        
-        results.append({
-            'algorithm': 'Apriori',
-            'time_seconds': ap_time,
-            'itemsets_found': len(ap_itemsets),
-            'rules_generated': len(ap_rules)
-        })
+        }
         
-        comparison = pd.DataFrame(results)
+        comparison = pd.DataFrame([fp_result, ap_result])
         comparison['speedup'] = comparison['time_seconds'].max() / comparison['time_seconds']
         
         return comparison
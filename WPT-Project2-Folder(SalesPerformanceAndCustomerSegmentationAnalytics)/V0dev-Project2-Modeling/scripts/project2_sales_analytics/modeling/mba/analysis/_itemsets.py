@@ -0,0 +1,84 @@
+"""
+MBA Itemset Helpers
+===================
+
+Shared helpers for the analysis modules to normalise rule itemsets to
+string items:
+- str_items(): one itemset, skipping str() when items are already str
+- str_itemsets(): str_items() over a whole rules column
+- find_reciprocals(): pair every rule A -> B with its reverse B -> A
+
+Author: Project 2 - Sales Analytics
+Version: 1.0.0
+"""
+
+from typing import Callable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+
+def str_items(itemset: Iterable, container: Callable = tuple):
+    """
+    Return the itemset's items as str inside the given container type.
+
+    Args:
+        itemset: Iterable of items (frozenset, list, tuple, ...)
+        container: Container type for the result (tuple, frozenset, ...)
+
+    Returns:
+        The itemset itself when it already is a container of str, otherwise
+        a new container with str(item) per item (iteration order kept)
+    """
+    if iter(itemset) is itemset:
+        # Generator/iterator hanya bisa dibaca sekali
+        itemset = tuple(itemset)
+    if all(type(item) is str for item in itemset):
+        return itemset if type(itemset) is container else container(itemset)
+    return container(str(item) for item in itemset)
+
+
+def str_itemsets(itemsets: Iterable, container: Callable = tuple) -> List:
+    """
+    Apply str_items() to every itemset of a rules column.
+
+    Args:
+        itemsets: Iterable of itemsets, e.g. rules['antecedents']
+        container: Container type for each converted itemset
+
+    Returns:
+        List of converted itemsets, same order as the input
+    """
+    return [str_items(itemset, container) for itemset in itemsets]
+
+
+def find_reciprocals(
+    ant_keys: Sequence,
+    cons_keys: Sequence
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find, for every rule A -> B, the first rule B -> A.
+
+    One dict keyed by (antecedent, consequent) holds the first position of
+    each rule, so pairing is a single O(N) pass of hash lookups.
+
+    Args:
+        ant_keys: Hashable antecedent per rule (e.g. frozenset)
+        cons_keys: Hashable consequent per rule, same length
+
+    Returns:
+        Tuple of (pos_1, pos_2) int64 arrays; rule pos_2[i] is the first
+        reverse of rule pos_1[i], pos_1 ascending
+    """
+    first_pos = {}
+    for pos, key in enumerate(zip(ant_keys, cons_keys)):
+        first_pos.setdefault(key, pos)
+
+    pos_1 = []
+    pos_2 = []
+    for pos, key in enumerate(zip(cons_keys, ant_keys)):
+        reverse = first_pos.get(key)
+        if reverse is not None:
+            pos_1.append(pos)
+            pos_2.append(reverse)
+
+    return np.asarray(pos_1, dtype=np.int64), np.asarray(pos_2, dtype=np.int64)
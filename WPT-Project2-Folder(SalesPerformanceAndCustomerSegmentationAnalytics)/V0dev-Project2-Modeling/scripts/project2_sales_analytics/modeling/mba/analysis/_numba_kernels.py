@@ -0,0 +1,176 @@
+"""
+MBA Analysis Numba Kernels
+==========================
+
+Numba-compiled kernels for the analysis modules:
+- score_basket(): subset test + score + max-reduce per consequent
+- report_topk(): per-product top-k distinct consequents (parallel)
+- quality_scores(): normalize + weighted score + tier per rule (parallel)
+
+score_basket() and report_topk() work on the positional rule arrays built
+by CrossSellRecommender._precompute_rule_arrays(); quality_scores() backs
+RulesAnalyzer._assess_rule_quality().
+
+Numba is optional; check HAS_NUMBA before calling these kernels.
+
+Author: Project 2 - Sales Analytics
+Version: 1.0.0
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+
+    @njit(cache=True)
+    def score_basket(ant_mask, conf, lift, cons_ptr, cons_ids, basket_mask,
+                     min_confidence, exclude_basket, n_products):
+        """
+        Score every consequent reachable from a basket in one pass.
+
+        Args:
+            ant_mask: uint64 (n_rules, n_words) antecedent bitmasks
+            conf: float64 confidence per rule
+            lift: float64 lift per rule
+            cons_ptr: CSR offsets, rule i -> cons_ids[cons_ptr[i]:cons_ptr[i+1]]
+            cons_ids: Consequent product ids
+            basket_mask: uint64 (n_words,) basket bitmask
+            min_confidence: Skip rules below this confidence
+            exclude_basket: Skip consequents already in the basket
+            n_products: Size of the product-id table
+
+        Returns:
+            Tuple of (valid, score, confidence, lift, first_rule, rule_count);
+            valid is per rule, the rest per product id
+        """
+        n_rules, n_words = ant_mask.shape
+        valid = np.zeros(n_rules, dtype=np.bool_)
+        best_score = np.full(n_products, -np.inf)
+        best_conf = np.full(n_products, -np.inf)
+        best_lift = np.full(n_products, -np.inf)
+        first_rule = np.full(n_products, n_rules, dtype=np.int64)
+        rule_count = np.zeros(n_products, dtype=np.int64)
+        one = np.uint64(1)
+
+        for r in range(n_rules):
+            if conf[r] < min_confidence:
+                continue
+
+            is_subset = True
+            for w in range(n_words):
+                if ant_mask[r, w] & ~basket_mask[w]:
+                    is_subset = False
+                    break
+            if not is_subset:
+                continue
+
+            valid[r] = True
+            score = lift[r] * conf[r]
+
+            for k in range(cons_ptr[r], cons_ptr[r + 1]):
+                c = cons_ids[k]
+                if exclude_basket and (basket_mask[c >> 6] >> np.uint64(c & 63)) & one:
+                    continue
+
+                if rule_count[c] == 0:
+                    first_rule[c] = r
+                best_score[c] = max(best_score[c], score)
+                best_conf[c] = max(best_conf[c], conf[r])
+                best_lift[c] = max(best_lift[c], lift[r])
+                rule_count[c] += 1
+
+        return valid, best_score, best_conf, best_lift, first_rule, rule_count
+
+    @njit(parallel=True, cache=True)
+    def report_topk(indptr, pair_rule, pair_cons, n_top):
+        """
+        Keep the first n_top distinct consequents of every product group.
+
+        Args:
+            indptr: Group offsets; group g = pairs indptr[g]:indptr[g+1],
+                already ordered by lift desc
+            pair_rule: Rule position per pair
+            pair_cons: Consequent product id per pair
+            n_top: Maximum consequents kept per group
+
+        Returns:
+            Tuple of (out_rule, out_cons, out_count); out_* are (n_groups,
+            n_top) with the first out_count[g] slots of row g filled
+        """
+        n_groups = indptr.shape[0] - 1
+        out_rule = np.full((n_groups, n_top), -1, dtype=np.int64)
+        out_cons = np.full((n_groups, n_top), -1, dtype=np.int64)
+        out_count = np.zeros(n_groups, dtype=np.int64)
+
+        for g in prange(n_groups):
+            filled = 0
+            for i in range(indptr[g], indptr[g + 1]):
+                c = pair_cons[i]
+                seen = False
+                for j in range(filled):
+                    if out_cons[g, j] == c:
+                        seen = True
+                        break
+                if seen:
+                    continue
+                out_rule[g, filled] = pair_rule[i]
+                out_cons[g, filled] = c
+                filled += 1
+                if filled == n_top:
+                    break
+            out_count[g] = filled
+
+        return out_rule, out_cons, out_count
+
+    @njit(parallel=True, cache=True)
+    def quality_scores(values, min_val, value_range, weights, tier_edges):
+        """
+        Composite quality score and tier code for every rule in one pass.
+
+        Args:
+            values: float64 (N, 3) support, confidence, lift
+            min_val: Column minimums
+            value_range: Column max - min; columns with range <= 0
+                normalize to 0.5
+            weights: Weights per column (support, confidence, lift)
+            tier_edges: Bin edges [e0, e1, e2, e3]; tier i covers
+                (e_i, e_i+1], the first bin also includes e0
+
+        Returns:
+            Tuple of (score, tier); tier is -1 outside the edges or for NaN
+        """
+        n_rules = values.shape[0]
+        score = np.empty(n_rules, dtype=np.float64)
+        tier = np.empty(n_rules, dtype=np.int8)
+
+        for i in prange(n_rules):
+            norm_0 = 0.5
+            norm_1 = 0.5
+            norm_2 = 0.5
+            if value_range[0] > 0:
+                norm_0 = (values[i, 0] - min_val[0]) / value_range[0]
+            if value_range[1] > 0:
+                norm_1 = (values[i, 1] - min_val[1]) / value_range[1]
+            if value_range[2] > 0:
+                norm_2 = (values[i, 2] - min_val[2]) / value_range[2]
+
+            # Urutan penjumlahan sama dengan versi NumPy (lift + conf + support)
+            s = norm_2 * weights[2] + norm_1 * weights[1] + norm_0 * weights[0]
+            score[i] = s
+
+            if tier_edges[0] <= s <= tier_edges[1]:
+                tier[i] = 0
+            elif tier_edges[1] < s <= tier_edges[2]:
+                tier[i] = 1
+            elif tier_edges[2] < s <= tier_edges[3]:
+                tier[i] = 2
+            else:
+                tier[i] = -1
+
+        return score, tier
@@ -12,10 +12,28 @@ Version: 1.2.0 - Robust Error Handling
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple
 from collections import defaultdict
 from pathlib import Path
 
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+from ._itemsets import str_items, str_itemsets
+from ._numba_kernels import HAS_NUMBA
+
+if HAS_NUMBA:
+    from ._numba_kernels import score_basket, report_topk
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +42,9 @@ class CrossSellRecommender:
     Cross-sell recommendation engine based on association rules.
     """
     
+    # Kolom product_data yang dipakai untuk enrichment
+    ENRICHMENT_COLUMNS = ['total_revenue', 'total_quantity_sold', 'revenue_contribution_pct', 'order_count']
+    
     def __init__(self, rules: pd.DataFrame, config=None):
         """
         Initialize cross-sell recommender.
@@ -36,6 +57,15 @@ class CrossSellRecommender:
         self.config = config
         self.product_data: Optional[pd.DataFrame] = None
         self.rfm_data: Optional[pd.DataFrame] = None
+        self._product_dtype: Optional[pd.CategoricalDtype] = None
+        self._enrichment: Optional[pd.DataFrame] = None
+        self._enrichment_pl = None
+        self._use_numba = HAS_NUMBA and bool(getattr(config, 'use_numba', False))
+        self._use_polars = bool(getattr(config, 'use_polars', False))
+        if self._use_polars and not HAS_POLARS:
+            logger.warning("polars not installed, using pandas for enrichment joins")
+            self._use_polars = False
+        self._precompute_rule_arrays()
         self._build_lookup_index()
         
         if config:
@@ -55,7 +85,12 @@ class CrossSellRecommender:
             
             product_path = Path(product_path_str)
             if product_path.exists():
-                self.product_data = pd.read_csv(product_path)
+                product_name_col = getattr(self.config, 'product_name_col', 'product_name')
+                self.product_data = self._read_csv(
+                    product_path, usecols=[product_name_col, *self.ENRICHMENT_COLUMNS]
+                )
+                self._downcast_numeric(self.product_data)
+                self._categorize_product_names()
                 logger.info(f"Loaded product data for enrichment: {len(self.product_data)} products")
             else:
                 logger.warning(f"Product data file not found: {product_path}. Enrichment will be skipped.")
@@ -69,15 +104,170 @@ class CrossSellRecommender:
             
             rfm_path = Path(rfm_path_str)
             if rfm_path.exists():
-                self.rfm_data = pd.read_csv(rfm_path)
+                self.rfm_data = self._read_csv(rfm_path)
+                self._downcast_numeric(self.rfm_data)
                 logger.info(f"Loaded RFM data for enrichment: {len(self.rfm_data)} customers")
             else:
                 logger.warning(f"RFM data file not found: {rfm_path}. Segment filtering will be skipped.")
         except Exception as e:
             logger.warning(f"Could not load RFM data: {e}. Segment filtering will be skipped.")
         
+    @staticmethod
+    def _read_csv(path: Path, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a CSV with the multi-threaded PyArrow engine when available.
+        
+        The fallback C parser uses round-trip float parsing so both engines
+        return the same values.
+        
+        Args:
+            path: CSV file path
+            usecols: Columns to parse; names missing from the file are ignored.
+                None reads every column.
+            
+        Returns:
+            DataFrame with the requested columns (in file order)
+        """
+        if usecols is not None:
+            header = pd.read_csv(path, nrows=0).columns
+            wanted = set(usecols)
+            usecols = [c for c in header if c in wanted]
+        
+        if HAS_PYARROW:
+            try:
+                return pd.read_csv(path, engine='pyarrow', usecols=usecols)
+            except Exception as e:
+                logger.debug(f"PyArrow CSV read failed for {path} ({e}), falling back to default engine")
+        
+        return pd.read_csv(path, usecols=usecols, float_precision='round_trip')
+    
+    @staticmethod
+    def _downcast_numeric(df: pd.DataFrame) -> None:
+        """
+        Shrink numeric columns in place to the smallest lossless dtype.
+        
+        Integer columns go to the smallest int that holds their range. Float
+        columns go to float32 only when every value survives the round trip,
+        so the enrichment metrics written to CSV keep their exact values.
+        
+        Args:
+            df: DataFrame to downcast (modified in place)
+        """
+        for col in df.select_dtypes(include='integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        for col in df.select_dtypes(include='float').columns:
+            values = df[col].to_numpy()
+            as_float32 = values.astype(np.float32)
+            # Hanya downcast kalau tidak ada presisi yang hilang
+            if np.array_equal(as_float32.astype(values.dtype), values, equal_nan=True):
+                df[col] = as_float32
+    
+    def _categorize_product_names(self) -> None:
+        """
+        Store product_data's name column as a categorical shared with the rules.
+        
+        Categories cover both the rule items and product_data names, so the
+        enrichment joins match on int codes instead of hashing strings. Also
+        caches the enrichment table (metrics indexed by product name).
+        """
+        product_name_col = getattr(self.config, 'product_name_col', 'product_name')
+        if product_name_col not in self.product_data.columns:
+            return
+        
+        names = self.product_data[product_name_col]
+        categories = pd.Index(list(dict.fromkeys([*self._products.tolist(), *names.dropna().tolist()])))
+        self._product_dtype = pd.CategoricalDtype(categories=categories)
+        self.product_data[product_name_col] = names.astype(self._product_dtype)
+        
+        # Tabel enrichment di-cache sekali, di-index per nama produk
+        available_cols = [c for c in self.ENRICHMENT_COLUMNS if c in self.product_data.columns]
+        if available_cols:
+            self._enrichment = self.product_data.set_index(product_name_col)[available_cols]
+            if self._use_polars:
+                self._enrichment_pl = pl.from_pandas(
+                    self.product_data[[product_name_col, *available_cols]].astype({product_name_col: str})
+                )
+    
+    def _as_product_key(self, values: pd.Series) -> pd.Series:
+        """Cast a product column to the shared categorical dtype (if any) for merging."""
+        if self._product_dtype is None:
+            return values
+        return values.astype(self._product_dtype)
+    
+    def _precompute_rule_arrays(self) -> None:
+        """
+        Extract per-rule itemsets and metrics once as positional arrays.
+        
+        recommend() and get_cross_sells() index these by rule position
+        instead of building a Series with rules.loc[idx] per lookup.
+        """
+        n_rules = len(self.rules)
+        
+        def metric(col: str, default: float) -> np.ndarray:
+            if col in self.rules.columns:
+                return self.rules[col].to_numpy(dtype=np.float64)
+            return np.full(n_rules, default, dtype=np.float64)
+        
+        self._ant_labels: Dict[frozenset, str] = {}
+        # Itemset yang sudah berisi str dipakai apa adanya (tanpa str() per item)
+        self._ant_sets: List[frozenset] = str_itemsets(
+            self.rules['antecedents'], frozenset
+        ) if n_rules else []
+        self._cons_lists: List[Tuple[str, ...]] = str_itemsets(
+            self.rules['consequents'], tuple
+        ) if n_rules else []
+        self._conf = metric('confidence', 0.0)
+        self._lift = metric('lift', 1.0)
+        self._support = metric('support', 0.0)
+        # rule_str sekali per rule (format sama dengan _add_formatted_columns
+        # bila kolomnya tidak ada), dibaca per posisi di get_cross_sells
+        if 'rule_str' in self.rules.columns:
+            self._rule_str = self.rules['rule_str'].to_numpy(dtype=object)
+        else:
+            self._rule_str = np.array([
+                f"{', '.join(sorted(a))} -> {', '.join(sorted(c))}"
+                for a, c in zip(self._ant_sets, self._cons_lists)
+            ], dtype=object)
+        
+        # Tabel product -> id untuk semua item di antecedent/consequent
+        self._product_id: Dict[str, int] = {}
+        for items in self._ant_sets + self._cons_lists:
+            for item in items:
+                self._product_id.setdefault(item, len(self._product_id))
+        self._products = np.array(list(self._product_id), dtype=object)
+        
+        self._ant_size = np.fromiter(
+            (len(a) for a in self._ant_sets), dtype=np.int64, count=n_rules
+        )
+        
+        # Antecedent sebagai bitmask uint64 (n_rules, n_words) atas product id,
+        # sehingga subset test = (ant & ~basket) == 0
+        self._n_words = max(1, (len(self._product_id) + 63) // 64)
+        ant_ids = np.fromiter(
+            (self._product_id[item] for a in self._ant_sets for item in a),
+            dtype=np.int64, count=int(self._ant_size.sum())
+        )
+        self._ant_mask = np.zeros((n_rules, self._n_words), dtype=np.uint64)
+        np.bitwise_or.at(
+            self._ant_mask,
+            (np.repeat(np.arange(n_rules), self._ant_size), ant_ids >> 6),
+            np.left_shift(np.uint64(1), (ant_ids & 63).astype(np.uint64))
+        )
+        
+        # Consequent per rule dalam layout CSR: rule i -> _cons_ids[ptr[i]:ptr[i+1]]
+        cons_len = np.fromiter(
+            (len(c) for c in self._cons_lists), dtype=np.int64, count=n_rules
+        )
+        self._cons_ptr = np.zeros(n_rules + 1, dtype=np.int64)
+        np.cumsum(cons_len, out=self._cons_ptr[1:])
+        self._cons_ids = np.fromiter(
+            (self._product_id[item] for c in self._cons_lists for item in c),
+            dtype=np.int64, count=int(self._cons_ptr[-1])
+        )
+    
     def _build_lookup_index(self) -> None:
-        """Build index for fast rule lookup."""
+        """Build index of rule positions for fast rule lookup."""
         self.antecedent_index: Dict[str, List[int]] = defaultdict(list)
         self.consequent_index: Dict[str, List[int]] = defaultdict(list)
         
@@ -85,29 +275,13 @@ class CrossSellRecommender:
             logger.warning("No rules provided for indexing")
             return
         
-        for idx, row in self.rules.iterrows():
-            antecedents = row.get('antecedents', set())
-            consequents = row.get('consequents', set())
-            
-            # Convert to iterable if needed
-            if isinstance(antecedents, frozenset):
-                antecedents = list(antecedents)
-            elif isinstance(antecedents, str):
-                antecedents = [antecedents]
-            elif not hasattr(antecedents, '__iter__'):
-                antecedents = [antecedents]
-                
-            if isinstance(consequents, frozenset):
-                consequents = list(consequents)
-            elif isinstance(consequents, str):
-                consequents = [consequents]
-            elif not hasattr(consequents, '__iter__'):
-                consequents = [consequents]
-            
-            for item in antecedents:
-                self.antecedent_index[str(item)].append(idx)
-            for item in consequents:
-                self.consequent_index[str(item)].append(idx)
+        # Simpan posisi rule (bukan label index) agar bisa langsung
+        # mengindeks array hasil _precompute_rule_arrays
+        for pos, (ant_set, cons_items) in enumerate(zip(self._ant_sets, self._cons_lists)):
+            for item in ant_set:
+                self.antecedent_index[item].append(pos)
+            for item in cons_items:
+                self.consequent_index[item].append(pos)
         
         logger.info(f"Built index for {len(self.antecedent_index)} antecedent items")
     
@@ -125,107 +299,223 @@ class CrossSellRecommender:
             logger.warning("No rules available for recommendations")
             return pd.DataFrame()
         
-        basket_set = set(str(item) for item in basket)
-        recommendations: Dict[str, Dict[str, Any]] = {}
+        basket_set = str_items(basket, frozenset)
+        basket_ids = np.array(
+            [self._product_id[item] for item in basket_set if item in self._product_id],
+            dtype=np.int64
+        )
+        if len(basket_ids) == 0:
+            return pd.DataFrame()
         
-        for item in basket:
-            # Find rules where this item is in the antecedent
-            rule_indices = self.antecedent_index.get(str(item), [])
+        basket_mask = np.zeros(self._n_words, dtype=np.uint64)
+        np.bitwise_or.at(
+            basket_mask, basket_ids >> 6,
+            np.left_shift(np.uint64(1), (basket_ids & 63).astype(np.uint64))
+        )
+        
+        n_products = len(self._products)
+        
+        if self._use_numba:
+            valid, score, confidence, lift, first_rule, rule_count = score_basket(
+                self._ant_mask, self._conf, self._lift, self._cons_ptr, self._cons_ids,
+                basket_mask, float(min_confidence), exclude_basket, n_products
+            )
+            pair_rule, pair_cons = self._explode_consequents(
+                np.flatnonzero(valid), basket_mask if exclude_basket else None
+            )
+        else:
+            # Subset test untuk semua rule sekaligus: tidak ada bit antecedent di luar basket
+            valid = ~np.any(self._ant_mask & ~basket_mask, axis=1)
+            valid &= self._conf >= min_confidence
+            pair_rule, pair_cons = self._explode_consequents(
+                np.flatnonzero(valid), basket_mask if exclude_basket else None
+            )
             
-            for idx in rule_indices:
-                try:
-                    rule = self.rules.loc[idx]
-                except KeyError:
-                    continue
-                
-                antecedents = rule.get('antecedents', set())
-                if isinstance(antecedents, frozenset):
-                    antecedent_set = set(str(i) for i in antecedents)
-                else:
-                    antecedent_set = {str(antecedents)}
-                
-                if not antecedent_set.issubset(basket_set):
-                    continue
-                
-                confidence = rule.get('confidence', 0)
-                if confidence < min_confidence:
-                    continue
-                
-                consequents = rule.get('consequents', set())
-                if isinstance(consequents, frozenset):
-                    cons_items = list(consequents)
-                else:
-                    cons_items = [consequents]
-                
-                lift = rule.get('lift', 1.0)
-                support = rule.get('support', 0)
-                
-                for cons_item in cons_items:
-                    cons_str = str(cons_item)
-                    
-                    if exclude_basket and cons_str in basket_set:
-                        continue
-                    
-                    score = lift * confidence
-                    
-                    if cons_str not in recommendations:
-                        recommendations[cons_str] = {
-                            'product': cons_str,
-                            'score': score,
-                            'confidence': confidence,
-                            'lift': lift,
-                            'support': support,
-                            'triggered_by': [str(antecedent_set)],
-                            'rule_count': 1
-                        }
-                    else:
-                        rec = recommendations[cons_str]
-                        rec['score'] = max(rec['score'], score)
-                        rec['confidence'] = max(rec['confidence'], confidence)
-                        rec['lift'] = max(rec['lift'], lift)
-                        rec['triggered_by'].append(str(antecedent_set))
-                        rec['rule_count'] += 1
-        
-        if recommendations:
-            rec_df = pd.DataFrame(list(recommendations.values()))
-            rec_df = rec_df.sort_values('score', ascending=False).head(n)
-            rec_df['rank'] = range(1, len(rec_df) + 1)
-            rec_df = self._enrich_recommendations(rec_df)
-            return rec_df
+            # Agregasi per consequent: max score/confidence/lift, support dari rule pertama
+            pair_conf = self._conf[pair_rule]
+            pair_lift = self._lift[pair_rule]
+            score = np.full(n_products, -np.inf)
+            confidence = np.full(n_products, -np.inf)
+            lift = np.full(n_products, -np.inf)
+            first_rule = np.full(n_products, len(self._conf), dtype=np.int64)
+            np.maximum.at(score, pair_cons, pair_lift * pair_conf)
+            np.maximum.at(confidence, pair_cons, pair_conf)
+            np.maximum.at(lift, pair_cons, pair_lift)
+            np.minimum.at(first_rule, pair_cons, pair_rule)
+            rule_count = np.bincount(pair_cons, minlength=n_products)
+        
+        cons_ids = np.flatnonzero(rule_count)
+        if len(cons_ids) == 0:
+            return pd.DataFrame()
         
-        return pd.DataFrame()
+        # Top-n: argpartition lalu sort kecil; tie di ambang diambil stabil
+        cons_score = score[cons_ids]
+        k = max(0, min(n, len(cons_ids)))
+        candidates = np.arange(len(cons_ids))
+        if 0 < k < len(cons_ids):
+            threshold = cons_score[np.argpartition(-cons_score, k - 1)[k - 1]]
+            candidates = np.flatnonzero(cons_score >= threshold)
+        order = candidates[np.argsort(-cons_score[candidates], kind='stable')][:k]
+        top_ids = cons_ids[order]
+        
+        rec_df = pd.DataFrame({
+            'product': self._products[top_ids],
+            'score': score[top_ids],
+            'confidence': confidence[top_ids],
+            'lift': lift[top_ids],
+            'support': self._support[first_rule[top_ids]],
+            'rule_count': rule_count[top_ids],
+        })
+        
+        # triggered_by hanya untuk consequent yang lolos top-n: antecedent
+        # unik (frozenset) per consequent, di-str-kan sekali di akhir
+        top_ids = top_ids.tolist()
+        triggers: Dict[int, Dict[frozenset, None]] = {c: {} for c in top_ids}
+        for cons_id, pos in zip(pair_cons.tolist(), pair_rule.tolist()):
+            if cons_id in triggers:
+                triggers[cons_id].setdefault(self._ant_sets[pos])
+        rec_df.insert(
+            5, 'triggered_by',
+            [[self._antecedent_label(ant) for ant in triggers[c]] for c in top_ids]
+        )
+        rec_df['rank'] = range(1, len(rec_df) + 1)
+        rec_df = self._enrich_recommendations(rec_df)
+        return rec_df
+    
+    def _antecedent_label(self, antecedent: frozenset) -> str:
+        """Format an antecedent for triggered_by, memoized across recommend() calls."""
+        label = self._ant_labels.get(antecedent)
+        if label is None:
+            label = self._ant_labels[antecedent] = str(set(antecedent))
+        return label
+    
+    def _explode_consequents(
+        self,
+        rule_pos: np.ndarray,
+        basket_mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expand rules into (rule, consequent) pairs via the CSR consequent arrays.
+        
+        Args:
+            rule_pos: Rule positions, in the order pairs should come out
+            basket_mask: If given, drop consequents whose bit is set in it
+            
+        Returns:
+            Tuple of (pair_rule, pair_cons) arrays
+        """
+        starts = self._cons_ptr[rule_pos]
+        counts = self._cons_ptr[rule_pos + 1] - starts
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_rule = np.repeat(rule_pos, counts)
+        pair_cons = self._cons_ids[np.repeat(starts, counts) + offsets]
+        
+        if basket_mask is not None:
+            in_basket = (basket_mask[pair_cons >> 6] >> (pair_cons & 63).astype(np.uint64)) & np.uint64(1)
+            keep = in_basket == 0
+            pair_rule = pair_rule[keep]
+            pair_cons = pair_cons[keep]
+        
+        return pair_rule, pair_cons
     
     def _enrich_recommendations(self, rec_df: pd.DataFrame) -> pd.DataFrame:
         """Enrich recommendations with product metrics."""
-        if self.product_data is None or self.config is None or len(rec_df) == 0:
+        if self._enrichment is None or len(rec_df) == 0:
             return rec_df
         
         try:
-            product_name_col = getattr(self.config, 'product_name_col', 'product_name')
-            
-            if product_name_col in self.product_data.columns:
-                enrichment_cols = [product_name_col]
-                
-                metric_cols = ['total_revenue', 'total_quantity_sold', 'revenue_contribution_pct', 'order_count']
-                for col in metric_cols:
-                    if col in self.product_data.columns:
-                        enrichment_cols.append(col)
-                
-                if len(enrichment_cols) > 1:
-                    rec_df = rec_df.merge(
-                        self.product_data[enrichment_cols],
-                        left_on='product',
-                        right_on=product_name_col,
-                        how='left'
-                    )
-                    
-                    if product_name_col in rec_df.columns and product_name_col != 'product':
-                        rec_df = rec_df.drop(columns=[product_name_col])
+            rec_df = self._join_enrichment(rec_df, 'product', self.ENRICHMENT_COLUMNS)
         except Exception as e:
             logger.warning(f"Could not enrich recommendations: {e}")
         
         return rec_df
     
+    def _join_enrichment(
+        self,
+        df: pd.DataFrame,
+        key: str,
+        metric_cols: List[str],
+        keep_name: bool = False
+    ) -> pd.DataFrame:
+        """
+        Left-join product metrics from the cached enrichment table.
+        
+        Same result as merging with product_data (including fan-out for
+        duplicated product names), without slicing product_data per call.
+        
+        Args:
+            df: Frame to enrich
+            key: Product column in df
+            metric_cols: Metric columns to attach (missing ones are skipped)
+            keep_name: Also attach the matched product-name column
+            
+        Returns:
+            Enriched DataFrame with a fresh RangeIndex
+        """
+        cols = [c for c in metric_cols if c in self._enrichment.columns]
+        if not cols:
+            return df
+        
+        table = self._enrichment[cols]
+        product_name_col = self._enrichment.index.name
+        if keep_name and product_name_col != key:
+            table = table.copy()
+            table.insert(0, product_name_col, table.index)
+        
+        if self._enrichment_pl is not None:
+            return self._join_enrichment_polars(df, key, cols, keep_name)
+        
+        df[key] = self._as_product_key(df[key])
+        return df.join(table, on=key, how='left').reset_index(drop=True)
+    
+    def _join_enrichment_polars(
+        self,
+        df: pd.DataFrame,
+        key: str,
+        cols: List[str],
+        keep_name: bool
+    ) -> pd.DataFrame:
+        """
+        Polars version of _join_enrichment() (config.use_polars).
+        
+        Only the key column and a row id go through Polars; the multithreaded
+        join returns, per output row, the source row and the matched metrics.
+        Other columns (e.g. triggered_by lists) stay pandas objects.
+        
+        Args:
+            df: Frame to enrich
+            key: Product column in df
+            cols: Metric columns to attach (all present in the table)
+            keep_name: Also attach the matched product-name column
+            
+        Returns:
+            Enriched DataFrame with a fresh RangeIndex, same rows/order as
+            the pandas join (fan-out included)
+        """
+        product_name_col = self._enrichment.index.name
+        keep_name = keep_name and product_name_col != key
+        
+        left = pl.DataFrame({
+            '_row': np.arange(len(df)),
+            '_key': df[key].astype(str).to_numpy(),
+        })
+        right = self._enrichment_pl.select([
+            pl.col(product_name_col).alias('_key'),
+            *([pl.col(product_name_col)] if keep_name else []),
+            *cols,
+        ])
+        # left_right: urutan baris kiri, lalu urutan product_data (sama dengan pandas)
+        joined = left.join(right, on='_key', how='left', maintain_order='left_right')
+        
+        df[key] = self._as_product_key(df[key])
+        result = df.iloc[joined['_row'].to_numpy()].reset_index(drop=True)
+        for col in ([product_name_col] if keep_name else []) + cols:
+            result[col] = joined[col].to_pandas()
+        if keep_name:
+            result[product_name_col] = self._as_product_key(result[product_name_col])
+        
+        return result
+    
     def get_cross_sells(
         self,
         product: str,
@@ -237,38 +527,27 @@ class CrossSellRecommender:
             return pd.DataFrame()
         
         product_str = str(product)
-        rule_indices = self.antecedent_index.get(product_str, [])
+        rule_positions = self.antecedent_index.get(product_str, [])
         
-        if not rule_indices:
+        if not rule_positions:
             logger.info(f"No rules found for product: {product}")
             return pd.DataFrame()
         
         cross_sells = []
         
-        for idx in rule_indices:
-            try:
-                rule = self.rules.loc[idx]
-            except KeyError:
-                continue
-            
-            lift = rule.get('lift', 0)
+        for pos in rule_positions:
+            lift = self._lift[pos]
             if lift < min_lift:
                 continue
             
-            consequents = rule.get('consequents', set())
-            if isinstance(consequents, frozenset):
-                cons_items = list(consequents)
-            else:
-                cons_items = [consequents]
-            
-            for cons_item in cons_items:
+            for cons_item in self._cons_lists[pos]:
                 cross_sells.append({
                     'trigger_product': product,
-                    'recommended_product': str(cons_item),
-                    'confidence': rule.get('confidence', 0),
+                    'recommended_product': cons_item,
+                    'confidence': self._conf[pos],
                     'lift': lift,
-                    'support': rule.get('support', 0),
-                    'rule': rule.get('rule_str', f"{product} -> {cons_item}")
+                    'support': self._support[pos],
+                    'rule': self._rule_str[pos]
                 })
         
         if cross_sells:
@@ -283,31 +562,38 @@ class CrossSellRecommender:
     
     def _enrich_cross_sells(self, df: pd.DataFrame) -> pd.DataFrame:
         """Enrich cross-sell DataFrame with product metrics."""
-        if self.product_data is None or self.config is None or len(df) == 0:
+        if self._enrichment is None or len(df) == 0:
             return df
         
         try:
-            product_name_col = getattr(self.config, 'product_name_col', 'product_name')
-            
-            if product_name_col in self.product_data.columns:
-                metric_cols = ['total_revenue', 'revenue_contribution_pct']
-                available_cols = [c for c in metric_cols if c in self.product_data.columns]
-                
-                if available_cols:
-                    merge_cols = [product_name_col] + available_cols
-                    df = df.merge(
-                        self.product_data[merge_cols],
-                        left_on='recommended_product',
-                        right_on=product_name_col,
-                        how='left'
-                    )
-                    if product_name_col != 'recommended_product':
-                        df = df.drop(columns=[product_name_col], errors='ignore')
+            df = self._join_enrichment(
+                df, 'recommended_product', ['total_revenue', 'revenue_contribution_pct']
+            )
         except Exception as e:
             logger.warning(f"Could not enrich cross-sells: {e}")
         
         return df
     
+    def _cross_sell_fanout(self) -> np.ndarray:
+        """
+        Rows each product yields after the left join in _enrich_cross_sells.
+        
+        product_data can hold several rows with the same product name; the
+        join then repeats that cross-sell row, and get_cross_sells() returns
+        (and counts) each copy. The vectorized report reproduces this.
+        
+        Returns:
+            int64 array aligned with self._products (1 = no fan-out)
+        """
+        fanout = np.ones(len(self._products), dtype=np.int64)
+        metric_cols = ['total_revenue', 'revenue_contribution_pct']
+        if self._enrichment is None or not any(c in self._enrichment.columns for c in metric_cols):
+            return fanout
+        
+        # Produk tanpa pasangan tetap menghasilkan 1 baris (left join)
+        matches = self._enrichment.index.value_counts().reindex(self._products, fill_value=0)
+        return np.maximum(matches.to_numpy(), 1).astype(np.int64)
+    
     def recommend_for_segment(
         self,
         segment: str,
@@ -348,29 +634,74 @@ class CrossSellRecommender:
         if len(self.rules) == 0:
             return pd.DataFrame()
         
-        all_products = set()
-        for _, row in self.rules.iterrows():
-            antecedents = row.get('antecedents', set())
-            if isinstance(antecedents, frozenset):
-                all_products.update(str(i) for i in antecedents)
-            else:
-                all_products.add(str(antecedents))
+        all_products = set().union(*self._ant_sets)
+        products = list(all_products)
         
-        report_data = []
+        # Pasangan (product, rule) untuk semua antecedent, lalu explode ke consequent
+        n_rules_per_product = [len(self.antecedent_index[p]) for p in products]
+        pair_product = np.repeat(np.arange(len(products)), n_rules_per_product)
+        pair_rule = np.fromiter(
+            (pos for p in products for pos in self.antecedent_index[p]),
+            dtype=np.int64, count=len(pair_product)
+        )
+        keep = self._lift[pair_rule] >= 1.0
+        pair_product = pair_product[keep]
+        pair_rule = pair_rule[keep]
+        
+        counts = self._cons_ptr[pair_rule + 1] - self._cons_ptr[pair_rule]
+        pair_product = np.repeat(pair_product, counts)
+        pair_rule, pair_cons = self._explode_consequents(pair_rule)
         
-        for product in all_products:
-            cross_sells = self.get_cross_sells(product, n=5)
+        if len(pair_product) == 0:
+            return pd.DataFrame()
+        
+        # Top-5 per product: urut lift desc (stabil), satu baris per consequent
+        order = np.lexsort((np.arange(len(pair_rule)), -self._lift[pair_rule], pair_product))
+        pair_product = pair_product[order]
+        pair_rule = pair_rule[order]
+        pair_cons = pair_cons[order]
+        
+        if self._use_numba:
+            # Satu grup per product, diproses paralel (prange) di kernel
+            bounds = np.flatnonzero(np.diff(pair_product)) + 1
+            indptr = np.concatenate(([0], bounds, [len(pair_product)])).astype(np.int64)
+            out_rule, out_cons, out_count = report_topk(indptr, pair_rule, pair_cons, 5)
+            filled = np.arange(5) < out_count[:, None]
+            pair_product = np.repeat(pair_product[indptr[:-1]], out_count)
+            pair_rule = out_rule[filled]
+            pair_cons = out_cons[filled]
+        else:
+            _, first = np.unique(pair_product * len(self._products) + pair_cons, return_index=True)
+            first.sort()
+            pair_product = pair_product[first]
+            pair_rule = pair_rule[first]
+            pair_cons = pair_cons[first]
             
-            if len(cross_sells) > 0:
-                top_rec = cross_sells.iloc[0]
-                report_data.append({
-                    'product': product,
-                    'top_recommendation': top_rec['recommended_product'],
-                    'top_lift': top_rec['lift'],
-                    'top_confidence': top_rec['confidence'],
-                    'total_cross_sell_options': len(cross_sells),
-                    'recommendations': ', '.join(cross_sells['recommended_product'].tolist())
-                })
+            group_start = np.searchsorted(pair_product, pair_product, side='left')
+            top = (np.arange(len(pair_product)) - group_start) < 5
+            pair_product = pair_product[top]
+            pair_rule = pair_rule[top]
+            pair_cons = pair_cons[top]
+        
+        fanout = self._cross_sell_fanout()
+        bounds = np.flatnonzero(np.diff(pair_product)) + 1
+        report_data = []
+        
+        for product_idx, group_rules, group_cons in zip(
+            pair_product[np.r_[0, bounds]].tolist(),
+            np.split(pair_rule, bounds),
+            np.split(pair_cons, bounds)
+        ):
+            top_rule = group_rules[0]
+            recommended = np.repeat(self._products[group_cons], fanout[group_cons])
+            report_data.append({
+                'product': products[product_idx],
+                'top_recommendation': recommended[0],
+                'top_lift': self._lift[top_rule],
+                'top_confidence': self._conf[top_rule],
+                'total_cross_sell_options': len(recommended),
+                'recommendations': ', '.join(recommended.tolist())
+            })
         
         if not report_data:
             return pd.DataFrame()
@@ -378,23 +709,12 @@ class CrossSellRecommender:
         report_df = pd.DataFrame(report_data).sort_values('top_lift', ascending=False)
         
         # Enrich with product data
-        if self.product_data is not None and self.config is not None:
+        if self._enrichment is not None:
             try:
-                product_name_col = getattr(self.config, 'product_name_col', 'product_name')
-                if product_name_col in self.product_data.columns:
-                    revenue_cols = [product_name_col]
-                    if 'total_revenue' in self.product_data.columns:
-                        revenue_cols.append('total_revenue')
-                    if 'revenue_contribution_pct' in self.product_data.columns:
-                        revenue_cols.append('revenue_contribution_pct')
-                    
-                    if len(revenue_cols) > 1:
-                        report_df = report_df.merge(
-                            self.product_data[revenue_cols],
-                            left_on='product',
-                            right_on=product_name_col,
-                            how='left'
-                        )
+                report_df = self._join_enrichment(
+                    report_df, 'product', ['total_revenue', 'revenue_contribution_pct'],
+                    keep_name=True
+                )
             except Exception as e:
                 logger.warning(f"Could not enrich report: {e}")
         
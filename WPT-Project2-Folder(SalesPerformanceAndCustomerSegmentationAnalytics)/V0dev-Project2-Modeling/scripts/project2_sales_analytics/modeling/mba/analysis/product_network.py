@@ -13,7 +13,10 @@ import pandas as pd
 import numpy as np
 import logging
 from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+
+from ._itemsets import str_itemsets
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +35,8 @@ class ProductNetwork:
         >>> communities = network.detect_communities()
     """
     
+    EDGE_COLUMNS = ['source', 'target', 'weight', 'support', 'confidence', 'lift']
+    
     def __init__(self, rules: pd.DataFrame, config=None):
         """
         Initialize product network.
@@ -43,8 +48,23 @@ class ProductNetwork:
         self.rules = rules.copy()
         self.config = config
         self.nodes: Dict[str, Dict[str, Any]] = {}
-        self.edges: List[Dict[str, Any]] = []
-        self.adjacency: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self.edges: pd.DataFrame = pd.DataFrame(columns=self.EDGE_COLUMNS)
+        
+        # Adjacency dalam layout CSR (SoA): node i -> _tgt[_indptr[i]:_indptr[i+1]]
+        # dengan bobot maksimum per pasangan di _w; id node = urutan di self.nodes
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._src = np.empty(0, dtype=np.int32)
+        self._tgt = np.empty(0, dtype=np.int32)
+        self._w = np.empty(0, dtype=np.float64)
+        
+        # Degree dan jumlah bobot keluar/masuk per node (indeks = urutan di
+        # _node_ids), diisi oleh _calculate_node_metrics untuk get_centrality
+        self._out_degree = np.empty(0, dtype=np.int64)
+        self._in_degree = np.empty(0, dtype=np.int64)
+        self._out_weight = np.empty(0, dtype=np.float64)
+        self._in_weight = np.empty(0, dtype=np.float64)
         
     def build(self, weight_metric: str = 'lift') -> None:
         """
@@ -55,72 +75,140 @@ class ProductNetwork:
         """
         logger.info("Building product network...")
         
-        # Extract nodes and edges from rules
-        for _, rule in self.rules.iterrows():
-            # Add nodes for antecedents
-            for item in rule['antecedents']:
-                item_str = str(item)
+        if len(self.rules) == 0:
+            self._calculate_node_metrics()
+            logger.info("Built network with 0 nodes and 0 edges")
+            return
+        
+        # Ambil kolom sekali (tanpa iterrows); str() dilewati bila item sudah str
+        ant_lists = str_itemsets(self.rules['antecedents'].to_numpy())
+        cons_lists = str_itemsets(self.rules['consequents'].to_numpy())
+        
+        # Add nodes (urutan kemunculan: antecedents lalu consequents per rule)
+        for ant_items, cons_items in zip(ant_lists, cons_lists):
+            for item_str in ant_items:
                 if item_str not in self.nodes:
-                    self.nodes[item_str] = {
-                        'id': item_str,
-                        'name': item_str,
-                        'antecedent_count': 0,
-                        'consequent_count': 0
-                    }
+                    self.nodes[item_str] = self._new_node(item_str)
                 self.nodes[item_str]['antecedent_count'] += 1
-            
-            # Add nodes for consequents
-            for item in rule['consequents']:
-                item_str = str(item)
+            for item_str in cons_items:
                 if item_str not in self.nodes:
-                    self.nodes[item_str] = {
-                        'id': item_str,
-                        'name': item_str,
-                        'antecedent_count': 0,
-                        'consequent_count': 0
-                    }
+                    self.nodes[item_str] = self._new_node(item_str)
                 self.nodes[item_str]['consequent_count'] += 1
-            
-            # Add edges
-            weight = rule[weight_metric]
-            
-            for ant_item in rule['antecedents']:
-                ant_str = str(ant_item)
-                for cons_item in rule['consequents']:
-                    cons_str = str(cons_item)
-                    
-                    edge = {
-                        'source': ant_str,
-                        'target': cons_str,
-                        'weight': weight,
-                        'support': rule['support'],
-                        'confidence': rule['confidence'],
-                        'lift': rule['lift']
-                    }
-                    self.edges.append(edge)
-                    
-                    # Update adjacency
-                    current_weight = self.adjacency[ant_str].get(cons_str, 0)
-                    self.adjacency[ant_str][cons_str] = max(current_weight, weight)
+        
+        self._node_ids = list(self.nodes)
+        self._node_index = {node_id: i for i, node_id in enumerate(self._node_ids)}
+        node_ids = np.array(self._node_ids, dtype=object)
+        
+        # Edges: cartesian antecedent x consequent per rule, dalam urutan
+        # nested loop (antecedent luar, consequent dalam) via repeat/index
+        ant_flat = np.fromiter(
+            (self._node_index[item] for a in ant_lists for item in a), dtype=np.int32
+        )
+        cons_flat = np.fromiter(
+            (self._node_index[item] for c in cons_lists for item in c), dtype=np.int32
+        )
+        ant_len = np.fromiter((len(a) for a in ant_lists), dtype=np.int64, count=len(ant_lists))
+        cons_len = np.fromiter((len(c) for c in cons_lists), dtype=np.int64, count=len(cons_lists))
+        ant_start = np.cumsum(ant_len) - ant_len
+        cons_start = np.cumsum(cons_len) - cons_len
+        
+        n_pairs = ant_len * cons_len
+        pair_rule = np.repeat(np.arange(len(n_pairs)), n_pairs)
+        k = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+        k_cons = cons_len[pair_rule]
+        
+        src = ant_flat[ant_start[pair_rule] + k // k_cons]
+        tgt = cons_flat[cons_start[pair_rule] + k % k_cons]
+        weight = self.rules[weight_metric].to_numpy()[pair_rule]
+        
+        self.edges = pd.DataFrame({
+            'source': node_ids[src],
+            'target': node_ids[tgt],
+            'weight': weight,
+            'support': self.rules['support'].to_numpy()[pair_rule],
+            'confidence': self.rules['confidence'].to_numpy()[pair_rule],
+            'lift': self.rules['lift'].to_numpy()[pair_rule],
+        })
+        
+        self._build_adjacency(src, tgt, weight)
         
         # Calculate node metrics
         self._calculate_node_metrics()
         
         logger.info(f"Built network with {len(self.nodes)} nodes and {len(self.edges)} edges")
     
+    @staticmethod
+    def _new_node(item_str: str) -> Dict[str, Any]:
+        """Create an empty node record."""
+        return {
+            'id': item_str,
+            'name': item_str,
+            'antecedent_count': 0,
+            'consequent_count': 0
+        }
+    
+    def _build_adjacency(self, src: np.ndarray, tgt: np.ndarray, weight: np.ndarray) -> None:
+        """
+        Collapse edges to unique source -> target pairs in CSR layout.
+        
+        Args:
+            src: Source node id per edge
+            tgt: Target node id per edge
+            weight: Edge weight; the maximum is kept per pair
+        """
+        n_nodes = len(self._node_ids)
+        
+        key = src.astype(np.int64) * n_nodes + tgt
+        pairs, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        pair_weight = np.zeros(len(pairs), dtype=np.float64)
+        np.maximum.at(pair_weight, inverse, weight)
+        
+        # Urut per source; target dalam urutan kemunculan pertama
+        order = np.lexsort((first, pairs // n_nodes))
+        self._src = (pairs // n_nodes)[order].astype(np.int32)
+        self._tgt = (pairs % n_nodes)[order].astype(np.int32)
+        self._w = pair_weight[order]
+        
+        self._indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._src, minlength=n_nodes), out=self._indptr[1:])
+    
+    @property
+    def adjacency(self) -> Dict[str, Dict[str, float]]:
+        """Outgoing edges as {source: {target: weight}}, built from the CSR arrays."""
+        adjacency: Dict[str, Dict[str, float]] = {}
+        targets = self._tgt.tolist()
+        weights = self._w.tolist()
+        indptr = self._indptr.tolist()
+        
+        for i, node_id in enumerate(self._node_ids):
+            start, end = indptr[i], indptr[i + 1]
+            if end > start:
+                adjacency[node_id] = {
+                    self._node_ids[t]: w
+                    for t, w in zip(targets[start:end], weights[start:end])
+                }
+        
+        return adjacency
+    
     def _calculate_node_metrics(self) -> None:
         """Calculate additional metrics for each node."""
-        # Degree centrality (number of connections)
-        for node_id in self.nodes:
-            out_degree = len(self.adjacency.get(node_id, {}))
-            in_degree = sum(
-                1 for adj in self.adjacency.values() 
-                if node_id in adj
-            )
-            
-            self.nodes[node_id]['out_degree'] = out_degree
-            self.nodes[node_id]['in_degree'] = in_degree
-            self.nodes[node_id]['total_degree'] = out_degree + in_degree
+        n_nodes = len(self._node_ids)
+        
+        # Degree langsung dari array CSR
+        self._out_degree = np.diff(self._indptr)
+        self._in_degree = np.bincount(self._tgt, minlength=n_nodes).astype(np.int64)
+        
+        # Bobot masuk/keluar di-cache privat (tidak masuk ke node dict publik)
+        self._out_weight = np.bincount(self._src, weights=self._w, minlength=n_nodes)
+        self._in_weight = np.bincount(self._tgt, weights=self._w, minlength=n_nodes)
+        
+        for node_id, n_out, n_in in zip(
+            self._node_ids, self._out_degree.tolist(), self._in_degree.tolist()
+        ):
+            node = self.nodes[node_id]
+            node['out_degree'] = n_out
+            node['in_degree'] = n_in
+            node['total_degree'] = n_out + n_in
     
     def get_nodes_df(self) -> pd.DataFrame:
         """
@@ -138,7 +226,7 @@ class ProductNetwork:
         Returns:
             DataFrame with edge information
         """
-        return pd.DataFrame(self.edges)
+        return self.edges.copy()
     
     def get_centrality(self) -> pd.DataFrame:
         """
@@ -151,35 +239,28 @@ class ProductNetwork:
             logger.warning("Network not built. Call build() first.")
             return pd.DataFrame()
         
-        centrality_data = []
-        
         total_nodes = len(self.nodes)
         max_possible_degree = (total_nodes - 1) * 2  # In + Out
         
-        for node_id, node_data in self.nodes.items():
+        # Kolom langsung dari array cache _calculate_node_metrics (urutan
+        # _node_ids = urutan self.nodes), tanpa list of dicts per node
+        total_degree = self._out_degree + self._in_degree
+        nodes = self.nodes.values()
+        df = pd.DataFrame({
+            'product': self._node_ids,
+            'in_degree': self._in_degree,
+            'out_degree': self._out_degree,
+            'total_degree': total_degree,
             # Degree centrality (normalized)
-            degree_centrality = node_data['total_degree'] / max_possible_degree if max_possible_degree > 0 else 0
-            
+            'degree_centrality': (
+                total_degree / max_possible_degree
+                if max_possible_degree > 0 else np.zeros(total_nodes, dtype=np.int64)
+            ),
             # Weighted degree (sum of edge weights)
-            out_weights = sum(self.adjacency.get(node_id, {}).values())
-            in_weights = sum(
-                adj.get(node_id, 0) 
-                for adj in self.adjacency.values()
-            )
-            weighted_degree = out_weights + in_weights
-            
-            centrality_data.append({
-                'product': node_id,
-                'in_degree': node_data['in_degree'],
-                'out_degree': node_data['out_degree'],
-                'total_degree': node_data['total_degree'],
-                'degree_centrality': degree_centrality,
-                'weighted_degree': weighted_degree,
-                'antecedent_rules': node_data['antecedent_count'],
-                'consequent_rules': node_data['consequent_count']
-            })
-        
-        df = pd.DataFrame(centrality_data)
+            'weighted_degree': self._out_weight + self._in_weight,
+            'antecedent_rules': [node['antecedent_count'] for node in nodes],
+            'consequent_rules': [node['consequent_count'] for node in nodes]
+        })
         df = df.sort_values('weighted_degree', ascending=False)
         
         return df
@@ -194,16 +275,18 @@ class ProductNetwork:
         Returns:
             Dictionary with 'leads_to' and 'triggered_by' lists
         """
-        product_str = str(product)
+        idx = self._node_index.get(str(product))
+        if idx is None:
+            return {'leads_to': [], 'triggered_by': []}
         
         # Products this one leads to
-        leads_to = list(self.adjacency.get(product_str, {}).keys())
+        leads_to = [
+            self._node_ids[t]
+            for t in self._tgt[self._indptr[idx]:self._indptr[idx + 1]].tolist()
+        ]
         
         # Products that lead to this one
-        triggered_by = [
-            source for source, targets in self.adjacency.items()
-            if product_str in targets
-        ]
+        triggered_by = [self._node_ids[s] for s in self._src[self._tgt == idx].tolist()]
         
         return {
             'leads_to': leads_to,
@@ -217,40 +300,28 @@ class ProductNetwork:
         Returns:
             Dictionary mapping product to community ID
         """
-        # Build undirected adjacency for community detection
-        undirected = defaultdict(set)
-        
-        for source, targets in self.adjacency.items():
-            for target in targets:
-                undirected[source].add(target)
-                undirected[target].add(source)
-        
-        # Find connected components using BFS
-        visited = set()
-        communities = {}
-        community_id = 0
-        
-        for node in self.nodes:
-            if node in visited:
-                continue
-            
-            # BFS
-            queue = [node]
-            while queue:
-                current = queue.pop(0)
-                if current in visited:
-                    continue
-                
-                visited.add(current)
-                communities[current] = community_id
-                
-                for neighbor in undirected.get(current, []):
-                    if neighbor not in visited:
-                        queue.append(neighbor)
-            
-            community_id += 1
+        n_nodes = len(self._node_ids)
+        if n_nodes == 0:
+            return {}
         
-        return communities
+        # Connected components langsung dari array CSR (undirected); data = 1
+        # agar edge berbobot 0 tetap dihitung sebagai koneksi
+        graph = csr_matrix(
+            (np.ones(len(self._tgt), dtype=np.int8), self._tgt, self._indptr),
+            shape=(n_nodes, n_nodes)
+        )
+        _, labels = connected_components(graph, directed=False)
+        
+        # Seperti BFS lama: komunitas diberi nomor menurut node pertama yang
+        # ditemui (urutan self.nodes) dan dict berisi komunitas 0, lalu 1, ...
+        _, first_seen = np.unique(labels, return_index=True)
+        relabel = np.empty(len(first_seen), dtype=np.int64)
+        relabel[np.argsort(first_seen, kind='stable')] = np.arange(len(first_seen))
+        labels = relabel[labels]
+        order = np.argsort(labels, kind='stable')
+        
+        node_ids = np.array(self._node_ids, dtype=object)
+        return dict(zip(node_ids[order].tolist(), labels[order].tolist()))
     
     def get_hub_products(self, n: int = 10) -> pd.DataFrame:
         """
@@ -296,14 +367,21 @@ class ProductNetwork:
             })
         
         # Format edges
-        vis_edges = []
-        for edge in self.edges:
-            vis_edges.append({
-                'from': edge['source'],
-                'to': edge['target'],
-                'value': edge['weight'],
-                'title': f"Lift: {edge['lift']:.2f}, Conf: {edge['confidence']:.2%}"
-            })
+        vis_edges = [
+            {
+                'from': source,
+                'to': target,
+                'value': weight,
+                'title': f"Lift: {lift:.2f}, Conf: {confidence:.2%}"
+            }
+            for source, target, weight, lift, confidence in zip(
+                self.edges['source'].tolist(),
+                self.edges['target'].tolist(),
+                self.edges['weight'].tolist(),
+                self.edges['lift'].tolist(),
+                self.edges['confidence'].tolist()
+            )
+        ]
         
         return {
             'nodes': vis_nodes,
@@ -12,8 +12,21 @@ Version: 1.0.0
 import pandas as pd
 import numpy as np
 import logging
+from itertools import chain
 from typing import Dict, List, Any, Optional, Tuple
-from collections import defaultdict
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from ._itemsets import find_reciprocals
+from ._numba_kernels import HAS_NUMBA
+
+if HAS_NUMBA:
+    from ._numba_kernels import quality_scores
 
 logger = logging.getLogger(__name__)
 
@@ -34,17 +47,70 @@ class RulesAnalyzer:
         >>> bundles = analyzer.identify_bundles()
     """
     
+    METRIC_COLUMNS = ['support', 'confidence', 'lift']
+    
     def __init__(self, rules: pd.DataFrame, config):
         """
         Initialize rules analyzer.
         
         Args:
-            rules: DataFrame with association rules
+            rules: DataFrame with association rules (not copied; the
+                analyzer never writes to it)
             config: MBAConfig instance
         """
-        self.rules = rules.copy()
+        # Kolom *_str yang banyak duplikat (antecedents_str, consequents_str)
+        # disimpan sebagai category; rule_str unik per rule jadi dilewati.
+        # astype(copy=False) membuat frame baru tanpa menyalin kolom lain,
+        # jadi frame milik caller tidak berubah.
+        dtypes = {
+            col: 'category' for col in rules.columns
+            if str(col).endswith('_str')
+            and pd.api.types.is_string_dtype(rules[col])
+            and rules[col].nunique() <= len(rules) // 2
+        }
+        # Opsional: metrik rule sebagai float32 (setengah memori per scan)
+        if getattr(config, 'analysis_float32', False):
+            dtypes.update({
+                col: np.float32 for col in self.METRIC_COLUMNS
+                if col in rules.columns and rules[col].dtype == np.float64
+            })
+        self.rules = rules.astype(dtypes, copy=False) if dtypes else rules
         self.config = config
         self.analysis_results: Dict[str, Any] = {}
+        self._product_analysis_cache: Optional[Dict[str, pd.DataFrame]] = None
+        self._numeric_stats: Optional[Dict[str, np.ndarray]] = None
+        self._use_numba = HAS_NUMBA and bool(getattr(config, 'use_numba', False))
+        self._itemset_lists = self._build_itemset_lists()
+    
+    def _build_itemset_lists(self) -> Dict[str, Any]:
+        """
+        Copy the itemset columns into Arrow list<string> arrays.
+        
+        Counting and membership tests then run in Arrow kernels instead of
+        per-row Python. self.rules itself is left untouched (it is shared
+        with the recommender and network). List order follows each
+        itemset's iteration order, like explode().
+        
+        Returns:
+            Dict column -> pa.ListArray; empty without pyarrow or when the
+            items are not all strings
+        """
+        itemset_lists = {}
+        if not HAS_PYARROW:
+            return itemset_lists
+        
+        for col in ('antecedents', 'consequents'):
+            if col not in self.rules.columns:
+                continue
+            try:
+                itemset_lists[col] = pa.array(
+                    [list(itemset) for itemset in self.rules[col]],
+                    type=pa.list_(pa.string())
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+                logger.debug(f"{col}: non-string items, keeping object dtype path")
+        
+        return itemset_lists
         
     def analyze(self) -> Dict[str, Any]:
         """
@@ -59,12 +125,13 @@ class RulesAnalyzer:
             logger.warning("No rules to analyze")
             return {'status': 'no_rules'}
         
+        product_analysis = self._analyze_products()
         self.analysis_results = {
             'summary': self._generate_summary(),
             'quality_metrics': self._assess_rule_quality(),
-            'product_analysis': self._analyze_products(),
+            'product_analysis': product_analysis,
             'rule_categories': self._categorize_rules(),
-            'actionable_insights': self._generate_insights()
+            'actionable_insights': self._generate_insights(product_analysis=product_analysis)
         }
         
         logger.info("Analysis complete")
@@ -74,29 +141,18 @@ class RulesAnalyzer:
         """Generate summary statistics for rules."""
         df = self.rules
         
+        # Statistik metrik dari blok numerik bersama (lihat _compute_numeric_stats)
+        stats = self._compute_numeric_stats()
+        
         summary = {
             'total_rules': len(df),
             'unique_antecedents': df['antecedents'].nunique(),
             'unique_consequents': df['consequents'].nunique(),
-            'support': {
-                'min': df['support'].min(),
-                'max': df['support'].max(),
-                'mean': df['support'].mean(),
-                'median': df['support'].median()
-            },
-            'confidence': {
-                'min': df['confidence'].min(),
-                'max': df['confidence'].max(),
-                'mean': df['confidence'].mean(),
-                'median': df['confidence'].median()
-            },
-            'lift': {
-                'min': df['lift'].min(),
-                'max': df['lift'].max(),
-                'mean': df['lift'].mean(),
-                'median': df['lift'].median()
-            }
         }
+        for j, col in enumerate(self.METRIC_COLUMNS):
+            summary[col] = {
+                stat: float(stats[stat][j]) for stat in ('min', 'max', 'mean', 'median')
+            }
         
         # Distribution by rule size
         if 'rule_size' in df.columns:
@@ -104,6 +160,34 @@ class RulesAnalyzer:
         
         return summary
     
+    def _compute_numeric_stats(self) -> Dict[str, np.ndarray]:
+        """
+        Read the support/confidence/lift block once and derive its stats.
+        
+        Summary, quality scoring and categorization all work from this
+        cached block instead of each extracting the columns again.
+        
+        Returns:
+            Dict with 'values' (float64 (N, 3), column-major so every
+            metric is contiguous) and per-column 'min', 'max', 'mean',
+            'median', 'q75' (NaN-skipping)
+        """
+        if self._numeric_stats is not None:
+            return self._numeric_stats
+        
+        values = np.asfortranarray(self.rules[self.METRIC_COLUMNS].to_numpy(dtype=np.float64))
+        columns = values.T
+        self._numeric_stats = {
+            'values': values,
+            'min': np.nanmin(values, axis=0),
+            'max': np.nanmax(values, axis=0),
+            # Per kolom (contiguous) agar penjumlahan sama dengan Series.mean()
+            'mean': np.array([np.nanmean(col) for col in columns]),
+            'median': np.array([np.nanmedian(col) for col in columns]),
+            'q75': np.nanquantile(values, 0.75, axis=0),
+        }
+        return self._numeric_stats
+    
     def _assess_rule_quality(self) -> pd.DataFrame:
         """
         Assess quality of each rule using multiple metrics.
@@ -111,67 +195,84 @@ class RulesAnalyzer:
         Returns:
             DataFrame with quality scores
         """
-        df = self.rules.copy()
-        
-        # Normalize metrics to 0-1 scale
-        for col in ['support', 'confidence', 'lift']:
-            if col in df.columns:
-                min_val = df[col].min()
-                max_val = df[col].max()
-                if max_val > min_val:
-                    df[f'{col}_normalized'] = (df[col] - min_val) / (max_val - min_val)
-                else:
-                    df[f'{col}_normalized'] = 0.5
-        
-        # Calculate composite quality score
-        # Weights: lift (40%), confidence (35%), support (25%)
-        df['quality_score'] = (
-            df.get('lift_normalized', 0) * 0.40 +
-            df.get('confidence_normalized', 0) * 0.35 +
-            df.get('support_normalized', 0) * 0.25
-        )
+        df = self.rules
         
-        # Assign quality tier
-        df['quality_tier'] = pd.cut(
-            df['quality_score'],
-            bins=[0, 0.33, 0.66, 1.0],
-            labels=['Low', 'Medium', 'High'],
-            include_lowest=True
-        )
+        # Normalize metrics to 0-1 scale: satu array (N, k), min/max per kolom
+        metric_cols = [c for c in self.METRIC_COLUMNS if c in df.columns]
+        if len(metric_cols) == len(self.METRIC_COLUMNS):
+            stats = self._compute_numeric_stats()
+            values, min_val = stats['values'], stats['min']
+            value_range = stats['max'] - min_val
+        else:
+            values = df[metric_cols].to_numpy(dtype=np.float64)
+            min_val = np.nanmin(values, axis=0)
+            value_range = np.nanmax(values, axis=0) - min_val
+        tier_labels = ['Low', 'Medium', 'High']
+        tier_bins = [0, 0.33, 0.66, 1.0]
+        
+        if self._use_numba and len(metric_cols) == 3:
+            # Kernel fused: normalize + score + tier per rule (prange)
+            quality_score, tier_codes = quality_scores(
+                np.ascontiguousarray(values), min_val, value_range,
+                np.array([0.25, 0.35, 0.40]), np.array(tier_bins, dtype=np.float64)
+            )
+            quality_tier = pd.Categorical.from_codes(tier_codes, categories=tier_labels, ordered=True)
+        else:
+            flat = ~(value_range > 0)
+            normalized = (values - min_val) / np.where(flat, 1.0, value_range)
+            normalized[:, flat] = 0.5
+            normalized = dict(zip(metric_cols, normalized.T))
+            
+            # Calculate composite quality score
+            # Weights: lift (40%), confidence (35%), support (25%)
+            quality_score = (
+                normalized.get('lift', 0) * 0.40 +
+                normalized.get('confidence', 0) * 0.35 +
+                normalized.get('support', 0) * 0.25
+            )
+            
+            # Assign quality tier
+            quality_tier = pd.cut(
+                quality_score,
+                bins=tier_bins,
+                labels=tier_labels,
+                include_lowest=True
+            )
         
-        return df[['rule_str', 'support', 'confidence', 'lift', 'quality_score', 'quality_tier']]
+        return df[['rule_str', 'support', 'confidence', 'lift']].assign(
+            quality_score=quality_score,
+            quality_tier=quality_tier
+        )
     
     def _analyze_products(self) -> Dict[str, pd.DataFrame]:
         """
         Analyze product appearances in rules.
         
+        The result is cached; later calls return the same dictionary.
+        
         Returns:
             Dictionary with product analysis DataFrames
         """
-        df = self.rules
-        
-        # Count product appearances as antecedent
-        antecedent_counts = defaultdict(int)
-        for _, row in df.iterrows():
-            for item in row['antecedents']:
-                antecedent_counts[item] += 1
-        
-        # Count product appearances as consequent
-        consequent_counts = defaultdict(int)
-        for _, row in df.iterrows():
-            for item in row['consequents']:
-                consequent_counts[item] += 1
-        
-        # Create summary DataFrames
-        antecedent_df = pd.DataFrame([
-            {'product': k, 'antecedent_count': v}
-            for k, v in antecedent_counts.items()
-        ]).sort_values('antecedent_count', ascending=False)
-        
-        consequent_df = pd.DataFrame([
-            {'product': k, 'consequent_count': v}
-            for k, v in consequent_counts.items()
-        ]).sort_values('consequent_count', ascending=False)
+        if self._product_analysis_cache is not None:
+            return self._product_analysis_cache
+        
+        # Satu factorize untuk antecedent + consequent, lalu dua bincount
+        ant_flat = self._flatten_items('antecedents')
+        cons_flat = self._flatten_items('consequents')
+        codes, products = pd.factorize(np.concatenate([ant_flat, cons_flat]))
+        ant_codes = codes[:len(ant_flat)]
+        cons_codes = codes[len(ant_flat):]
+        ant_codes = ant_codes[ant_codes >= 0]
+        cons_codes = cons_codes[cons_codes >= 0]
+        
+        antecedent_df = self._frequency_frame(
+            products, np.bincount(ant_codes, minlength=len(products)),
+            pd.unique(ant_codes), 'antecedent_count'
+        )
+        consequent_df = self._frequency_frame(
+            products, np.bincount(cons_codes, minlength=len(products)),
+            pd.unique(cons_codes), 'consequent_count'
+        )
         
         # Merge for complete view
         if len(antecedent_df) > 0 and len(consequent_df) > 0:
@@ -188,14 +289,70 @@ class RulesAnalyzer:
                 'total_appearances', 
                 ascending=False
             )
+            product_summary = product_summary.astype({
+                'antecedent_count': 'int32',
+                'consequent_count': 'int32',
+                'total_appearances': 'int32'
+            })
         else:
             product_summary = pd.DataFrame()
         
-        return {
+        # Count cukup int32 (setelah semua sort, urutan tie tidak berubah)
+        antecedent_df = antecedent_df.astype({'antecedent_count': 'int32'})
+        consequent_df = consequent_df.astype({'consequent_count': 'int32'})
+        
+        self._product_analysis_cache = {
             'antecedent_frequency': antecedent_df,
             'consequent_frequency': consequent_df,
             'product_summary': product_summary
         }
+        return self._product_analysis_cache
+    
+    def _flatten_items(self, col: str) -> np.ndarray:
+        """
+        Flatten an itemset column into one object array of items.
+        
+        Args:
+            col: Itemset column ('antecedents' or 'consequents')
+            
+        Returns:
+            Items of all rules in rule order (each itemset in its
+            iteration order, like explode())
+        """
+        if col in self._itemset_lists:
+            return pc.list_flatten(self._itemset_lists[col]).to_numpy(zero_copy_only=False)
+        
+        # Tanpa Arrow: chain.from_iterable meratakan itemset di level C
+        items = list(chain.from_iterable(self.rules[col].to_numpy()))
+        flat = np.empty(len(items), dtype=object)
+        flat[:] = items
+        return flat
+    
+    @staticmethod
+    def _frequency_frame(
+        products: np.ndarray,
+        counts: np.ndarray,
+        order: np.ndarray,
+        count_col: str
+    ) -> pd.DataFrame:
+        """
+        Build a ['product', count_col] frame sorted by count descending.
+        
+        Args:
+            products: Factorized product labels
+            counts: Count per product code
+            order: Product codes to include, in first-appearance order
+                (keeps the tie order of the descending sort)
+            count_col: Name for the count column
+            
+        Returns:
+            Frequency DataFrame
+        """
+        return pd.DataFrame({
+            # tolist(): dtype produk di-infer (int tetap int64) seperti sebelumnya
+            'product': products[order].tolist(),
+            count_col: counts[order]
+        }).sort_values(count_col, ascending=False)
     
     def _categorize_rules(self) -> Dict[str, pd.DataFrame]:
         """
@@ -204,27 +361,25 @@ class RulesAnalyzer:
         Returns:
             Dictionary with categorized rules
         """
-        df = self.rules.copy()
+        df = self.rules
         categories = {}
         
+        # Threshold kuartil atas (q75) dari statistik bersama, kolom
+        # support, confidence, lift
+        stats = self._compute_numeric_stats()
+        is_high = stats['values'] >= stats['q75']
+        
         # High lift rules (strong positive association)
-        lift_threshold = df['lift'].quantile(0.75)
-        categories['high_lift'] = df[df['lift'] >= lift_threshold]
+        categories['high_lift'] = df[is_high[:, 2]]
         
         # High confidence rules (reliable predictions)
-        conf_threshold = df['confidence'].quantile(0.75)
-        categories['high_confidence'] = df[df['confidence'] >= conf_threshold]
+        categories['high_confidence'] = df[is_high[:, 1]]
         
         # High support rules (frequent patterns)
-        support_threshold = df['support'].quantile(0.75)
-        categories['high_support'] = df[df['support'] >= support_threshold]
+        categories['high_support'] = df[is_high[:, 0]]
         
         # Golden rules (high in all metrics)
-        categories['golden_rules'] = df[
-            (df['lift'] >= lift_threshold) &
-            (df['confidence'] >= conf_threshold) &
-            (df['support'] >= support_threshold)
-        ]
+        categories['golden_rules'] = df[is_high.all(axis=1)]
         
         # Single antecedent rules (simpler, more actionable)
         if 'antecedent_size' in df.columns:
@@ -232,10 +387,17 @@ class RulesAnalyzer:
         
         return categories
     
-    def _generate_insights(self) -> List[Dict[str, Any]]:
+    def _generate_insights(
+        self,
+        product_analysis: Optional[Dict[str, pd.DataFrame]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Generate actionable business insights from rules.
         
+        Args:
+            product_analysis: Result of _analyze_products() if already
+                computed (otherwise taken from the cache / computed)
+        
         Returns:
             List of insight dictionaries
         """
@@ -246,37 +408,40 @@ class RulesAnalyzer:
             return insights
         
         # Insight 1: Top cross-sell opportunities
-        top_lift = df.nlargest(5, 'lift')
-        for _, row in top_lift.iterrows():
-            insights.append({
-                'type': 'cross_sell',
-                'priority': 'high',
-                'title': f"Cross-sell opportunity: {row.get('rule_str', 'N/A')}",
-                'description': f"Customers buying {row.get('antecedents_str', 'N/A')} "
-                             f"are {row['lift']:.1f}x more likely to buy "
-                             f"{row.get('consequents_str', 'N/A')}",
-                'confidence': row['confidence'],
-                'lift': row['lift']
-            })
+        # Teks dibangun per kolom (string Series), bukan iterrows per baris
+        top_lift = self._nlargest(df, 5, 'lift')
+        insights.extend(pd.DataFrame({
+            'type': 'cross_sell',
+            'priority': 'high',
+            'title': 'Cross-sell opportunity: ' + self._text_column(top_lift, 'rule_str'),
+            'description': 'Customers buying ' + self._text_column(top_lift, 'antecedents_str')
+                         + ' are ' + top_lift['lift'].map('{:.1f}'.format)
+                         + 'x more likely to buy '
+                         + self._text_column(top_lift, 'consequents_str'),
+            'confidence': top_lift['confidence'],
+            'lift': top_lift['lift']
+        }).to_dict('records'))
         
         # Insight 2: Bundle suggestions
         high_confidence = df[df['confidence'] >= 0.5]
         if len(high_confidence) > 0:
-            bundle_candidates = high_confidence.nlargest(3, 'support')
-            for _, row in bundle_candidates.iterrows():
-                insights.append({
-                    'type': 'bundle',
-                    'priority': 'medium',
-                    'title': f"Bundle suggestion: {row.get('rule_str', 'N/A')}",
-                    'description': f"{row['confidence']*100:.0f}% of customers who buy "
-                                 f"{row.get('antecedents_str', 'N/A')} also buy "
-                                 f"{row.get('consequents_str', 'N/A')}",
-                    'support': row['support'],
-                    'confidence': row['confidence']
-                })
+            bundle_candidates = self._nlargest(high_confidence, 3, 'support')
+            insights.extend(pd.DataFrame({
+                'type': 'bundle',
+                'priority': 'medium',
+                'title': 'Bundle suggestion: ' + self._text_column(bundle_candidates, 'rule_str'),
+                'description': (bundle_candidates['confidence'] * 100).map('{:.0f}'.format)
+                             + '% of customers who buy '
+                             + self._text_column(bundle_candidates, 'antecedents_str')
+                             + ' also buy '
+                             + self._text_column(bundle_candidates, 'consequents_str'),
+                'support': bundle_candidates['support'],
+                'confidence': bundle_candidates['confidence']
+            }).to_dict('records'))
         
         # Insight 3: Most influential products
-        product_analysis = self._analyze_products()
+        if product_analysis is None:
+            product_analysis = self._analyze_products()
         if 'product_summary' in product_analysis and len(product_analysis['product_summary']) > 0:
             top_product = product_analysis['product_summary'].iloc[0]
             insights.append({
@@ -291,6 +456,59 @@ class RulesAnalyzer:
         
         return insights
     
+    @staticmethod
+    def _text_column(df: pd.DataFrame, col: str) -> Any:
+        """
+        String version of a column for building insight text.
+        
+        Args:
+            df: Rows the insights are built from
+            col: Text column (e.g. 'rule_str')
+            
+        Returns:
+            df[col] as str Series, or 'N/A' when the column is missing
+        """
+        if col not in df.columns:
+            return 'N/A'
+        return df[col].astype(str).astype(object)
+    
+    @staticmethod
+    def _nlargest(df: pd.DataFrame, n: int, col: str) -> pd.DataFrame:
+        """
+        Same rows as df.nlargest(n, col), selected with np.argpartition.
+        
+        Args:
+            df: Frame to select from
+            n: Number of rows
+            col: Numeric column to rank by
+            
+        Returns:
+            Top-n rows, descending; ties keep their original order
+            (keep='first') and NaN rows only fill up a short result
+        """
+        if n <= 0:
+            return df.iloc[[]]
+        if n >= len(df):
+            # Semua baris terpilih: cukup sort biasa (seperti pandas)
+            return df.sort_values(col, ascending=False).head(n)
+        
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'ub':
+            values = values.astype(np.float64)
+        is_nan = pd.isna(values)
+        positions = np.flatnonzero(~is_nan)
+        values = values[positions]
+        
+        # Top-n: argpartition lalu sort kecil; tie di ambang diambil stabil
+        k = min(n, len(values))
+        if 0 < k < len(values):
+            threshold = values[np.argpartition(-values, k - 1)[k - 1]]
+            candidates = np.flatnonzero(values >= threshold)
+            positions, values = positions[candidates], values[candidates]
+        top = positions[np.argsort(-values, kind='stable')[:k]]
+        
+        return df.iloc[np.concatenate([top, np.flatnonzero(is_nan)])[:n]]
+    
     def get_top_rules(
         self, 
         n: int = 20, 
@@ -306,7 +524,7 @@ class RulesAnalyzer:
         Returns:
             DataFrame with top rules
         """
-        return self.rules.nlargest(n, sort_by)
+        return self._nlargest(self.rules, n, sort_by)
     
     def get_rules_for_product(
         self, 
@@ -325,10 +543,21 @@ class RulesAnalyzer:
         Returns:
             DataFrame with matching rules
         """
-        if as_antecedent:
-            mask = self.rules['antecedents'].apply(lambda x: product in x)
+        col = 'antecedents' if as_antecedent else 'consequents'
+        
+        if col in self._itemset_lists and isinstance(product, str):
+            # Cari di item yang di-flatten, lalu petakan ke baris rule-nya
+            itemset_lists = self._itemset_lists[col]
+            hits = pc.equal(pc.list_flatten(itemset_lists), product).to_numpy(zero_copy_only=False)
+            mask = np.zeros(len(self.rules), dtype=bool)
+            mask[pc.list_parent_indices(itemset_lists).to_numpy()[hits]] = True
         else:
-            mask = self.rules['consequents'].apply(lambda x: product in x)
+            # Object dtype: satu generator ke np.fromiter, tanpa dispatch pandas per baris
+            mask = np.fromiter(
+                (product in itemset for itemset in self.rules[col].to_numpy()),
+                dtype=bool,
+                count=len(self.rules)
+            )
         
         return self.rules[mask].head(top_n)
     
@@ -355,46 +584,75 @@ class RulesAnalyzer:
             (self.rules['support'] >= min_support)
         ]
         
-        bundles = []
-        seen = set()
+        bundle_cols = [
+            'item_set_1', 'item_set_2', 'confidence_1_to_2', 'confidence_2_to_1',
+            'avg_confidence', 'support', 'lift'
+        ]
         
-        for _, rule1 in df.iterrows():
-            ant1 = frozenset(rule1['antecedents'])
-            cons1 = frozenset(rule1['consequents'])
-            
-            # Look for reverse rule
-            reverse_mask = (
-                df['antecedents'].apply(lambda x: frozenset(x) == cons1) &
-                df['consequents'].apply(lambda x: frozenset(x) == ant1)
-            )
-            
-            reverse_rules = df[reverse_mask]
-            
-            if len(reverse_rules) > 0:
-                bundle_key = tuple(sorted([str(ant1), str(cons1)]))
-                
-                if bundle_key not in seen:
-                    seen.add(bundle_key)
-                    reverse_rule = reverse_rules.iloc[0]
-                    
-                    bundles.append({
-                        'item_set_1': rule1.get('antecedents_str', str(ant1)),
-                        'item_set_2': rule1.get('consequents_str', str(cons1)),
-                        'confidence_1_to_2': rule1['confidence'],
-                        'confidence_2_to_1': reverse_rule['confidence'],
-                        'avg_confidence': (rule1['confidence'] + reverse_rule['confidence']) / 2,
-                        'support': rule1['support'],
-                        'lift': rule1['lift']
-                    })
-        
-        return pd.DataFrame(bundles).sort_values('avg_confidence', ascending=False)
+        # Hash-join rule (A -> B) dengan reverse pertamanya (B -> A) sekali
+        # jalan, bukan scan seluruh frame per rule
+        ants = df['antecedents'].map(frozenset).to_numpy()
+        conss = df['consequents'].map(frozenset).to_numpy()
+        pos_1, pos_2 = find_reciprocals(ants, conss)
+        
+        if len(pos_1) == 0:
+            return pd.DataFrame(columns=bundle_cols)
+        
+        # Per pasangan {A, B}: rule pertama saja
+        bundle_keys = pd.Series([frozenset((ants[i], conss[i])) for i in pos_1])
+        keep = ~bundle_keys.duplicated().to_numpy()
+        pos_1, pos_2 = pos_1[keep], pos_2[keep]
+        
+        rule1 = df.iloc[pos_1]
+        if 'antecedents_str' in df.columns:
+            item_set_1 = rule1['antecedents_str'].to_numpy()
+        else:
+            item_set_1 = [str(ants[i]) for i in pos_1]
+        if 'consequents_str' in df.columns:
+            item_set_2 = rule1['consequents_str'].to_numpy()
+        else:
+            item_set_2 = [str(conss[i]) for i in pos_1]
+        
+        conf_1 = rule1['confidence'].to_numpy()
+        conf_2 = df['confidence'].to_numpy()[pos_2]
+        avg_conf = (conf_1 + conf_2) / 2
+        bundles = pd.DataFrame({
+            'item_set_1': item_set_1,
+            'item_set_2': item_set_2,
+            'confidence_1_to_2': conf_1,
+            'confidence_2_to_1': conf_2,
+            'avg_confidence': avg_conf,
+            'support': rule1['support'].to_numpy(),
+            'lift': rule1['lift'].to_numpy()
+        })
+        
+        # Urutan descending dihitung langsung di NumPy dengan cara yang sama
+        # seperti sort_values(ascending=False): argsort atas array terbalik,
+        # lalu dibalik lagi (tie order identik). avg_conf tidak pernah NaN
+        # karena kedua confidence lolos filter >= min_confidence.
+        n = len(avg_conf)
+        order = (n - 1 - np.argsort(avg_conf[::-1]))[::-1]
+        return bundles.iloc[order]
     
-    def print_summary(self) -> None:
-        """Print analysis summary to console."""
-        if not self.analysis_results:
-            self.analyze()
+    def print_summary(self, show_insights: bool = True) -> None:
+        """
+        Print analysis summary to console.
+        
+        Uses analyze() results when available. Otherwise only the parts
+        that are printed are computed (summary, plus insights if asked),
+        not the quality/category analysis.
         
-        summary = self.analysis_results.get('summary', {})
+        Args:
+            show_insights: Also print the top actionable insights
+        """
+        if self.analysis_results:
+            summary = self.analysis_results.get('summary', {})
+            insights = self.analysis_results.get('actionable_insights', [])
+        elif len(self.rules) > 0:
+            summary = self._generate_summary()
+            insights = self._generate_insights() if show_insights else []
+        else:
+            summary, insights = {}, []
         
         print("\n" + "=" * 60)
         print("ASSOCIATION RULES ANALYSIS SUMMARY")
@@ -412,8 +670,7 @@ class RulesAnalyzer:
                       f"Mean: {m['mean']:.4f}  Median: {m['median']:.4f}")
         
         # Print top insights
-        insights = self.analysis_results.get('actionable_insights', [])
-        if insights:
+        if show_insights and insights:
             print("\n--- Top Insights ---")
             for i, insight in enumerate(insights[:5], 1):
                 print(f"{i}. [{insight['type'].upper()}] {insight['title']}")
@@ -22,6 +22,20 @@ PROJECT_DIR = MODELING_DIR.parent  # scripts/project2_sales_analytics
 
 DEFAULT_FEATURE_ENGINEERING_OUTPUT = PROJECT_DIR / "output" / "features" / "csv"
 
+# Dihitung sekali saat import; _resolve_path cukup operasi string
+_PROJECT_DIR_STR = os.path.abspath(str(PROJECT_DIR))
+
+# Atribut path -> nama file di feature_engineering_dir
+FEATURE_FILES = {
+    'sales_details_path': 'sales_details.csv',
+    'sales_by_product_path': 'sales_by_product.csv',
+    'rfm_features_path': 'rfm_features.csv',
+    'behavioral_features_path': 'behavioral_features.csv',
+    'customer_features_path': 'customer_features.csv',
+    'temporal_features_path': 'temporal_features.csv',
+    'sales_by_customer_path': 'sales_by_customer.csv',
+}
+
 
 @dataclass
 class MBAConfig:
@@ -50,14 +64,16 @@ class MBAConfig:
     output_dir: str = field(default_factory=lambda: str(MBA_DIR / "output"))
     feature_engineering_dir: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT))
     
-    # These are now direct string attributes, not just methods
-    sales_details_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "sales_details.csv"))
-    sales_by_product_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "sales_by_product.csv"))
-    rfm_features_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "rfm_features.csv"))
-    behavioral_features_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "behavioral_features.csv"))
-    customer_features_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "customer_features.csv"))
-    temporal_features_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "temporal_features.csv"))
-    sales_by_customer_path: str = field(default_factory=lambda: str(DEFAULT_FEATURE_ENGINEERING_OUTPUT / "sales_by_customer.csv"))
+    # These are now direct string attributes, not just methods.
+    # None = <feature_engineering_dir>/<nama file di FEATURE_FILES>, diisi di __post_init__
+    sales_details_path: Optional[str] = None
+    sales_by_product_path: Optional[str] = None
+    rfm_features_path: Optional[str] = None
+    behavioral_features_path: Optional[str] = None
+    customer_features_path: Optional[str] = None
+    temporal_features_path: Optional[str] = None
+    sales_by_customer_path: Optional[str] = None
+    use_parquet_cache: bool = True  # Data loader: cache each CSV as sibling .parquet, reused while newer than the CSV (needs pyarrow)
     
     # ===========================================
     # COLUMN MAPPINGS - Sesuai sales_details.csv
@@ -127,6 +143,11 @@ class MBAConfig:
     # ===========================================
     algorithm: str = "fpgrowth"  # 'apriori' or 'fpgrowth'
     use_colnames: bool = True  # Use product names in rules
+    use_bitset_miner: bool = True  # Apriori: mine on packed uint64 bit-vectors instead of mlxtend
+    parallel_supports: bool = False  # Apriori run_with_multiple_supports: one worker process per threshold (bitset miner only)
+    use_numba: bool = False  # Numba kernels: bitset miner, recommend() scoring, rule quality (JIT compile on first run)
+    use_polars: bool = False  # Cross-sell enrichment joins via Polars (needs polars>=1.18)
+    analysis_float32: bool = False  # RulesAnalyzer: support/confidence/lift as float32 (~7 digits, scores/tiers may shift slightly)
     
     # ===========================================
     # FILTERING OPTIONS
@@ -164,47 +185,45 @@ class MBAConfig:
         self.output_dir = self._resolve_path(self.output_dir)
         self.feature_engineering_dir = self._resolve_path(self.feature_engineering_dir)
         
-        self.sales_details_path = self._resolve_path(self.sales_details_path)
-        self.sales_by_product_path = self._resolve_path(self.sales_by_product_path)
-        self.rfm_features_path = self._resolve_path(self.rfm_features_path)
-        self.behavioral_features_path = self._resolve_path(self.behavioral_features_path)
-        self.customer_features_path = self._resolve_path(self.customer_features_path)
-        self.temporal_features_path = self._resolve_path(self.temporal_features_path)
-        self.sales_by_customer_path = self._resolve_path(self.sales_by_customer_path)
-        
-        # Update paths based on feature_engineering_dir if it was changed
-        self._sync_feature_paths()
+        # Feature file paths follow feature_engineering_dir
+        self._set_feature_paths()
         
         self._validate_parameters()
         self._create_directories()
     
     def _resolve_path(self, path: str) -> str:
-        """Convert relative path to absolute path based on project directory."""
-        p = Path(path)
-        if not p.is_absolute():
+        """
+        Convert relative path to absolute path based on project directory.
+        
+        Pure string normalization (os.path.abspath), no filesystem access;
+        symlinks are kept as given.
+        """
+        path = os.fspath(path)
+        if not os.path.isabs(path):
             # Make relative path absolute from project directory
-            p = PROJECT_DIR / p
-        return str(p.resolve())
+            path = os.path.join(_PROJECT_DIR_STR, path)
+        return os.path.abspath(path)
     
-    def _sync_feature_paths(self) -> None:
-        """Sync feature file paths with feature_engineering_dir."""
-        fe_dir = Path(self.feature_engineering_dir)
+    def _set_feature_paths(self) -> None:
+        """
+        Fill feature file paths from feature_engineering_dir.
+        
+        Defaults (None) are joined straight onto the already resolved
+        directory; only explicitly given paths go through _resolve_path.
+        """
+        fe_dir = self.feature_engineering_dir
+        fe_dir_key = os.path.normcase(fe_dir)
         
-        # Only update if the path doesn't already match
-        if Path(self.sales_details_path).parent != fe_dir:
-            self.sales_details_path = str(fe_dir / "sales_details.csv")
-        if Path(self.sales_by_product_path).parent != fe_dir:
-            self.sales_by_product_path = str(fe_dir / "sales_by_product.csv")
-        if Path(self.rfm_features_path).parent != fe_dir:
-            self.rfm_features_path = str(fe_dir / "rfm_features.csv")
-        if Path(self.behavioral_features_path).parent != fe_dir:
-            self.behavioral_features_path = str(fe_dir / "behavioral_features.csv")
-        if Path(self.customer_features_path).parent != fe_dir:
-            self.customer_features_path = str(fe_dir / "customer_features.csv")
-        if Path(self.temporal_features_path).parent != fe_dir:
-            self.temporal_features_path = str(fe_dir / "temporal_features.csv")
-        if Path(self.sales_by_customer_path).parent != fe_dir:
-            self.sales_by_customer_path = str(fe_dir / "sales_by_customer.csv")
+        for attr, filename in FEATURE_FILES.items():
+            path = getattr(self, attr)
+            # Path eksplisit hanya dipakai bila berada di feature_engineering_dir
+            if path is not None:
+                path = self._resolve_path(path)
+                if os.path.normcase(os.path.dirname(path)) != fe_dir_key:
+                    path = None
+            if path is None:
+                path = os.path.join(fe_dir, filename)
+            setattr(self, attr, path)
     
     def _validate_parameters(self) -> None:
         """Validate configuration parameters."""
@@ -230,11 +249,12 @@ class MBAConfig:
     
     def _create_directories(self) -> None:
         """Create output directories if they don't exist."""
-        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
-        Path(self.output_dir, "csv").mkdir(exist_ok=True)
-        Path(self.output_dir, "pkl").mkdir(exist_ok=True)
-        Path(self.output_dir, "json").mkdir(exist_ok=True)
-        Path(self.output_dir, "visualizations").mkdir(exist_ok=True)
+        # Cek isdir dulu: pada run berikutnya semua folder sudah ada,
+        # jadi tidak ada mkdir syscall sama sekali
+        for sub in ("", "csv", "pkl", "json", "visualizations"):
+            path = os.path.join(self.output_dir, sub)
+            if not os.path.isdir(path):
+                os.makedirs(path, exist_ok=True)
     
     def get_feature_file(self, filename: str) -> Path:
         """Get absolute path to a feature engineering output file."""
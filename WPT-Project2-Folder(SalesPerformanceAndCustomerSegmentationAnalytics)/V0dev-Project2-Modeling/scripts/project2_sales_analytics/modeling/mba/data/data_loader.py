@@ -9,6 +9,8 @@ Author: Project 2 - Sales Analytics
 Version: 1.1.0
 """
 
+import os
+import json
 import pandas as pd
 import numpy as np
 import joblib
@@ -16,10 +18,20 @@ import logging
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple, Union
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Schema metadata key: read_csv options the cached Parquet was built with
+PARQUET_CACHE_KEY = b'mba_read_csv_options'
+
 
 class MBADataLoader:
     """
@@ -36,6 +48,9 @@ class MBADataLoader:
     - rfm_features.csv (customer segment filtering)
     - behavioral_features.csv (customer behavior)
     
+    With config.use_parquet_cache, each CSV is also saved as a sibling
+    .parquet file on first load and read from there on later runs.
+    
     Attributes:
         config: MBAConfig instance
         df: Loaded DataFrame
@@ -116,19 +131,19 @@ class MBADataLoader:
         
         # Load product data for enrichment
         if Path(self.config.sales_by_product_path).exists():
-            self.product_df = pd.read_csv(self.config.sales_by_product_path)
+            self.product_df = self._read_csv(self.config.sales_by_product_path)
             data['sales_by_product'] = self.product_df
             logger.info(f"Loaded product data: {len(self.product_df):,} products")
         
         # Load RFM data for segment filtering
         if Path(self.config.rfm_features_path).exists():
-            self.rfm_df = pd.read_csv(self.config.rfm_features_path)
+            self.rfm_df = self._read_csv(self.config.rfm_features_path)
             data['rfm_features'] = self.rfm_df
             logger.info(f"Loaded RFM data: {len(self.rfm_df):,} customers")
         
         # Load behavioral features
         if Path(self.config.behavioral_features_path).exists():
-            self.behavioral_df = pd.read_csv(self.config.behavioral_features_path)
+            self.behavioral_df = self._read_csv(self.config.behavioral_features_path)
             data['behavioral_features'] = self.behavioral_df
             logger.info(f"Loaded behavioral data: {len(self.behavioral_df):,} customers")
         
@@ -154,7 +169,7 @@ class MBADataLoader:
         if self.rfm_df is None:
             logger.warning("RFM data not loaded. Loading now...")
             if Path(self.config.rfm_features_path).exists():
-                self.rfm_df = pd.read_csv(self.config.rfm_features_path)
+                self.rfm_df = self._read_csv(self.config.rfm_features_path)
             else:
                 logger.warning("RFM file not found. Returning unfiltered data.")
                 return self.df
@@ -197,7 +212,7 @@ class MBADataLoader:
         
         if self.rfm_df is None:
             if Path(self.config.rfm_features_path).exists():
-                self.rfm_df = pd.read_csv(self.config.rfm_features_path)
+                self.rfm_df = self._read_csv(self.config.rfm_features_path)
             else:
                 return self.df
         
@@ -244,7 +259,7 @@ class MBADataLoader:
         
         if self.product_df is None:
             if Path(self.config.sales_by_product_path).exists():
-                self.product_df = pd.read_csv(self.config.sales_by_product_path)
+                self.product_df = self._read_csv(self.config.sales_by_product_path)
             else:
                 logger.warning("Product data not found. Returning original data.")
                 return df
@@ -275,13 +290,108 @@ class MBADataLoader:
     
     def _load_csv(self, path: Path) -> pd.DataFrame:
         """Load CSV file with proper parsing."""
-        df = pd.read_csv(
+        df = self._read_csv(
             path,
             parse_dates=[self.config.date_col] if self.config.date_col else None,
             low_memory=False
         )
         return df
     
+    def _read_csv(self, path: Union[str, Path], **read_kwargs) -> pd.DataFrame:
+        """
+        Read a CSV, going through the sibling Parquet cache when enabled.
+        
+        The cache (<name>.parquet next to the CSV) is used only when it is
+        newer than the CSV and was written with the same read_csv options;
+        otherwise the CSV is parsed and the cache rewritten.
+        
+        Args:
+            path: CSV file path
+            **read_kwargs: Options passed to pd.read_csv
+            
+        Returns:
+            DataFrame as pd.read_csv(path, **read_kwargs) would return it
+        """
+        path = Path(path)
+        if not (HAS_PYARROW and getattr(self.config, 'use_parquet_cache', False)):
+            return pd.read_csv(path, **read_kwargs)
+        
+        cache_path = path.with_suffix('.parquet')
+        options = json.dumps(read_kwargs, sort_keys=True).encode()
+        
+        df = self._read_parquet_cache(path, cache_path, options)
+        if df is not None:
+            logger.info(f"Loaded from Parquet cache: {cache_path.name}")
+            return df
+        
+        df = pd.read_csv(path, **read_kwargs)
+        self._write_parquet_cache(df, cache_path, options)
+        return df
+    
+    @staticmethod
+    def _read_parquet_cache(
+        csv_path: Path,
+        cache_path: Path,
+        options: bytes
+    ) -> Optional[pd.DataFrame]:
+        """
+        Read the cached Parquet of a CSV. Returns None on cache miss.
+        
+        Args:
+            csv_path: Source CSV file
+            cache_path: Cached Parquet file
+            options: Serialized read_csv options the cache must match
+            
+        Returns:
+            Cached DataFrame, or None if missing, stale or unreadable
+        """
+        try:
+            if not cache_path.exists():
+                return None
+            if cache_path.stat().st_mtime_ns < csv_path.stat().st_mtime_ns:
+                return None
+            metadata = pq.read_schema(cache_path).metadata or {}
+            if metadata.get(PARQUET_CACHE_KEY) != options:
+                return None
+            df = pq.read_table(cache_path).to_pandas()
+        except Exception as e:
+            logger.warning(f"Could not read Parquet cache {cache_path.name}: {e}")
+            return None
+        
+        # Parquet null kembali sebagai None di kolom object; read_csv memberi NaN
+        for col in df.columns[df.dtypes == object]:
+            missing = df[col].isna()
+            if missing.any():
+                df[col] = df[col].where(~missing, np.nan)
+        
+        return df
+    
+    @staticmethod
+    def _write_parquet_cache(df: pd.DataFrame, cache_path: Path, options: bytes) -> None:
+        """
+        Save a parsed CSV as zstd Parquet for the next run.
+        
+        Args:
+            df: DataFrame returned by read_csv
+            cache_path: Target Parquet file
+            options: Serialized read_csv options, stored in the schema metadata
+        """
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                PARQUET_CACHE_KEY: options
+            })
+            pq.write_table(table, tmp_path, compression='zstd')
+            # Tulis ke file sementara lalu rename agar cache tidak pernah setengah jadi
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # Mis. kolom object campuran (int + str) tidak bisa disimpan ke Parquet
+            logger.warning(f"Parquet cache not written for {cache_path.name}: {e}")
+            if tmp_path.exists():
+                tmp_path.unlink()
+    
     def _load_pickle(self, path: Path) -> pd.DataFrame:
         """Load pickle file (from feature engineering output)."""
         data = joblib.load(path)
@@ -488,7 +598,7 @@ class MBADataLoader:
         """
         if self.rfm_df is None:
             if Path(self.config.rfm_features_path).exists():
-                self.rfm_df = pd.read_csv(self.config.rfm_features_path)
+                self.rfm_df = self._read_csv(self.config.rfm_features_path)
             else:
                 return pd.DataFrame()
         